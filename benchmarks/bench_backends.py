@@ -0,0 +1,76 @@
+"""
+Latency of executing compiled rules with each backend, and the speedup of
+each backend over evaluating the execution tree.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_backends.py
+"""
+import timeit
+from typing import Any
+
+from dsl import DefaultDSL
+from dsl.closures import ClosureCompiler
+from dsl.codegen import PythonCompiler
+from dsl.compiled import Backend, CompiledRule
+from dsl.vm import VirtualMachine
+
+BACKENDS: dict[str, Backend | None] = {
+    "tree": None,
+    "vm": VirtualMachine(),
+    "closure": ClosureCompiler(),
+    "python": PythonCompiler(),
+}
+
+RULES = {
+    "comparison": "IF x > 1 THEN RETURN(x)",
+    "arithmetic": "IF (x + 1) * 2 - y / 4 >= 10 % 3 THEN RETURN(x, y)",
+    "boolean": "IF x > 1 AND y < 5 OR NOT flag THEN RETURN(1)",
+    "attribute": "IF order.total > 100 AND COUNT(items == 3) > 0 "
+    "THEN RETURN(order)",
+    "elif": " ".join(
+        ["IF x == 0 THEN RETURN(0)"]
+        + [f"ELIF x == {i} THEN RETURN({i})" for i in range(1, 20)]
+        + ["ELSE RETURN(None)"]
+    ),
+    "statements": " ".join(
+        f"IF x > {i} AND flag THEN RETURN({i}, [x, y])" for i in range(20)
+    ),
+    "lists": "IF TRUE THEN RETURN([x, 1], [1, [2, y]], 3, [4, 5])",
+}
+
+VARIABLES: dict[str, Any] = {
+    "x": 7,
+    "y": 3,
+    "flag": True,
+    "order": {"total": 120},
+    "items": [1, 3, 5],
+}
+
+
+def latency(compiled: CompiledRule) -> float:
+    """Return the best time in microseconds to execute a compiled rule."""
+    timer = timeit.Timer(lambda: compiled.execute(VARIABLES))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def run() -> None:
+    """Print the latency of each rule with each backend."""
+    header = "".join(f"{name:>12}" for name in BACKENDS)
+    speedups = "".join(
+        f"{name + ' speedup':>16}" for name in list(BACKENDS)[1:]
+    )
+    print(f"{'rule':>12}{header}{speedups}")
+    for rule_name, rule in RULES.items():
+        latencies = [
+            latency(DefaultDSL(backend=backend).compile(rule))
+            for backend in BACKENDS.values()
+        ]
+        row = "".join(f"{value:>10.1f}us" for value in latencies)
+        row += "".join(f"{latencies[0] / v:>15.1f}x" for v in latencies[1:])
+        print(f"{rule_name:>12}{row}")
+    print()
+
+
+if __name__ == "__main__":
+    run()
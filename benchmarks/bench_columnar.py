@@ -0,0 +1,64 @@
+"""
+Latency of executing a rule against many rows one row at a time and with
+the columnar engine, with and without NumPy.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_columnar.py
+"""
+import random
+import time
+from typing import Any, Callable
+
+from dsl import DefaultDSL
+from dsl.columnar import HAS_NUMPY
+
+RULE = (
+    "IF amount * rate > 100 AND NOT flagged THEN RETURN(amount) "
+    "ELIF country == 'GB' OR amount - 10 >= 50 THEN RETURN('review') "
+    "ELSE RETURN(None) "
+    "IF amount % 7 == 0 THEN RETURN(rate)"
+)
+
+
+def columns(count: int) -> dict[str, list[Any]]:
+    """Return `count` random rows held column-wise."""
+    rng = random.Random(0)
+    return {
+        "amount": [rng.randint(0, 500) for _ in range(count)],
+        "rate": [rng.random() for _ in range(count)],
+        "flagged": [rng.random() < 0.1 for _ in range(count)],
+        "country": [rng.choice(["GB", "FR", "US"]) for _ in range(count)],
+    }
+
+
+def best_time(function: Callable[[], object], repeat: int = 3) -> float:
+    """Return the best time in milliseconds of calling a function."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def run(count: int) -> None:
+    """Print the time to execute the rule against `count` rows."""
+    dsl = DefaultDSL()
+    compiled = dsl.compile(RULE)
+    data = columns(count)
+    rows = [dict(zip(data, values)) for values in zip(*data.values())]
+    modes: dict[str, Callable[[], object]] = {
+        "rows": lambda: list(dsl.execute_many(compiled, rows)),
+        "python": lambda: dsl.execute_columns(compiled, data, False),
+    }
+    if HAS_NUMPY:
+        modes["numpy"] = lambda: dsl.execute_columns(compiled, data, True)
+    cells = "".join(f"{best_time(mode):>12.1f}ms" for mode in modes.values())
+    print(f"{count:>10}{cells}")
+
+
+if __name__ == "__main__":
+    names = ["rows", "python"] + (["numpy"] if HAS_NUMPY else [])
+    print(f"{'rows':>10}" + "".join(f"{name:>14}" for name in names))
+    for size in (1_000, 10_000, 100_000):
+        run(size)
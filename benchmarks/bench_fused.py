@@ -0,0 +1,72 @@
+"""
+Latency and memory of building execution trees in two phases (parse, then
+reduce) and in a single fused phase.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_fused.py
+"""
+import timeit
+import tracemalloc
+from typing import Callable
+
+from bench_parsers import expressions, if_statements, long_condition
+
+from dsl import DefaultLexer
+from dsl.models.symbols import TerminalSymbol
+from dsl.parsers import FusedParser, PackratParser
+
+MODES: dict[str, Callable[[list[TerminalSymbol]], object]] = {
+    "parse + reduce": lambda tokens: PackratParser().construct(tokens),
+    "fused": lambda tokens: FusedParser().construct(tokens),
+}
+
+
+def time_construct(
+    construct: Callable[[list[TerminalSymbol]], object],
+    tokens: list[TerminalSymbol],
+) -> float:
+    """Return the best time in milliseconds to construct from tokens."""
+    timer = timeit.Timer(lambda: construct(tokens))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1000
+
+
+def peak_memory(
+    construct: Callable[[list[TerminalSymbol]], object],
+    tokens: list[TerminalSymbol],
+) -> float:
+    """Return the peak memory in KiB allocated to construct from tokens."""
+    tracemalloc.start()
+    try:
+        construct(tokens)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run(title: str, rule: Callable[[int], str], sizes: list[int]) -> None:
+    """Print a table of construction times and peak memory for each mode."""
+    lexer = DefaultLexer()
+    print(title)
+    print(
+        f"{'size':>6}"
+        + "".join(f"{name + ' time':>24}" for name in MODES)
+        + "".join(f"{name + ' peak':>24}" for name in MODES)
+    )
+    for size in sizes:
+        tokens = lexer.tokenize(rule(size))
+        times = [time_construct(mode, tokens) for mode in MODES.values()]
+        peaks = [peak_memory(mode, tokens) for mode in MODES.values()]
+        print(
+            f"{size:>6}"
+            + "".join(f"{time:>22.3f}ms" for time in times)
+            + "".join(f"{peak:>21.1f}KiB" for peak in peaks)
+        )
+    print()
+
+
+if __name__ == "__main__":
+    run("Long condition", long_condition, [10, 50, 100])
+    run("IF statements", if_statements, [10, 100, 200])
+    run("Expressions", expressions, [10, 50, 100])
@@ -0,0 +1,93 @@
+"""
+Throughput of the regex lexer (DefaultLexer) and the longest-match lexer
+(TrieLexer), and the latency of constructing lexers with the cache of
+compiled patterns.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_lexers.py
+"""
+import re
+import time
+import timeit
+from typing import Callable
+
+from bench_parsers import expressions, if_statements, long_arithmetic
+
+from dsl.lexers import DefaultLexer, TrieLexer
+
+LEXERS: dict[str, DefaultLexer] = {
+    "regex": DefaultLexer(),
+    "trie": TrieLexer(),
+}
+
+
+def identifiers(count: int) -> str:
+    """Return a rule made of `count` IF statements with long variables."""
+    return " ".join(
+        f"IF order_total > {i} AND customer.country == 'GB' "
+        f"THEN RETURN(shipping_rate)"
+        for i in range(count)
+    )
+
+
+def throughput(tokenize: Callable[[str], object], text: str) -> float:
+    """Return the best throughput in MB/s of tokenizing a text."""
+    timer = timeit.Timer(lambda: tokenize(text))
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=3, number=number)) / number
+    return len(text) / seconds / 1e6
+
+
+def run(title: str, text: str) -> None:
+    """Print the throughput of each lexer tokenizing a text."""
+    tokens = len(DefaultLexer().token_stream(text))
+    print(f"{title} ({len(text)} chars, {tokens} tokens)")
+    print(f"{'lexer':>8}{'token_stream':>20}{'tokenize':>20}")
+    for name, lexer in LEXERS.items():
+        rates = [
+            throughput(lexer.token_stream, text),
+            throughput(lexer.tokenize, text),
+        ]
+        print(f"{name:>8}" + "".join(f"{rate:>15.2f}MB/s" for rate in rates))
+    print()
+
+
+def construct(
+    lexer_type: type[DefaultLexer], count: int, sets: int, cached: bool
+) -> float:
+    """
+    Return the mean time in microseconds to construct a lexer, cycling
+    through a number of symbol sets, with or without the pattern caches.
+    """
+    exclusions = [[symbol] for symbol in lexer_type.DEFAULT_BASE_SYMBOLS]
+    lexer_type.patterns.clear()
+    total = 0.0
+    for i in range(count):
+        if not cached:
+            lexer_type.patterns.clear()
+            re.purge()
+        start = time.perf_counter()
+        lexer_type(variables={"x": i}, exclusions=exclusions[i % sets])
+        total += time.perf_counter() - start
+    return total / count * 1e6
+
+
+def construction(count: int) -> None:
+    """Print the latency of constructing lexers with and without caching."""
+    print(f"Constructing {count} lexers")
+    print(f"{'lexer':>8}{'symbol sets':>14}{'uncached':>16}{'cached':>16}")
+    for name, lexer in LEXERS.items():
+        for sets in (1, 10):
+            uncached = construct(type(lexer), count // 10, sets, False)
+            cached = construct(type(lexer), count, sets, True)
+            print(f"{name:>8}{sets:>14}{uncached:>14.1f}us{cached:>14.1f}us")
+    print(DefaultLexer.cache_info())
+    print()
+
+
+if __name__ == "__main__":
+    construction(10000)
+    run("Expressions", expressions(1000))
+    run("IF statements", if_statements(5000))
+    run("Long arithmetic", long_arithmetic(20000))
+    run("Identifiers", identifiers(2000))
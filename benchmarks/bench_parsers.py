@@ -0,0 +1,115 @@
+"""
+Parse-time benchmarks for the parsers in dsl.parsers.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_parsers.py
+"""
+import math
+import tempfile
+import timeit
+from typing import Callable
+
+from dsl import DefaultLexer
+from dsl.models.symbols import TerminalSymbol
+from dsl.parsers import (
+    DefaultParser,
+    IterativeParser,
+    LeftFactoredParser,
+    PackratParser,
+    Parser,
+    PrecedenceParser,
+)
+from dsl.parsers.generated import GeneratedParser
+from dsl.parsers.lr import LRParser
+
+PARSERS: dict[str, Callable[[], Parser]] = {
+    "DefaultParser": DefaultParser,
+    "PackratParser": PackratParser,
+    "IterativeParser": IterativeParser,
+    "PrecedenceParser": PrecedenceParser,
+    "LeftFactoredParser": LeftFactoredParser,
+    "LRParser": LRParser,
+    "GeneratedParser": GeneratedParser,
+}
+
+
+def nested_parenthesis(depth: int) -> str:
+    """Return a rule whose condition is nested `depth` parentheses deep."""
+    return f"IF {'(' * depth}1 + 2{')' * depth} == 3 THEN RETURN(1)"
+
+
+def long_arithmetic(length: int) -> str:
+    """Return a rule whose condition is a chain of `length` additions."""
+    return f"IF {' + '.join(['1'] * length)} > 0 THEN RETURN(1)"
+
+
+def long_condition(length: int) -> str:
+    """Return a rule whose condition is `length` comparisons joined by AND."""
+    comparisons = [f"a[{i}] - {i} * c.d >= {i}" for i in range(length)]
+    return f"IF {' AND '.join(comparisons)} THEN RETURN(1)"
+
+
+def if_statements(count: int) -> str:
+    """Return a rule made of `count` IF statements."""
+    return " ".join(f"IF x > {i} THEN RETURN({i})" for i in range(count))
+
+
+def expressions(count: int) -> str:
+    """Return a rule made of `count` IF statements with long conditions."""
+    return " ".join(
+        f"IF a.b + 2 * c[1] > {i} AND NOT d == 'x' OR COUNT(e.f == 1) >= 2 "
+        f"THEN RETURN({i}) ELIF (a.b - {i}) / 3 <= 0.5 THEN RETURN(0)"
+        for i in range(count)
+    )
+
+
+def time_parse(parser: Parser, tokens: list[TerminalSymbol]) -> float:
+    """Return the best time, in milliseconds, of parsing the tokens."""
+    try:
+        parser.parse(tokens)
+    except RecursionError:
+        return float("nan")
+    timer = timeit.Timer(lambda: parser.parse(tokens))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1000
+
+
+def format_time(milliseconds: float) -> str:
+    """Format a parse time as a table cell."""
+    if math.isnan(milliseconds):
+        return f"{'RecursionError':>20}"
+    return f"{milliseconds:>18.3f}ms"
+
+
+def run(title: str, rule: Callable[[int], str], sizes: list[int]) -> None:
+    """Print a table of parse times for each parser and input size."""
+    lexer = DefaultLexer()
+    print(title)
+    print(f"{'size':>6}" + "".join(f"{name:>20}" for name in PARSERS))
+    for size in sizes:
+        tokens = lexer.tokenize(rule(size))
+        times = [time_parse(factory(), tokens) for factory in PARSERS.values()]
+        print(f"{size:>6}" + "".join(map(format_time, times)))
+    print()
+
+
+def lr_tables() -> None:
+    """Print the time to build LRParser tables and to load them from disk."""
+    print("LR tables")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("build", "load from cache"):
+            parser = LRParser(cache_dir=cache_dir)
+            start = timeit.default_timer()
+            parser.table(parser.DEFAULT_START_SYMBOL)
+            milliseconds = (timeit.default_timer() - start) * 1000
+            print(f"{label:>20}{format_time(milliseconds)}")
+    print()
+
+
+if __name__ == "__main__":
+    lr_tables()
+    run("Nested parenthesis", nested_parenthesis, [1, 5, 10, 20, 40])
+    run("Long arithmetic", long_arithmetic, [1, 10, 50, 100, 200])
+    run("Long condition", long_condition, [1, 10, 50, 100])
+    run("IF statements", if_statements, [10, 100, 1000, 10000])
+    run("Expressions", expressions, [1, 10, 50, 100])
@@ -0,0 +1,68 @@
+"""
+Latency of evaluating rules whose AND/OR conditions have costly right-hand
+sides, against variables which are resolved lazily when they are looked up.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_short_circuit.py
+"""
+import timeit
+from typing import Any, Callable, Iterator, Mapping
+
+from dsl import DefaultDSL
+
+RULES = {
+    "AND": "IF flag AND COUNT(items == 3) > 0 THEN RETURN(1)",
+    "OR": "IF NOT flag OR COUNT(items == 3) > 0 THEN RETURN(1)",
+    "ELIF": (
+        "IF flag AND COUNT(items == 1) > 2 THEN RETURN(1) "
+        "ELIF flag OR COUNT(items == 2) > 2 THEN RETURN(2)"
+    ),
+}
+
+
+class LazyVariables(Mapping[str, Any]):
+    """Variables computed by a function when they are looked up."""
+
+    def __init__(self, resolvers: dict[str, Callable[[], Any]]):
+        self.resolvers = resolvers
+        self.lookups = 0
+
+    def __getitem__(self, name: str) -> Any:
+        self.lookups += 1
+        return self.resolvers[name]()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.resolvers)
+
+    def __len__(self) -> int:
+        return len(self.resolvers)
+
+
+def variables(flag: bool, size: int) -> LazyVariables:
+    """Return lazy variables with a list of `size` items."""
+    return LazyVariables(
+        {"flag": lambda: flag, "items": lambda: [i % 5 for i in range(size)]}
+    )
+
+
+def run(size: int) -> None:
+    """Print the time and lookups to evaluate each rule."""
+    dsl = DefaultDSL()
+    print(f"Items of size {size}")
+    print(f"{'rule':>8}{'flag':>8}{'time':>14}{'lookups':>10}")
+    for name, rule in RULES.items():
+        compiled = dsl.compile(rule)
+        for flag in (False, True):
+            lazy = variables(flag, size)
+            timer = timeit.Timer(lambda: compiled.execute(lazy))
+            number, _ = timer.autorange()
+            lazy.lookups = 0
+            seconds = min(timer.repeat(repeat=3, number=number)) / number
+            lookups = lazy.lookups / (3 * number)
+            print(f"{name:>8}{flag!s:>8}{seconds * 1e6:>12.1f}us{lookups:>10}")
+    print()
+
+
+if __name__ == "__main__":
+    run(10)
+    run(10_000)
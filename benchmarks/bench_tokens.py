@@ -0,0 +1,105 @@
+"""
+Memory and latency of tokenizing into a list of token objects and into a
+compact TokenStream, and of tokenizing a file read into a string and
+memory-mapped.
+
+Run from the repository root with:
+    PYTHONPATH=src python benchmarks/bench_tokens.py
+"""
+import mmap
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Sized, TypeVar
+
+from bench_parsers import expressions
+
+from dsl import DefaultLexer
+
+LEXER = DefaultLexer()
+
+T = TypeVar("T")
+
+MODES: dict[str, Callable[[str], Sized]] = {
+    "tokenize": LEXER.tokenize,
+    "token_stream": LEXER.token_stream,
+}
+
+
+def time_tokenize(tokenize: Callable[[T], Sized], text: T) -> float:
+    """Return the best time in milliseconds to tokenize a text."""
+    timer = timeit.Timer(lambda: tokenize(text))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1000
+
+
+def retained_memory(
+    tokenize: Callable[[T], Sized], text: T
+) -> tuple[int, float, float]:
+    """
+    Return the number of tokens of a text, and the memory in KiB held by
+    them and at the peak of tokenizing it.
+    """
+    tracemalloc.start()
+    try:
+        tokens = tokenize(text)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(tokens), current / 1024, peak / 1024
+
+
+def run(sizes: list[int]) -> None:
+    """Print a table of tokenizing times and memory for each mode."""
+    print(
+        f"{'chars':>10}{'tokens':>10}"
+        + "".join(
+            f"{name + ' ' + column:>24}"
+            for name in MODES
+            for column in ("time", "held", "peak")
+        )
+    )
+    for size in sizes:
+        text = expressions(size)
+        cells = []
+        for tokenize in MODES.values():
+            count, held, peak = retained_memory(tokenize, text)
+            time = time_tokenize(tokenize, text)
+            cells += [f"{time:>22.1f}ms", f"{held:>21.0f}KiB"]
+            cells += [f"{peak:>21.0f}KiB"]
+        print(f"{len(text):>10}{count:>10}" + "".join(cells))
+    print()
+
+
+def read_file(path: Path) -> Sized:
+    """Tokenize a file read into a string."""
+    with open(path, encoding="utf-8") as file:
+        return LEXER.token_stream(file.read())
+
+
+def map_file(path: Path) -> Sized:
+    """Tokenize a memory-mapped file."""
+    with open(path, "rb") as file:
+        return LEXER.token_stream(
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        )
+
+
+def run_file(size: int) -> None:
+    """Print the time and memory of tokenizing a file of expressions."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "rules.dsl"
+        path.write_text(expressions(size), encoding="utf-8")
+        print(f"File of {path.stat().st_size} bytes")
+        print(f"{'mode':>8}{'time':>14}{'held':>14}{'peak':>14}")
+        for name, tokenize in (("read", read_file), ("mmap", map_file)):
+            count, held, peak = retained_memory(tokenize, path)
+            time = time_tokenize(tokenize, path)
+            print(f"{name:>8}{time:>12.1f}ms{held:>11.0f}KiB{peak:>11.0f}KiB")
+    print()
+
+
+if __name__ == "__main__":
+    run([1_000, 10_000, 40_000])
+    run_file(40_000)
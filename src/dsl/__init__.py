@@ -1,10 +1,35 @@
+import hashlib
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any
+from bisect import bisect_right
+from dataclasses import MISSING, dataclass, field, replace
+from typing import (
+    Any,
+    ClassVar,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    TextIO,
+)
 
-from dsl.lexers import DefaultLexer, Lexer
-from dsl.models import Grammar
-from dsl.models.exceptions import DSLSyntaxError, DSLValidationError
+from dsl.cache import CacheInfo, Identity, LRUCache
+from dsl.columnar import ColumnarEngine
+from dsl.compiled import (
+    Backend,
+    CompiledRule,
+    Executable,
+    approximate_size,
+    canonical_form,
+)
+from dsl.documents import ParsedDocument, ParsedStatement
+from dsl.lexers import DefaultLexer, Lexer, Source
+from dsl.models import EvaluationContext, Grammar
+from dsl.models.exceptions import (
+    DSLException,
+    DSLSyntaxError,
+    DSLValidationError,
+)
 from dsl.models.representables.actions import Action
 from dsl.models.representables.evaluables import (
     Evaluable,
@@ -12,7 +37,10 @@ from dsl.models.representables.evaluables import (
     EvaluableList,
 )
 from dsl.models.representables.operands import Operand
-from dsl.models.symbols import NonTerminalSymbol
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol
+from dsl.models.symbols.nonterminals import IfStatementSymbol
+from dsl.models.symbols.terminals import IfLiteral, InvalidSymbol
+from dsl.optimizer import Optimizer
 from dsl.parsers import DefaultParser, Parser
 
 
@@ -27,64 +55,494 @@ class ValidationResult:
     error: Exception | None = None
 
 
+@dataclass
+class ExecutionResult:
+    """
+    Execution result object containing the outcome of a row or its error.
+    """
+
+    is_successful: bool
+    outcome: list[Any] = field(default_factory=list)
+    error: Exception | None = None
+
+
 class AbstractDSL(ABC):
     @abstractmethod
-    def validate(self, input_string: str) -> ValidationResult:
+    def validate(self, input_string: Source) -> ValidationResult:
         """Validate the DSL and return a validation result object."""
         ...
 
     @abstractmethod
-    def execute(self, input_string: str) -> list[Any]:
+    def execute(self, input_string: Source) -> list[Any]:
         """Execute the construct and return the outputs."""
         ...
 
 
 class DefaultDSL(AbstractDSL):
+    DEFAULT_CHUNK_SIZE: ClassVar[int] = 65536
+    DEFAULT_BACKEND: ClassVar[Backend | None] = None
+
     def __init__(
         self,
         lexer: Lexer | None = None,
         parser: Parser | None = None,
         start_symbol: NonTerminalSymbol | None = None,
+        cache_size: int | None = 0,
+        cache_bytes: int | None = None,
+        backend: Backend | None = None,
     ):
+        """
+        :param lexer: The lexer to split rules with.
+        :param parser: The parser to parse rules with.
+        :param start_symbol: An optional non-terminal to parse rules from.
+        :param cache_size: The number of compiled rules and validation
+        results to cache, None for no limit, or 0 to only limit the cache by
+        cache_bytes.
+        :param cache_bytes: The approximate size in bytes to limit the cache
+        to, or None for no limit.
+        :param backend: The backend to compile execution trees with, or None
+        to evaluate the trees.
+        """
         self.lexer = lexer or DefaultLexer()
         self.parser = parser or DefaultParser()
         self.start_symbol = start_symbol
+        self.backend = backend or self.DEFAULT_BACKEND
+        self.cache: LRUCache[Hashable, Any] | None = None
+        if cache_size != 0 or cache_bytes is not None:
+            self.cache = LRUCache(
+                maxsize=cache_size or None,
+                maxweight=cache_bytes,
+                weigh=approximate_size,
+            )
 
-    def construct(self, input_string: str) -> Evaluable:
+    def construct(self, input_string: Source) -> Evaluable:
         """
         Convert a list of Tokens into a list of Tokens and expressions
-        :param input_string: An input string.
+        :param input_string: An input string, or UTF-8 encoded bytes, an mmap
+        region or a binary file which are lexed without decoding them whole.
         :return: A list of nested non-terminal and terminal symbols.
         """
-        tokens = self.lexer.tokenize(input_string)
-        parse_tree = self.parser.parse(tokens, start_symbol=self.start_symbol)
-        execution_tree = self.parser.reduce(parse_tree[0])[0]
+        tokens = self.lexer.iter_tokens(input_string)
+        execution_tree = self.parser.construct(
+            tokens, start_symbol=self.start_symbol
+        )[0]
         if not isinstance(execution_tree, Evaluable):
             raise DSLValidationError(f"{execution_tree=} is not an Evaluable.")
         return execution_tree
 
-    def validate(self, input_string: str) -> ValidationResult:
+    def validate(self, input_string: Source) -> ValidationResult:
         """
         Validate the DefaultDSL and return a validation result object
-        :param input_string: An input string.
+        :param input_string: An input string, UTF-8 encoded bytes, an mmap
+        region or a binary file.
         :return: The result of the validation.
         """
+        if self.cache is None or not isinstance(input_string, str):
+            return self._validate(input_string)
+        result = self.cache.get_or_create(
+            self._cache_key("validate", input_string),
+            lambda: self._validate(input_string, is_cached=True),
+        )
+        return replace(result, actions=list(result.actions))
+
+    def _validate(
+        self, input_string: Source, is_cached: bool = False
+    ) -> ValidationResult:
+        """Validate an input string, constructing it with the cache."""
         try:
-            execution_tree = self.construct(input_string)
+            execution_tree = self._construct(input_string)
             actions = self.get_actions(execution_tree)
             return ValidationResult(True, actions=actions)
         except (DSLSyntaxError, DSLValidationError) as err:
+            if is_cached:
+                # A cached error should not keep the frames it was raised in
+                err.__traceback__ = None
             return ValidationResult(False, error=err)
 
-    def execute(self, input_string: str) -> list[Any]:
+    def execute(self, input_string: Source) -> list[Any]:
         """
         Execute the construct and return the outcome
-        :param input_string: An input string.
+        :param input_string: An input string, UTF-8 encoded bytes, an mmap
+        region or a binary file.
         :return: The outcome from executing the DefaultDSL.
         """
-        execution_tree = self.construct(input_string)
+        if self.backend is not None and isinstance(input_string, str):
+            return self.compile(input_string).execute()
+        execution_tree = self._construct(input_string)
+        if self.backend is not None:
+            return self.backend.compile(execution_tree)(None)
         return execution_tree.evaluate()
 
+    def compile(
+        self, input_string: str, optimize: bool = False
+    ) -> CompiledRule:
+        """
+        Compile a rule once to execute it against many sets of variables.
+        Compiled rules are cached if the DefaultDSL has a cache.
+        :param input_string: An input string.
+        :param optimize: Whether to fold constants and prune dead branches
+        of the execution tree.
+        :return: The compiled rule.
+        """
+        if self.cache is None:
+            return self._compile(input_string, optimize)
+        return self.cache.get_or_create(
+            self._cache_key(("compile", optimize), input_string),
+            lambda: self._compile(input_string, optimize),
+        )
+
+    def _compile(self, input_string: str, optimize: bool) -> CompiledRule:
+        """
+        Construct and optionally optimize the execution tree of a rule, and
+        compile it with the backend of the DefaultDSL. Rules a persistent
+        backend stored are loaded without constructing their trees.
+        """
+        key = None
+        if self.backend is not None and self.backend.persistent:
+            key = self._rule_digest(input_string, optimize)
+            variables = getattr(self.lexer, "variables", {})
+            executable = self.backend.load(key, variables)
+            if executable is not None:
+                return CompiledRule(input_string, None, executable)
+        tree = self.construct(input_string)
+        if optimize:
+            tree = Optimizer().optimize(tree)
+        if self.backend is None:
+            return CompiledRule(input_string, tree)
+        if key is not None:
+            return CompiledRule(
+                input_string, tree, self.backend.store(key, tree)
+            )
+        return CompiledRule(input_string, tree, self.backend.compile(tree))
+
+    def _rule_digest(self, input_string: str, optimize: bool) -> str:
+        """
+        Get a digest of a rule which is stable across processes, for keying
+        rules stored by a backend. Like the cache key, it covers the
+        canonical form of the rule and the lexer, grammar and start symbol
+        it is constructed with.
+        """
+
+        def name(type_: type) -> str:
+            return f"{type_.__module__}.{type_.__qualname__}"
+
+        symbols = getattr(self.lexer, "symbols", [])
+        grammar = getattr(self.parser, "grammar", None)
+        description = "\n".join(
+            [
+                canonical_form(input_string),
+                f"optimize={optimize}",
+                name(type(self.lexer)),
+                *(f"{name(symbol)} {symbol.regex}" for symbol in symbols),
+                name(type(self.parser)),
+                "" if grammar is None else grammar.fingerprint(),
+                name(type(self.start_symbol)),
+            ]
+        )
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def execute_many(
+        self,
+        rule: str | CompiledRule,
+        rows: Iterable[Mapping[str, Any]],
+    ) -> Iterator[ExecutionResult]:
+        """
+        Execute a rule against many sets of variables. The rule is compiled
+        once, before any row is read, and rows are executed lazily in order.
+        An error executing a row is returned in its result rather than
+        raised, so the rest of the rows are still executed.
+        :param rule: An input string or a compiled rule.
+        :param rows: An iterable of the variables of each row.
+        :return: An iterator of the result of executing each row.
+        """
+        compiled = (
+            rule if isinstance(rule, CompiledRule) else self.compile(rule)
+        )
+        return self._execute_rows(compiled.evaluate, rows)
+
+    def execute_columns(
+        self,
+        rule: str | CompiledRule,
+        columns: Mapping[str, Sequence[Any]],
+        use_numpy: bool | None = None,
+    ) -> list[Any]:
+        """
+        Execute a rule against rows held column-wise, applying each operator
+        to whole columns with a ColumnarEngine
+        :param rule: An input string or a compiled rule.
+        :param columns: The values of each variable, with one value per row.
+        :param use_numpy: Whether to evaluate with NumPy, or None to use it
+        if it is installed.
+        :return: The outcome of executing the rule against each row.
+        """
+        compiled = (
+            rule if isinstance(rule, CompiledRule) else self.compile(rule)
+        )
+        tree = compiled.tree
+        if tree is None:
+            tree = self.construct(compiled.text)
+        return ColumnarEngine(use_numpy).execute(tree, columns)
+
+    @staticmethod
+    def _execute_rows(
+        evaluate: Executable, rows: Iterable[Mapping[str, Any]]
+    ) -> Iterator[ExecutionResult]:
+        """Execute a compiled rule against each row."""
+        for variables in rows:
+            try:
+                outcome = evaluate(EvaluationContext(variables))
+            except Exception as err:
+                yield ExecutionResult(False, error=err)
+            else:
+                yield ExecutionResult(True, outcome)
+
+    def cache_info(self) -> CacheInfo | None:
+        """
+        :return: The statistics of the cache of compiled rules and validation
+        results, or None if the DefaultDSL has no cache.
+        """
+        return None if self.cache is None else self.cache.info()
+
+    def _construct(self, input_string: Source) -> Evaluable:
+        """Construct an input string, or get it from the cache."""
+        if self.cache is None or not isinstance(input_string, str):
+            return self.construct(input_string)
+        tree = self.compile(input_string).tree
+        return self.construct(input_string) if tree is None else tree
+
+    def _cache_key(self, kind: Hashable, input_string: str) -> Hashable:
+        """
+        Get the cache key of a rule. Rules are cached by their canonical form
+        and the lexer, its variables, parser and start symbol they are
+        constructed with, since the lexer binds its variables to the
+        execution tree.
+        """
+        return (
+            kind,
+            canonical_form(input_string),
+            self.lexer,
+            Identity(getattr(self.lexer, "variables", None)),
+            self.parser,
+            type(self.start_symbol),
+        )
+
+    def iter_statements(
+        self, source: str | TextIO, chunk_size: int | None = None
+    ) -> Iterator[Evaluable]:
+        """
+        Construct the IF statements of a block one at a time. The source is
+        read in chunks and each statement is yielded as soon as the start of
+        the next one has been read, so only one statement is held in memory.
+        Statements before a syntax error are yielded before it is raised.
+        :param source: An input string or a text file-like object.
+        :param chunk_size: The number of characters to read at a time.
+        :return: An iterator of evaluable IF statements.
+        """
+        buffer = ""
+        is_empty = True
+        chunks = self._read_chunks(
+            source, chunk_size or self.DEFAULT_CHUNK_SIZE
+        )
+        is_final = False
+        while not is_final:
+            chunk = next(chunks, None)
+            is_final = chunk is None
+            buffer += chunk or ""
+            offset = 0
+            for tokens, offset in self._split_statements(buffer, is_final):
+                is_empty = False
+                yield self._construct_statement(tokens)
+            buffer = buffer[offset:]
+        if is_empty:
+            raise DSLSyntaxError("Input cannot be parsed.")
+
+    def iter_execute(
+        self, source: str | TextIO, chunk_size: int | None = None
+    ) -> Iterator[Any]:
+        """
+        Execute the IF statements of a block one at a time as they are read
+        :param source: An input string or a text file-like object.
+        :param chunk_size: The number of characters to read at a time.
+        :return: An iterator of the outcomes of the statements which fired.
+        """
+        for statement in self.iter_statements(source, chunk_size):
+            output = statement.evaluate()
+            if output is not MISSING:
+                yield output
+
+    @staticmethod
+    def _read_chunks(source: str | TextIO, chunk_size: int) -> Iterator[str]:
+        """Read a string or a text file-like object in chunks."""
+        if isinstance(source, str):
+            for start in range(0, len(source), chunk_size):
+                yield source[start : start + chunk_size]
+            return
+        while chunk := source.read(chunk_size):
+            yield chunk
+
+    def _split_statements(
+        self, buffer: str, is_final: bool
+    ) -> Iterator[tuple[list[TerminalSymbol], int]]:
+        """
+        Split the complete statements off the start of a buffer. A statement
+        is complete once the IF token after it is followed by more input, and
+        tokens after an invalid symbol are held back since they may change
+        when the rest of a string literal is read.
+        :param buffer: The unparsed input.
+        :param is_final: Whether the buffer holds the rest of the input.
+        :return: An iterator of statement tokens with the offset after them.
+        """
+        tokens: list[TerminalSymbol] = []
+        for token, start, end in self.lexer.scan(buffer):
+            if isinstance(token, InvalidSymbol):
+                if is_final:
+                    raise DSLSyntaxError(f"Unknown syntax {token.lexeme}.")
+                return
+            if isinstance(token, IfLiteral):
+                if not is_final and end >= len(buffer):
+                    return
+                if tokens:
+                    yield tokens, start
+                tokens = []
+            tokens.append(token)
+        if is_final and tokens:
+            yield tokens, len(buffer)
+
+    def _construct_statement(self, tokens: list[TerminalSymbol]) -> Evaluable:
+        """Construct an IF statement from its tokens."""
+        statement = self.parser.construct(
+            tokens, start_symbol=IfStatementSymbol()
+        )[0]
+        if not isinstance(statement, Evaluable):
+            raise DSLValidationError(f"{statement=} is not an Evaluable.")
+        return statement
+
+    def parse_document(self, input_string: str) -> ParsedDocument:
+        """
+        Parse an input string one IF statement at a time, so that it can be
+        re-parsed incrementally after an edit
+        :param input_string: An input string.
+        :return: The parsed document.
+        """
+        return self.reparse(ParsedDocument("", [], []), 0, 0, input_string)
+
+    def reparse(
+        self, document: ParsedDocument, start: int, end: int, replacement: str
+    ) -> ParsedDocument:
+        """
+        Parse a document after replacing the text between two offsets. Only
+        the statements from the one before the edit up to the first IF token
+        after it which is lexed at its old (shifted) offset are re-lexed and
+        re-parsed. The other statements, and their parse trees, are reused.
+        :param document: The document before the edit.
+        :param start: The offset of the start of the replaced text.
+        :param end: The offset after the end of the replaced text.
+        :param replacement: The text replacing document.text[start:end].
+        :return: The parsed document after the edit.
+        """
+        if not 0 <= start <= end <= len(document.text):
+            raise ValueError(f"Invalid edit range {start}:{end}.")
+        text = document.text[:start] + replacement + document.text[end:]
+        delta = len(replacement) - (end - start)
+
+        # Re-lex from the statement with the character before the edit, or
+        # from an earlier invalid symbol which may start a string literal
+        first = max(bisect_right(document.starts, start - 1) - 1, 0)
+        for index, statement in enumerate(document.statements[:first]):
+            if statement.has_invalid_symbol:
+                first = index
+                break
+        while True:
+            pos = document.starts[first] if document.starts else 0
+            starts: list[int] = []
+            groups: list[list[TerminalSymbol]] = []
+            resume = first + 1
+            for token, token_start, _ in self.lexer.scan(text, pos):
+                if not groups:
+                    starts.append(pos)
+                    groups.append([])
+                elif isinstance(token, IfLiteral):
+                    # Reuse the rest of the document from an unchanged IF
+                    while resume < len(document.starts) and (
+                        document.starts[resume] < end
+                        or document.starts[resume] + delta < token_start
+                    ):
+                        resume += 1
+                    if (
+                        resume < len(document.starts)
+                        and document.starts[resume] + delta == token_start
+                    ):
+                        break
+                    starts.append(token_start)
+                    groups.append([])
+                groups[-1].append(token)
+            else:
+                resume = len(document.starts)
+            # The edit may have joined the first statement to the one before
+            if first == 0 or groups and isinstance(groups[0][0], IfLiteral):
+                break
+            first -= 1
+
+        return ParsedDocument(
+            text,
+            document.starts[:first]
+            + starts
+            + [s + delta for s in document.starts[resume:]],
+            document.statements[:first]
+            + [self._parse_statement(tokens) for tokens in groups]
+            + document.statements[resume:],
+        )
+
+    def validate_document(self, document: ParsedDocument) -> ValidationResult:
+        """
+        Validate a parsed document with the same result as validate
+        :param document: A parsed document.
+        :return: The result of the validation.
+        """
+        if not document.statements:
+            error = DSLSyntaxError("Input cannot be parsed.")
+            return ValidationResult(False, error=error)
+        # Lexing errors come first, then parsing errors, then action errors
+        invalid = [s for s in document.statements if s.error is not None]
+        if invalid:
+            error = min(
+                invalid,
+                key=lambda s: (
+                    not s.has_invalid_symbol,
+                    not isinstance(s.error, DSLSyntaxError),
+                ),
+            ).error
+            if not isinstance(error, (DSLSyntaxError, DSLValidationError)):
+                raise error
+            return ValidationResult(False, error=error)
+        return ValidationResult(
+            True, actions=[a for s in document.statements for a in s.actions]
+        )
+
+    def _parse_statement(
+        self, tokens: list[TerminalSymbol]
+    ) -> ParsedStatement:
+        """Parse and validate the tokens of an IF statement."""
+        for token in tokens:
+            if isinstance(token, InvalidSymbol):
+                error = DSLSyntaxError(f"Unknown syntax {token.lexeme}.")
+                return ParsedStatement(
+                    tokens, error=error, has_invalid_symbol=True
+                )
+        try:
+            tree = self.parser.parse(tokens, start_symbol=IfStatementSymbol())
+            evaluable = self.parser.reduce(tree[0])[0]
+        except DSLSyntaxError as err:
+            return ParsedStatement(tokens, error=err)
+        if not isinstance(evaluable, Evaluable):
+            error = DSLValidationError(f"{evaluable=} is not an Evaluable.")
+            return ParsedStatement(tokens, tree[0], error=error)
+        try:
+            actions = self.get_actions(evaluable)
+        except DSLException as err:
+            return ParsedStatement(tokens, tree[0], evaluable, error=err)
+        return ParsedStatement(tokens, tree[0], evaluable, actions)
+
     def get_actions(self, evaluable: Evaluable) -> list[EvaluableAction]:
         """
         Get a list of evaluable actions.
@@ -92,12 +550,17 @@ class DefaultDSL(AbstractDSL):
         :return: A list of evaluable action objects
         """
         actions = []
-        for item in evaluable.contents:
-            if isinstance(item, EvaluableAction):
-                self.validate_action(item)
-                actions.append(item)
-            elif isinstance(item, Evaluable):
-                actions.extend(self.get_actions(item))
+        stack = [iter(evaluable.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableAction):
+                    self.validate_action(item)
+                    actions.append(item)
+                elif isinstance(item, Evaluable):
+                    stack.append(iter(item.contents))
+                    break
+            else:
+                stack.pop()
         return actions
 
     @staticmethod
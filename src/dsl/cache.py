@@ -0,0 +1,167 @@
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    """
+    Statistics of a cache.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int | None
+    weight: int = 0
+    maxweight: int | None = None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a file so that readers see either its old or its new contents. The
+    data is written to a temporary file unique to the writer, which replaces
+    the file, so concurrent writers do not overwrite each other's data.
+    :param path: The file to write to.
+    :param data: The contents of the file.
+    :return: None
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file = tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with file:
+            file.write(data)
+        Path(file.name).replace(path)
+    except BaseException:
+        Path(file.name).unlink(missing_ok=True)
+        raise
+
+
+class Identity:
+    """
+    A hashable key for an object, such as a dict, compared by identity. The
+    key holds the object so that its id is not reused while the key lives.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: object):
+        """
+        :param value: The object.
+        """
+        self.value = value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Identity) and other.value is self.value
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A thread-safe cache which evicts the least recently used values once it
+    holds more than maxsize values, or once the total weight of its values
+    is more than maxweight.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 128,
+        maxweight: int | None = None,
+        weigh: Callable[[V], int] | None = None,
+    ):
+        """
+        :param maxsize: The maximum number of values, or None for no limit.
+        :param maxweight: The maximum total weight, or None for no limit.
+        :param weigh: A function giving the weight of a value, such as its
+        approximate size in bytes. Values weigh nothing without it.
+        """
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.values: OrderedDict[K, V] = OrderedDict()
+        self.weights: dict[K, int] = {}
+        self.weight = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: K, create: Callable[[], V]) -> V:
+        """
+        Get the value of a key, creating and caching it if it is not cached
+        :param key: The key of the value.
+        :param create: A function creating the value.
+        :return: The value.
+        """
+        with self.lock:
+            if key in self.values:
+                self.hits += 1
+                self.values.move_to_end(key)
+                return self.values[key]
+            self.misses += 1
+
+        # Create outside the lock so slow values do not block other keys
+        value = create()
+        weight = self.weigh(value) if self.weigh is not None else 0
+        with self.lock:
+            self.weight += weight - self.weights.get(key, 0)
+            self.values[key] = value
+            self.weights[key] = weight
+            self.values.move_to_end(key)
+            while self.values and self._is_full():
+                evicted, _ = self.values.popitem(last=False)
+                self.weight -= self.weights.pop(evicted)
+                self.evictions += 1
+        return value
+
+    def _is_full(self) -> bool:
+        """Whether the cache holds too many values or too much weight."""
+        return (
+            self.maxsize is not None
+            and len(self.values) > self.maxsize
+            or self.maxweight is not None
+            and self.weight > self.maxweight
+        )
+
+    def clear(self) -> None:
+        """
+        Remove every value and reset the statistics
+        :return: None
+        """
+        with self.lock:
+            self.values.clear()
+            self.weights.clear()
+            self.weight = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        :return: The statistics of the cache.
+        """
+        with self.lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self.values),
+                self.maxsize,
+                self.weight,
+                self.maxweight,
+            )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.values
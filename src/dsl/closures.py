@@ -0,0 +1,369 @@
+"""
+Compilation of execution trees into nested Python closures.
+
+Each node of an execution tree is compiled once into a closure over its
+compiled children, taking the evaluation context: variables become lookups,
+literals become constants, operators become the functions of the operator
+module or their bound evaluate methods, and IF/ELIF/ELSE chains become
+plain conditionals. Evaluating the closures does no isinstance checks,
+structural matching or deque work. Parts of a tree which cannot be compiled
+are evaluated by the tree itself, so the closures have the same outcome as
+the tree they were compiled from.
+"""
+import operator
+from collections import deque
+from dataclasses import MISSING
+from typing import Any, Callable
+
+from dsl.compiled import Backend
+from dsl.models.context import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.actions import Action
+from dsl.models.representables.evaluables import (
+    Evaluable,
+    EvaluableAction,
+    EvaluableActionArg,
+    EvaluableBlock,
+    EvaluableExpression,
+    EvaluableIfStatement,
+    EvaluableList,
+    EvaluableListArg,
+)
+from dsl.models.representables.operands import (
+    BoolOperand,
+    ConstantOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    Operand,
+    StringOperand,
+    VariableOperand,
+)
+from dsl.models.representables.operators import (
+    AndOperator,
+    BinaryOperator,
+    DivOperator,
+    GreaterThanOperator,
+    GreaterThanOrEqualOperator,
+    IndexingOperator,
+    LessThanOperator,
+    LessThanOrEqualOperator,
+    MinusOperator,
+    ModOperator,
+    MultOperator,
+    Operator,
+    OrOperator,
+    PlusOperator,
+    UnitaryOperator,
+)
+
+Closure = Callable[[EvaluationContext | None], Any]
+
+# Operands whose value is a constant
+CONSTANT_OPERANDS = (
+    BoolOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    StringOperand,
+)
+
+# Functions of the operators which evaluate as the operator module does.
+# Equality, NOT, AND and OR also compare lists elementwise so keep their
+# evaluate methods.
+OPERATOR_FUNCTIONS: dict[type[Operator], Callable[[Any, Any], Any]] = {
+    DivOperator: operator.truediv,
+    GreaterThanOperator: operator.gt,
+    GreaterThanOrEqualOperator: operator.ge,
+    LessThanOperator: operator.lt,
+    LessThanOrEqualOperator: operator.le,
+    MinusOperator: operator.sub,
+    ModOperator: operator.mod,
+    MultOperator: operator.mul,
+    PlusOperator: operator.add,
+}
+
+
+class ClosureCompiler(Backend):
+    """
+    Compiles execution trees into nested closures.
+    """
+
+    def compile(self, tree: Evaluable) -> Closure:
+        """
+        Compile an execution tree into a closure
+        :param tree: An execution tree.
+        :return: A closure with the same outcome as the tree.
+        """
+        return self._value(tree)
+
+    def _value(self, item: Any) -> Closure:
+        """Compile an operand or Evaluable into a closure of its value."""
+        if isinstance(item, Operand):
+            return self._operand(item)
+        if isinstance(item, EvaluableExpression):
+            return self._expression(item)
+        if isinstance(item, EvaluableIfStatement):
+            return self._statement(item)
+        if isinstance(item, EvaluableAction):
+            return self._action(item)
+        if isinstance(item, EvaluableList):
+            return self._list(
+                item.contents, EvaluableListArg, (Operand, EvaluableList)
+            )
+        if isinstance(item, EvaluableBlock):
+            return self._block(item)
+        return item.evaluate
+
+    def _block(self, block: EvaluableBlock) -> Closure:
+        """Compile a block into a closure of the outputs of its statements."""
+        statements: list[Closure] = []
+        stack = [iter(block.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                closure = self._value(item)
+                if not isinstance(item, EvaluableIfStatement):
+                    closure = self._dropped(closure)
+                statements.append(closure)
+            else:
+                stack.pop()
+
+        def block_closure(context: EvaluationContext | None) -> Any:
+            outputs = []
+            for statement in statements:
+                output = statement(context)
+                if output is not MISSING:
+                    outputs.append(output)
+            return outputs
+
+        return block_closure
+
+    @staticmethod
+    def _dropped(closure: Closure) -> Closure:
+        """Wrap a closure whose value is not an output of its block."""
+
+        def dropped(context: EvaluationContext | None) -> Any:
+            closure(context)
+            return MISSING
+
+        return dropped
+
+    @staticmethod
+    def _operand(operand: Operand) -> Closure:
+        """Compile an operand into a closure of its value."""
+        if type(operand) is VariableOperand:
+            name, bound = operand.token_value, operand.variables
+
+            def variable(context: EvaluationContext | None) -> Any:
+                try:
+                    if context is None:
+                        return bound[name]
+                    return context.variables[name]
+                except KeyError as err:
+                    raise DSLRuntimeError(f"{name} does not exist.") from err
+
+            return variable
+        if type(operand) in CONSTANT_OPERANDS or (
+            type(operand) is ConstantOperand
+            and not isinstance(operand.constant, list)
+        ):
+            value = operand.true_value
+            return lambda context: value
+        return operand.resolve
+
+    def _statement(self, statement: EvaluableIfStatement) -> Closure:
+        """Compile an IF statement into conditionals."""
+        branches = statement.branches()
+        if branches is None:
+            return statement.evaluate
+        otherwise: Closure | None = None
+        if branches[-1][0] is None:
+            otherwise = self._action(branches.pop()[1])
+        conditions = [
+            (self._value(condition), self._action(action))
+            for condition, action in branches
+        ]
+        if len(conditions) == 1:
+            [(condition, action)] = conditions
+            if otherwise is None:
+                return lambda context: (
+                    action(context) if condition(context) else MISSING
+                )
+            orelse = otherwise
+            return lambda context: (
+                action(context) if condition(context) else orelse(context)
+            )
+
+        def statement_closure(context: EvaluationContext | None) -> Any:
+            for condition, action in conditions:
+                if condition(context):
+                    return action(context)
+            if otherwise is None:
+                return MISSING
+            return otherwise(context)
+
+        return statement_closure
+
+    def _action(self, action: EvaluableAction) -> Closure:
+        """Compile an action into a closure calling it with its args."""
+        if not action.contents or not isinstance(action.contents[0], Action):
+            return action.evaluate
+        execute = action.contents[0].execute
+        args = self._list(
+            action.contents[1:], EvaluableActionArg, (Operand, EvaluableList)
+        )
+        return lambda context: execute(*args(context))
+
+    def _list(
+        self,
+        contents: list[Any],
+        chain_type: type[Evaluable],
+        appended: tuple[type, ...],
+    ) -> Closure:
+        """
+        Compile the contents of an Evaluable into a closure building a list
+        of them. Items of the chain of nested args are added to the same list.
+        :param contents: The contents of a list or the args of an action.
+        :param chain_type: The type of the nested args.
+        :param appended: The types of the items appended rather than
+        extended into the list, which are only operands in nested args.
+        :return: The closure.
+        """
+        items: list[tuple[Closure, bool]] = []
+        stack = [(iter(contents), appended)]
+        while stack:
+            values, types = stack[-1]
+            for item in values:
+                if isinstance(item, chain_type):
+                    stack.append((iter(item.contents), (Operand,)))
+                    break
+                if isinstance(item, types):
+                    items.append((self._value(item), True))
+                elif isinstance(item, Evaluable):
+                    items.append((self._value(item), False))
+            else:
+                stack.pop()
+
+        if all(is_appended for _, is_appended in items):
+            closures = [closure for closure, _ in items]
+            return lambda context: [closure(context) for closure in closures]
+
+        def list_closure(context: EvaluationContext | None) -> Any:
+            values: list[Any] = []
+            for closure, is_appended in items:
+                if is_appended:
+                    values.append(closure(context))
+                else:
+                    values.extend(closure(context))
+            return values
+
+        return list_closure
+
+    def _expression(self, expression: EvaluableExpression) -> Closure:
+        """
+        Compile an expression by following EvaluableExpression.evaluate with
+        the closure of each operand in place of its value. Expressions whose
+        operands would be applied out of order are evaluated by the tree.
+        """
+        operators: deque[UnitaryOperator | BinaryOperator] = deque()
+        operands: deque[tuple[Closure, Operand | None]] = deque()
+        for item in expression.contents:
+            if isinstance(item, (UnitaryOperator, BinaryOperator)):
+                operators.append(item)
+            elif (
+                isinstance(item, (Evaluable, Operand))
+                and len(operators) == 1
+                and len(operands) == 1
+                and isinstance(operators[0], (AndOperator, OrOperator))
+            ):
+                # The right operand is skipped if the left operand decides
+                binary = operators.popleft()
+                x, _ = operands.pop()
+                y = self._value(item)
+                closure = self._short_circuit(binary, x, y)
+                operands.append((closure, None))
+                continue
+            if isinstance(item, (Evaluable, Operand)):
+                operand = item if isinstance(item, Operand) else None
+                operands.append((self._value(item), operand))
+
+            if not operators:
+                continue
+
+            if operands and isinstance(operators[0], UnitaryOperator):
+                unary = operators.popleft()
+                x, _ = operands.pop()
+                operands.append((self._unary(unary, x), None))
+            elif len(operands) > 1 and isinstance(
+                operators[0], BinaryOperator
+            ):
+                if len(operands) > 2:
+                    return expression.evaluate
+                binary = operators.popleft()
+                (x, _), (y, right) = operands.popleft(), operands.popleft()
+                operands.append((self._binary(binary, x, y, right), None))
+
+        if operators or len(operands) != 1:
+            # Evaluating the expression raises the error
+            return expression.evaluate
+        closure, _ = operands.pop()
+        return closure
+
+    @staticmethod
+    def _unary(unary: UnitaryOperator, x: Closure) -> Closure:
+        """Compile a unary operator applied to an operand."""
+        if type(unary) is IndexingOperator:
+            function = operator.itemgetter(int(unary.token_value[1:-1]) - 1)
+        else:
+            function = unary.evaluate
+        return lambda context: function(x(context))
+
+    @staticmethod
+    def _binary(
+        binary: BinaryOperator,
+        x: Closure,
+        y: Closure,
+        right: Operand | None,
+    ) -> Closure:
+        """
+        Compile a binary operator applied to two operands, passing a
+        constant right operand directly to the function.
+        """
+        function = OPERATOR_FUNCTIONS.get(type(binary), binary.evaluate)
+        if type(right) in CONSTANT_OPERANDS or (
+            type(right) is ConstantOperand
+            and not isinstance(right.constant, list)
+        ):
+            value = right.true_value
+            return lambda context: function(x(context), value)
+        return lambda context: function(x(context), y(context))
+
+    @staticmethod
+    def _short_circuit(
+        binary: BinaryOperator, x: Closure, y: Closure
+    ) -> Closure:
+        """
+        Compile an AND/OR whose right operand is not evaluated if the left
+        operand is a scalar which is falsy for AND or truthy for OR.
+        """
+        function = binary.evaluate
+        if isinstance(binary, AndOperator):
+
+            def and_closure(context: EvaluationContext | None) -> Any:
+                value = x(context)
+                if not value and not isinstance(value, list):
+                    return value
+                return function(value, y(context))
+
+            return and_closure
+
+        def or_closure(context: EvaluationContext | None) -> Any:
+            value = x(context)
+            if value and not isinstance(value, list):
+                return value
+            return function(value, y(context))
+
+        return or_closure
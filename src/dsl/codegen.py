@@ -0,0 +1,591 @@
+"""
+Compilation of execution trees into Python source code.
+
+A RuleGenerator translates an execution tree into the source of a module
+defining one function, rule, which takes an evaluation context. IF/ELIF/ELSE
+chains become if statements, arithmetic and comparisons become Python
+operators, and variables become lookups in the variables of the context.
+Every lookup and operator is assigned to a local in the order the tree
+evaluates them, so errors are raised in the same order. Actions and the
+remaining operators are imported and called, and parts of a tree which
+cannot be generated are evaluated by the tree itself.
+
+A PythonCompiler compiles the source with compile(). Given a cache
+directory, it also marshals the code object of each rule to disk, so a
+process started later loads the function of a rule without lexing, parsing
+or generating it again.
+"""
+import hashlib
+import importlib.util
+import logging
+import marshal
+import math
+import sys
+from collections import deque
+from pathlib import Path
+from types import CodeType
+from typing import Any, Mapping
+
+from dsl.cache import write_atomic
+from dsl.compiled import Backend, Executable
+from dsl.models.representables.actions import Action
+from dsl.models.representables.evaluables import (
+    Evaluable,
+    EvaluableAction,
+    EvaluableActionArg,
+    EvaluableBlock,
+    EvaluableExpression,
+    EvaluableIfStatement,
+    EvaluableList,
+    EvaluableListArg,
+)
+from dsl.models.representables.operands import (
+    BoolOperand,
+    ConstantOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    Operand,
+    StringOperand,
+    VariableOperand,
+)
+from dsl.models.representables.operators import (
+    AndOperator,
+    BinaryOperator,
+    CountFunction,
+    DivOperator,
+    GreaterThanOperator,
+    GreaterThanOrEqualOperator,
+    IndexingOperator,
+    LessThanOperator,
+    LessThanOrEqualOperator,
+    MinusOperator,
+    ModOperator,
+    MultOperator,
+    Operator,
+    OrOperator,
+    PlusOperator,
+    UnitaryOperator,
+)
+
+logger = logging.getLogger(__name__)
+
+# The version of the generated source, which keys the code cached on disk
+FORMAT_VERSION = 1
+
+# Lines of generated code, and the expression of the value they compute
+Fragment = tuple[list[str], str]
+
+# Operands whose value is a constant
+CONSTANT_OPERANDS = (
+    BoolOperand,
+    ConstantOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    StringOperand,
+)
+
+# Python operators of the operators which evaluate as they do. Equality,
+# NOT, AND and OR also compare lists elementwise so are called instead.
+OPERATOR_SYMBOLS: dict[type[Operator], str] = {
+    DivOperator: "/",
+    GreaterThanOperator: ">",
+    GreaterThanOrEqualOperator: ">=",
+    LessThanOperator: "<",
+    LessThanOrEqualOperator: "<=",
+    MinusOperator: "-",
+    ModOperator: "%",
+    MultOperator: "*",
+    PlusOperator: "+",
+}
+
+HEADER = '''"""
+Rule generated from an execution tree by dsl.codegen. Do not edit.
+"""
+from dataclasses import MISSING as _MISSING
+
+from dsl.models.exceptions import DSLRuntimeError as _DSLRuntimeError
+'''
+
+
+def indent(lines: list[str]) -> list[str]:
+    """Indent lines of generated code by one level."""
+    return [f"    {line}" for line in lines]
+
+
+class RuleGenerator:
+    """
+    Generate the Python source of a module evaluating an execution tree.
+
+    The function of the module looks variables up in the variables of its
+    context, or in BOUND, a global holding the variables bound when the rule
+    was lexed, if it is given None. Objects which cannot be imported by the
+    module are globals named in references, which a module must be given to
+    run, so only modules without references can be cached on disk.
+    """
+
+    def __init__(self) -> None:
+        self.names: dict[type, str] = {}
+        self.globals: dict[Any, tuple[str, str]] = {}
+        self.references: dict[str, Any] = {}
+        self.bound: dict[str, Any] | None = None
+        self.temps = 0
+
+    def generate(self, tree: Evaluable) -> str:
+        """
+        Generate the source of the module of an execution tree.
+        :param tree: An execution tree.
+        :return: Python source code.
+        """
+        self.names, self.globals, self.references = {}, {}, {}
+        self.bound, self.temps = None, 0
+        if isinstance(tree, EvaluableBlock):
+            body = self._block(tree)
+        elif isinstance(tree, EvaluableIfStatement):
+            body = self._statement(tree, None)
+        else:
+            lines, value = self._value(tree)
+            body = lines + [f"return {value}"]
+        function = [
+            "def rule(context):",
+            "    variables = BOUND if context is None else context.variables",
+            *indent(body),
+        ]
+        definitions = "".join(
+            f"{name} = {definition}\n"
+            for name, definition in self.globals.values()
+        )
+        imports = "".join(
+            f"from {imported.__module__} import "
+            f"{imported.__qualname__} as {name}\n"
+            for imported, name in self.names.items()
+        )
+        return "\n\n".join(
+            filter(
+                None,
+                [HEADER + imports, definitions, "\n".join(function) + "\n"],
+            )
+        )
+
+    def _temp(self) -> str:
+        """Get a new local of the function."""
+        self.temps += 1
+        return f"_{self.temps}"
+
+    def _name(self, imported: type) -> str | None:
+        """
+        Get the name a class is imported as in the module, or None if the
+        module cannot import it.
+        """
+        if imported not in self.names:
+            module = sys.modules.get(imported.__module__)
+            if getattr(module, imported.__qualname__, None) is not imported:
+                return None
+            name = f"_{imported.__name__}"
+            if name in self.names.values():
+                name += f"_{len(self.names)}"
+            self.names[imported] = name
+        return self.names[imported]
+
+    def _reference(self, value: Any) -> str:
+        """Get the global of an object the module is given to run."""
+        name = f"_r{len(self.references)}"
+        self.references[name] = value
+        return name
+
+    def _global(self, key: Any, definition: str) -> str:
+        """Get the global defined once by the module for a key."""
+        if key not in self.globals:
+            self.globals[key] = (f"_g{len(self.globals)}", definition)
+        return self.globals[key][0]
+
+    def _function(self, representable: Action | Operator) -> str:
+        """
+        Get the global of the execute method of an action or the evaluate
+        method of an operator, constructing it in the module if possible.
+        """
+        name = self._name(type(representable))
+        if isinstance(representable, Action):
+            if name is not None and not vars(representable):
+                return self._global(type(representable), f"{name}().execute")
+            return self._reference(representable.execute)
+        token_value = representable.token_value
+        if (
+            name is not None
+            and isinstance(token_value, str)
+            and vars(representable) == {"token_value": token_value}
+        ):
+            return self._global(
+                (type(representable), token_value),
+                f"{name}({token_value!r}).evaluate",
+            )
+        return self._reference(representable.evaluate)
+
+    @staticmethod
+    def _literal(value: Any) -> str | None:
+        """
+        Get a Python literal of a constant, or None if it has none. List
+        literals build a new list each time they are evaluated.
+        """
+        if value is None or type(value) in (bool, int, str):
+            return repr(value)
+        if type(value) is float:
+            return repr(value) if math.isfinite(value) else None
+        if type(value) is list:
+            items = [RuleGenerator._literal(item) for item in value]
+            if None in items:
+                return None
+            return f"[{', '.join(items)}]"  # type: ignore[arg-type]
+        return None
+
+    def _value(self, item: Any) -> Fragment:
+        """Generate the code computing the value of an operand or Evaluable."""
+        if isinstance(item, Operand):
+            return self._operand(item)
+        if isinstance(item, EvaluableExpression):
+            return self._expression(item)
+        if isinstance(item, EvaluableAction):
+            return self._action(item)
+        if isinstance(item, EvaluableList):
+            lines, values = self._list(
+                item.contents, EvaluableListArg, (Operand, EvaluableList)
+            )
+            return lines, f"[{', '.join(values)}]"
+        return self._evaluated(item)
+
+    def _evaluated(self, item: Any) -> Fragment:
+        """Generate the code evaluating an Evaluable with the tree."""
+        temp = self._temp()
+        return [f"{temp} = {self._reference(item.evaluate)}(context)"], temp
+
+    def _block(self, block: EvaluableBlock) -> list[str]:
+        """Generate the code appending the outputs of a block to outputs."""
+        lines = ["outputs = []"]
+        stack = [iter(block.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                if isinstance(item, EvaluableIfStatement):
+                    lines += self._statement(item, "outputs")
+                else:
+                    # Only the outputs of IF statements are kept
+                    item_lines, value = self._value(item)
+                    lines += item_lines + [value]
+            else:
+                stack.pop()
+        return lines + ["return outputs"]
+
+    def _operand(self, operand: Operand) -> Fragment:
+        """Generate the code looking up the value of an operand."""
+        if type(operand) is VariableOperand:
+            if self.bound is None:
+                self.bound = operand.variables
+            variables = "variables"
+            # Operands bound to no variables do not share an empty dict
+            if operand.variables is not self.bound and (
+                operand.variables or self.bound
+            ):
+                bound = self._reference(operand.variables)
+                variables = f"({bound} if context is None else variables)"
+            temp, name = self._temp(), operand.token_value
+            return [
+                "try:",
+                f"    {temp} = {variables}[{name!r}]",
+                "except KeyError as err:",
+                f"    raise _DSLRuntimeError({name + ' does not exist.'!r})"
+                " from err",
+            ], temp
+        if type(operand) in CONSTANT_OPERANDS:
+            literal = self._literal(operand.true_value)
+            if literal is not None:
+                return [], literal
+        temp = self._temp()
+        return [f"{temp} = {self._reference(operand.resolve)}(context)"], temp
+
+    def _statement(
+        self, statement: EvaluableIfStatement, outputs: str | None
+    ) -> list[str]:
+        """
+        Generate the code of an IF statement, which appends the outcome of
+        the action of its first true condition to a list of outputs, or
+        returns it if there is no list.
+        """
+        branches = statement.branches()
+        if branches is None:
+            lines, value = self._evaluated(statement)
+            if outputs is None:
+                return lines + [f"return {value}"]
+            return lines + [
+                f"if {value} is not _MISSING:",
+                f"    {outputs}.append({value})",
+            ]
+
+        def branch(action: EvaluableAction) -> list[str]:
+            lines, value = self._action(action)
+            if outputs is None:
+                return lines + [f"return {value}"]
+            return lines + [
+                f"if {value} is not _MISSING:",
+                f"    {outputs}.append({value})",
+            ]
+
+        lines: list[str] = []
+        if outputs is not None and len(branches) > 1:
+            # Each branch breaks out of a loop run once, so ELIF conditions
+            # are not nested deeper than their IF
+            for condition, action in branches:
+                if condition is None:
+                    lines += branch(action)
+                    break
+                condition_lines, value = self._value(condition)
+                lines += condition_lines + [f"if {value}:"]
+                lines += indent(branch(action) + ["break"])
+            return ["while True:", *indent(lines + ["break"])]
+
+        for condition, action in branches:
+            if condition is None:
+                return lines + branch(action)
+            condition_lines, value = self._value(condition)
+            lines += condition_lines + [f"if {value}:"]
+            lines += indent(branch(action))
+        return lines + (["return _MISSING"] if outputs is None else [])
+
+    def _action(self, action: EvaluableAction) -> Fragment:
+        """Generate the code calling an action with its args."""
+        if not action.contents or not isinstance(action.contents[0], Action):
+            return self._evaluated(action)
+        execute = self._function(action.contents[0])
+        lines, args = self._list(
+            action.contents[1:], EvaluableActionArg, (Operand, EvaluableList)
+        )
+        temp = self._temp()
+        return lines + [f"{temp} = {execute}({', '.join(args)})"], temp
+
+    def _list(
+        self,
+        contents: list[Any],
+        chain_type: type[Evaluable],
+        appended: tuple[type, ...],
+    ) -> tuple[list[str], list[str]]:
+        """
+        Generate the code computing the items of a list or the args of an
+        action. Items of the chain of nested args are added to the same list.
+        :param contents: The contents of a list or the args of an action.
+        :param chain_type: The type of the nested args.
+        :param appended: The types of the items appended rather than
+        extended into the list, which are only operands in nested args.
+        :return: The lines of code, and the expression of each item, starred
+        if it is extended into the list.
+        """
+        lines: list[str] = []
+        values: list[str] = []
+        stack = [(iter(contents), appended)]
+        while stack:
+            items, types = stack[-1]
+            for item in items:
+                if isinstance(item, chain_type):
+                    stack.append((iter(item.contents), (Operand,)))
+                    break
+                if isinstance(item, (Operand, Evaluable)):
+                    item_lines, value = self._value(item)
+                    lines += item_lines
+                    values.append(
+                        value if isinstance(item, types) else f"*{value}"
+                    )
+            else:
+                stack.pop()
+        return lines, values
+
+    def _expression(self, expression: EvaluableExpression) -> Fragment:
+        """
+        Generate an expression by following EvaluableExpression.evaluate
+        with the code of each operand in place of its value. Expressions
+        whose operands would be applied out of order are evaluated by the
+        tree.
+        """
+        operators: deque[UnitaryOperator | BinaryOperator] = deque()
+        operands: deque[Fragment] = deque()
+        for item in expression.contents:
+            if isinstance(item, (UnitaryOperator, BinaryOperator)):
+                operators.append(item)
+            elif (
+                isinstance(item, (Evaluable, Operand))
+                and len(operators) == 1
+                and len(operands) == 1
+                and isinstance(operators[0], (AndOperator, OrOperator))
+            ):
+                # The right operand is skipped if the left operand decides
+                binary = operators.popleft()
+                x = operands.pop()
+                operands.append(
+                    self._short_circuit(binary, x, self._value(item))
+                )
+                continue
+            if isinstance(item, (Evaluable, Operand)):
+                operands.append(self._value(item))
+
+            if not operators:
+                continue
+
+            if operands and isinstance(operators[0], UnitaryOperator):
+                unary = operators.popleft()
+                operands.append(self._unary(unary, operands.pop()))
+            elif len(operands) > 1 and isinstance(
+                operators[0], BinaryOperator
+            ):
+                if len(operands) > 2:
+                    return self._evaluated(expression)
+                binary = operators.popleft()
+                x, y = operands.popleft(), operands.popleft()
+                operands.append(self._binary(binary, x, y))
+
+        if operators or len(operands) != 1:
+            # Evaluating the expression raises the error
+            return self._evaluated(expression)
+        return operands.pop()
+
+    def _unary(self, unary: UnitaryOperator, x: Fragment) -> Fragment:
+        """Generate a unary operator applied to an operand."""
+        (lines, value), temp = x, self._temp()
+        if type(unary) is IndexingOperator:
+            index = int(unary.token_value[1:-1]) - 1
+            return lines + [f"{temp} = {value}[{index}]"], temp
+        if type(unary) is CountFunction:
+            return lines + [f"{temp} = sum({value})"], temp
+        function = self._function(unary)
+        return lines + [f"{temp} = {function}({value})"], temp
+
+    def _binary(
+        self, binary: BinaryOperator, x: Fragment, y: Fragment
+    ) -> Fragment:
+        """Generate a binary operator applied to two operands."""
+        (x_lines, x_value), (y_lines, y_value) = x, y
+        lines, temp = x_lines + y_lines, self._temp()
+        if type(binary) in OPERATOR_SYMBOLS:
+            symbol = OPERATOR_SYMBOLS[type(binary)]
+            return lines + [f"{temp} = {x_value} {symbol} {y_value}"], temp
+        function = self._function(binary)
+        return lines + [f"{temp} = {function}({x_value}, {y_value})"], temp
+
+    def _short_circuit(
+        self, binary: BinaryOperator, x: Fragment, y: Fragment
+    ) -> Fragment:
+        """
+        Generate an AND/OR whose right operand is not evaluated if the left
+        operand is a scalar which is falsy for AND or truthy for OR.
+        """
+        (x_lines, x_value), (y_lines, y_value) = x, y
+        temp, function = self._temp(), self._function(binary)
+        truth = temp if isinstance(binary, AndOperator) else f"not {temp}"
+        return (
+            x_lines
+            + [
+                f"{temp} = {x_value}",
+                f"if isinstance({temp}, list) or {truth}:",
+            ]
+            + indent(y_lines + [f"{temp} = {function}({temp}, {y_value})"]),
+            temp,
+        )
+
+
+class PythonCompiler(Backend):
+    """
+    Compiles execution trees into Python functions by generating their
+    source. Given a cache directory, the code of each rule is cached in it
+    by the key DefaultDSL derives from the rule text and grammar, and the
+    version of Python and of the generated source.
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None):
+        """
+        :param cache_dir: An optional directory to cache compiled rules in.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    @property
+    def persistent(self) -> bool:
+        """Whether compiled rules are cached on disk."""
+        return self.cache_dir is not None
+
+    def compile(self, tree: Evaluable) -> Executable:
+        """
+        Compile an execution tree into a Python function
+        :param tree: An execution tree.
+        :return: A function with the same outcome as the tree.
+        """
+        return self._compile(tree, None)
+
+    def load(
+        self, key: str, variables: Mapping[str, Any]
+    ) -> Executable | None:
+        """
+        Load the function of a rule from the cache directory
+        :param key: The key the rule was stored by.
+        :param variables: The variables bound by the lexer of the rule.
+        :return: The function, or None if it is not cached.
+        """
+        path = self._cache_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            code = marshal.loads(path.read_bytes())
+            if not isinstance(code, CodeType):
+                raise TypeError(f"{type(code).__name__} is not code.")
+            function = self._function(code, {"BOUND": variables})
+        except (OSError, EOFError, ValueError, TypeError, ImportError) as err:
+            logger.warning("Could not load compiled rule %s: %s", path, err)
+            return None
+        logger.debug("Loaded compiled rule %s", path)
+        return function
+
+    def store(self, key: str, tree: Evaluable) -> Executable:
+        """
+        Compile an execution tree and store its code in the cache directory
+        :param key: The key to store the rule by.
+        :param tree: An execution tree.
+        :return: A function with the same outcome as the tree.
+        """
+        return self._compile(tree, key)
+
+    def _compile(self, tree: Evaluable, key: str | None) -> Executable:
+        """Compile an execution tree, storing its code by a key if given."""
+        generator = RuleGenerator()
+        source = generator.generate(tree)
+        try:
+            code = compile(source, "<rule>", "exec")
+        except (SyntaxError, RecursionError, MemoryError) as err:
+            # Such as trees nested deeper than Python allows
+            logger.debug("Could not compile generated rule: %s", err)
+            return tree.evaluate
+        namespace = {"BOUND": generator.bound or {}, **generator.references}
+        function = self._function(code, namespace)
+
+        path = None if key is None else self._cache_path(key)
+        if path is not None and not generator.references:
+            try:
+                write_atomic(path, marshal.dumps(code))
+            except OSError as err:
+                logger.warning(
+                    "Could not save compiled rule %s: %s", path, err
+                )
+        return function
+
+    @staticmethod
+    def _function(code: CodeType, namespace: dict[str, Any]) -> Executable:
+        """Run the code of a generated module to get its function."""
+        exec(code, namespace)
+        return namespace["rule"]
+
+    def _cache_path(self, key: str) -> Path | None:
+        """Get the file the code of a rule is cached in."""
+        if self.cache_dir is None:
+            return None
+
+        digest = hashlib.sha256(
+            f"{FORMAT_VERSION}\n{importlib.util.MAGIC_NUMBER.hex()}\n"
+            f"{key}".encode()
+        ).hexdigest()
+        return self.cache_dir / f"rule-{digest[:32]}.marshal"
@@ -0,0 +1,687 @@
+"""
+Columnar evaluation of execution trees over columns of variables.
+
+Each operator is applied once to whole columns rather than once per row,
+and IF/ELIF/ELSE chains are resolved by masked selection: each condition is
+only evaluated on the rows which have not already taken a branch, so a row
+sees the same operators as when it is evaluated on its own. NumPy is used if
+it is installed, otherwise columns are evaluated with Python lists.
+"""
+from collections import deque
+from dataclasses import MISSING
+from typing import Any, Callable, Mapping, Sequence
+
+from dsl.models.context import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.actions import ReturnAction
+from dsl.models.representables.evaluables import (
+    Evaluable,
+    EvaluableAction,
+    EvaluableBlock,
+    EvaluableElifStatement,
+    EvaluableExpression,
+    EvaluableIfStatement,
+)
+from dsl.models.representables.keywords import (
+    ElifKeyword,
+    ElseKeyword,
+    IfKeyword,
+    Keyword,
+    ThenKeyword,
+)
+from dsl.models.representables.operands import Operand, VariableOperand
+from dsl.models.representables.operators import (
+    AndOperator,
+    BinaryOperator,
+    DivOperator,
+    EqualOperator,
+    GreaterThanOperator,
+    GreaterThanOrEqualOperator,
+    LessThanOperator,
+    LessThanOrEqualOperator,
+    MinusOperator,
+    ModOperator,
+    MultOperator,
+    NotEqualOperator,
+    NotOperator,
+    OrOperator,
+    PlusOperator,
+    UnitaryOperator,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Types whose values can be shared between the outputs of every row
+IMMUTABLE_TYPES = (bool, int, float, str, type(None))
+
+
+class PythonColumn(list):
+    """A column of values of the pure-Python backend."""
+
+
+class PythonBackend:
+    """
+    Whole-column operations over Python lists. Operators are applied to
+    each pair of values in a comprehension, so a column is evaluated without
+    walking the execution tree once per row.
+    """
+
+    def column(self, values: Sequence[Any]) -> PythonColumn:
+        """Convert the values of a variable into a column."""
+        return PythonColumn(values)
+
+    def is_column(self, value: Any) -> bool:
+        """Whether a value is a column rather than a constant."""
+        return isinstance(value, PythonColumn)
+
+    def rows(self, count: int) -> list[int]:
+        """Get the indices of a number of rows."""
+        return list(range(count))
+
+    def take(self, column: PythonColumn, rows: list[int]) -> PythonColumn:
+        """Select the values of some rows of a column."""
+        return PythonColumn([column[row] for row in rows])
+
+    def truthy(self, value: Any, count: int) -> list[bool]:
+        """Get whether the value of each row is truthy."""
+        if self.is_column(value):
+            return [bool(x) for x in value]
+        return [bool(value)] * count
+
+    def select(
+        self, rows: list[int], mask: list[bool]
+    ) -> tuple[list[int], list[int]]:
+        """Split rows into those whose mask is true and those whose is not."""
+        selected = [row for row, x in zip(rows, mask) if x]
+        rejected = [row for row, x in zip(rows, mask) if not x]
+        return selected, rejected
+
+    def decides(self, x: PythonColumn, is_and: bool) -> list[bool]:
+        """
+        Get whether the value of each row is the value of an AND or OR
+        whatever its right operand is, as in EvaluableExpression.
+        """
+        return [not isinstance(v, list) and bool(v) != is_and for v in x]
+
+    def combine(self, count: int, parts: list[tuple[Any, Any]]) -> Any:
+        """Combine the columns of disjoint sets of rows into one column."""
+        column = PythonColumn([None] * count)
+        for rows, value in parts:
+            self.put(column, rows, value)
+        return column
+
+    def unary(self, operator: UnitaryOperator, x: PythonColumn) -> Any:
+        """Apply a unitary operator to each value of a column."""
+        return PythonColumn([operator.evaluate(value) for value in x])
+
+    def binary(self, operator: BinaryOperator, x: Any, y: Any) -> Any:
+        """Apply a binary operator to the values of each row."""
+        evaluate = operator.evaluate
+        if not self.is_column(x):
+            return PythonColumn([evaluate(x, value) for value in y])
+        if not self.is_column(y):
+            return PythonColumn([evaluate(value, y) for value in x])
+        return PythonColumn([evaluate(i, j) for i, j in zip(x, y)])
+
+    def outputs(self, count: int) -> list[Any]:
+        """Create an output column with no output for any row."""
+        return [MISSING] * count
+
+    def put(self, outputs: list[Any], rows: list[int], value: Any) -> None:
+        """Set the outputs of some rows to a column or a constant."""
+        if self.is_column(value):
+            for row, x in zip(rows, value):
+                outputs[row] = x
+        else:
+            for row in rows:
+                outputs[row] = value
+
+    def to_list(self, column: Any) -> list[Any]:
+        """Convert a column into a list of Python values."""
+        return list(column)
+
+
+class NumpyBackend(PythonBackend):
+    """
+    Whole-column operations over NumPy arrays. Columns of bools or floats
+    are held in typed arrays, and arithmetic, comparison and boolean
+    operators are applied to them with NumPy. Other columns are object
+    arrays whose values each operator is applied to in turn, like the
+    pure-Python backend. These include ints, since fixed-width integers
+    overflow, and strings, since NumPy strings drop trailing NULs.
+    """
+
+    ARITHMETIC_OPERATORS = (
+        PlusOperator,
+        MinusOperator,
+        MultOperator,
+        DivOperator,
+        ModOperator,
+    )
+    KIND_TYPES = {"b": bool, "i": int, "u": int, "f": float}
+    # Ints NumPy converts to float64 without rounding
+    MAX_EXACT_INT = 2**53
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("NumPy is required by NumpyBackend.")
+        self.functions: dict[type, Callable[[Any, Any], Any]] = {
+            PlusOperator: np.add,
+            MinusOperator: np.subtract,
+            MultOperator: np.multiply,
+            DivOperator: np.true_divide,
+            ModOperator: np.mod,
+            GreaterThanOperator: np.greater,
+            GreaterThanOrEqualOperator: np.greater_equal,
+            LessThanOperator: np.less,
+            LessThanOrEqualOperator: np.less_equal,
+            EqualOperator: np.equal,
+            NotEqualOperator: np.not_equal,
+        }
+
+    def column(self, values: Sequence[Any]) -> Any:
+        """
+        Convert the values of a variable into an array, typed if every value
+        is a bool or every value is a float.
+        """
+        if isinstance(values, np.ndarray) and values.ndim == 1:
+            return values
+        types = set(map(type, values))
+        if types == {bool} or types == {float}:
+            return np.array(values, dtype=types.pop())
+        array = np.empty(len(values), dtype=object)
+        for row, value in enumerate(values):
+            array[row] = value
+        return array
+
+    def is_column(self, value: Any) -> bool:
+        """Whether a value is a column rather than a constant."""
+        return isinstance(value, np.ndarray)
+
+    def rows(self, count: int) -> Any:
+        """Get the indices of a number of rows."""
+        return np.arange(count)
+
+    def take(self, column: Any, rows: Any) -> Any:
+        """Select the values of some rows of a column."""
+        return column[rows]
+
+    def truthy(self, value: Any, count: int) -> Any:
+        """Get whether the value of each row is truthy."""
+        if not self.is_column(value):
+            return np.full(count, bool(value))
+        if value.dtype.kind in "biuf":
+            return value.astype(bool)
+        return np.array([bool(x) for x in value.tolist()], dtype=bool)
+
+    def select(self, rows: Any, mask: Any) -> tuple[Any, Any]:
+        """Split rows into those whose mask is true and those whose is not."""
+        return rows[mask], rows[~mask]
+
+    def decides(self, x: Any, is_and: bool) -> Any:
+        """
+        Get whether the value of each row is the value of an AND or OR
+        whatever its right operand is, as in EvaluableExpression.
+        """
+        if x.dtype != object:
+            return self.truthy(x, len(x)) != is_and
+        return np.array(super().decides(x.tolist(), is_and), dtype=bool)
+
+    def combine(self, count: int, parts: list[tuple[Any, Any]]) -> Any:
+        """Combine the columns of disjoint sets of rows into one column."""
+        kinds = {value.dtype.kind for _, value in parts}
+        dtype = (
+            np.result_type(*(value for _, value in parts))
+            if len(kinds) == 1
+            else object
+        )
+        column = np.empty(count, dtype=dtype)
+        for rows, value in parts:
+            self.put(column, rows, value)
+        return column
+
+    def unary(self, operator: UnitaryOperator, x: Any) -> Any:
+        """Apply a unitary operator to a column."""
+        if isinstance(operator, NotOperator) and x.dtype.kind in "biuf":
+            return ~self.truthy(x, len(x))
+        return self._each(operator.evaluate, x)
+
+    def binary(self, operator: BinaryOperator, x: Any, y: Any) -> Any:
+        """Apply a binary operator to the values of each row."""
+        function = self.functions.get(type(operator))
+        if not self._is_numeric(x, y):
+            function = None
+        elif isinstance(operator, (AndOperator, OrOperator)):
+            # Select x or y like the Python operators rather than a bool,
+            # which NumPy can only do without casting one of them
+            if self._kind(x) == self._kind(y):
+                size = len(x) if self.is_column(x) else len(y)
+                is_and = isinstance(operator, AndOperator)
+                return np.where(self.truthy(x, size) == is_and, y, x)
+        elif isinstance(operator, self.ARITHMETIC_OPERATORS):
+            # NumPy adds bools with OR rather than as integers
+            if not self._is_numeric(x, y, kinds="iuf"):
+                function = None
+            elif isinstance(operator, (DivOperator, ModOperator)):
+                if np.any(np.asarray(y) == 0):
+                    raise ZeroDivisionError("division by zero")
+        if function is None:
+            return self._each(operator.evaluate, x, y)
+        return function(x, y)
+
+    def outputs(self, count: int) -> Any:
+        """Create an output column with no output for any row."""
+        return np.full(count, MISSING, dtype=object)
+
+    def put(self, outputs: Any, rows: Any, value: Any) -> None:
+        """Set the outputs of some rows to a column or a constant."""
+        if self.is_column(value) and outputs.dtype == object:
+            value = self._objects(value)
+        outputs[rows] = value
+
+    def to_list(self, column: Any) -> list[Any]:
+        """Convert a column into a list of Python values."""
+        return self._objects(column).tolist()
+
+    def _is_numeric(self, *values: Any, kinds: str = "biuf") -> bool:
+        """
+        Whether each value is a column of one of the kinds of NumPy dtype, or
+        a constant of the Python type of one of the kinds. Ints too large
+        for NumPy to convert exactly are not numeric constants.
+        """
+        types = tuple(self.KIND_TYPES[kind] for kind in kinds)
+        return all(
+            value.dtype.kind in kinds
+            if self.is_column(value)
+            else type(value) in types
+            and (type(value) is not int or abs(value) <= self.MAX_EXACT_INT)
+            for value in values
+        )
+
+    def _kind(self, value: Any) -> str:
+        """Get the kind of NumPy dtype of a column or numeric constant."""
+        if self.is_column(value):
+            return value.dtype.kind
+        return np.asarray(value).dtype.kind
+
+    def _objects(self, column: Any) -> Any:
+        """Convert a column to an object array of Python values."""
+        if column.dtype == object:
+            return column
+        objects = np.empty(len(column), dtype=object)
+        objects[:] = column.tolist()
+        return objects
+
+    def _each(self, function: Callable[..., Any], *values: Any) -> Any:
+        """Apply a Python function to the values of each row."""
+        size = max(len(v) for v in values if self.is_column(v))
+        columns = [
+            self._objects(v).tolist() if self.is_column(v) else [v] * size
+            for v in values
+        ]
+        return self.column([function(*args) for args in zip(*columns)])
+
+
+class Columns(dict):
+    """
+    The columns of a backend, converted from the values of each variable when
+    they are first used.
+    """
+
+    def __init__(
+        self, backend: PythonBackend, values: Mapping[str, Sequence[Any]]
+    ):
+        super().__init__()
+        self.backend = backend
+        self.values = values
+
+    def __missing__(self, name: str) -> Any:
+        self[name] = column = self.backend.column(self.values[name])
+        return column
+
+
+class Rows:
+    """The columns of some of the rows being evaluated."""
+
+    def __init__(
+        self,
+        backend: PythonBackend,
+        columns: Mapping[str, Any],
+        rows: Any,
+        count: int,
+    ):
+        """
+        :param backend: The backend the columns are held in.
+        :param columns: The columns of every row, by variable name.
+        :param rows: The indices of the rows.
+        :param count: The number of rows.
+        """
+        self.backend = backend
+        self.columns = columns
+        self.rows = rows
+        self.count = count
+        self.selected: dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.selected:
+            try:
+                column = self.columns[name]
+            except KeyError as err:
+                raise DSLRuntimeError(f"{name} does not exist.") from err
+            self.selected[name] = self.backend.take(column, self.rows)
+        return self.selected[name]
+
+    def subset(self, rows: Any, count: int) -> "Rows":
+        """Get the columns of some of these rows."""
+        return Rows(self.backend, self.columns, rows, count)
+
+    def contexts(self, names: set[str]) -> list[EvaluationContext]:
+        """Get an evaluation context per row of the variables named."""
+        values = {name: self.backend.to_list(self[name]) for name in names}
+        return [
+            EvaluationContext({name: values[name][i] for name in names})
+            for i in range(self.count)
+        ]
+
+
+class ColumnarEngine:
+    """
+    Evaluate execution trees over columns of variables, with the same
+    outcome per row as evaluating the tree against each row on its own.
+
+    Operators are applied to whole columns, with NumPy if it is installed.
+    A condition is evaluated only on the rows which reach it, so an error
+    is only raised if it would be raised evaluating one of the rows on its
+    own, but it is raised for the whole evaluation. Columns passed in as
+    NumPy arrays keep their dtypes, so arithmetic on them follows NumPy's
+    fixed-width types.
+    """
+
+    def __init__(self, use_numpy: bool | None = None):
+        """
+        :param use_numpy: Whether to evaluate with NumPy, or None to use it
+        if it is installed.
+        """
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY
+        self.backend = NumpyBackend() if use_numpy else PythonBackend()
+
+    def execute(
+        self, tree: Evaluable, columns: Mapping[str, Sequence[Any]]
+    ) -> list[Any]:
+        """
+        Execute an execution tree against each row of some columns
+        :param tree: An execution tree, such as the tree of a compiled rule.
+        :param columns: The values of each variable, with one value per row.
+        :return: The outcome of executing the tree against each row.
+        """
+        values = self.evaluate(tree, columns)
+        if not isinstance(tree, EvaluableBlock):
+            return self.backend.to_list(values[0])
+        outputs = [self.backend.to_list(column) for column in values]
+        return [
+            [output for output in row if output is not MISSING]
+            for row in zip(*outputs)
+        ]
+
+    def evaluate(
+        self, tree: Evaluable, columns: Mapping[str, Sequence[Any]]
+    ) -> list[Any]:
+        """
+        Evaluate an execution tree over some columns without converting the
+        outcome to rows
+        :param tree: An execution tree.
+        :param columns: The values of each variable, with one value per row.
+        :return: One output column per IF statement of a block, with MISSING
+        for the rows where the statement did not fire, or a single column of
+        the value of any other tree.
+        """
+        count = self._count(columns)
+        backend = self.backend
+        rows = Rows(
+            backend, Columns(backend, columns), backend.rows(count), count
+        )
+        if isinstance(tree, EvaluableBlock):
+            return [
+                self._statement(statement, rows)
+                for statement in self._statements(tree)
+            ]
+        if isinstance(tree, EvaluableIfStatement):
+            return [self._statement(tree, rows)]
+        value = self._value(tree, rows)
+        outputs = backend.outputs(count)
+        backend.put(outputs, backend.rows(count), value)
+        return [outputs]
+
+    @staticmethod
+    def _count(columns: Mapping[str, Sequence[Any]]) -> int:
+        """Get the number of rows of some columns."""
+        counts = {len(values) for values in columns.values()}
+        if len(counts) != 1:
+            raise ValueError("Columns must have the same number of rows.")
+        return counts.pop()
+
+    @staticmethod
+    def _statements(block: EvaluableBlock) -> list[EvaluableIfStatement]:
+        """Get the IF statements of a block in order."""
+        statements = []
+        stack = [iter(block.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                if isinstance(item, EvaluableIfStatement):
+                    statements.append(item)
+            else:
+                stack.pop()
+        return statements
+
+    @staticmethod
+    def _branches(
+        statement: EvaluableIfStatement,
+    ) -> tuple[list[tuple[Any, EvaluableAction]], DSLRuntimeError | None]:
+        """
+        Get the condition and action of each branch of an IF statement, as
+        EvaluableIfStatement and EvaluableElifStatement match them. The
+        condition of an ELSE branch is None.
+        :param statement: An IF statement.
+        :return: The branches, and the error raised for the rows which reach
+        the first IF or ELIF statement which cannot be evaluated, if any.
+        """
+        branches: list[tuple[Any, EvaluableAction]] = []
+        contents = statement.contents
+        keyword: type[Keyword] = IfKeyword
+        while True:
+            match contents:
+                case [ElseKeyword(), EvaluableAction() as action] if (
+                    keyword is ElifKeyword
+                ):
+                    branches.append((None, action))
+                    return branches, None
+                case [
+                    Keyword() as found,
+                    EvaluableExpression() | Operand() as condition,
+                    ThenKeyword(),
+                    EvaluableAction() as action,
+                ] if isinstance(found, keyword):
+                    branches.append((condition, action))
+                    return branches, None
+                case [
+                    Keyword() as found,
+                    EvaluableExpression() | Operand() as condition,
+                    ThenKeyword(),
+                    EvaluableAction() as action,
+                    EvaluableElifStatement() as elif_statement,
+                ] if isinstance(found, keyword):
+                    branches.append((condition, action))
+                    contents = elif_statement.contents
+                    keyword = ElifKeyword
+                case _:
+                    name = "IF" if keyword is IfKeyword else "ELIF"
+                    return branches, DSLRuntimeError(
+                        f"Cannot evaluate {name} statement {contents}."
+                    )
+
+    def _statement(self, statement: EvaluableIfStatement, rows: Rows) -> Any:
+        """Evaluate an IF statement by masked selection of its branches."""
+        backend = self.backend
+        outputs = backend.outputs(rows.count)
+        remaining, count = rows.rows, rows.count
+        branches, error = self._branches(statement)
+        for condition, action in branches:
+            if count == 0:
+                break
+            subset = rows.subset(remaining, count)
+            if condition is None:
+                fired, remaining = remaining, remaining[:0]
+            else:
+                mask = backend.truthy(self._value(condition, subset), count)
+                selected, remaining = backend.select(backend.rows(count), mask)
+                fired = backend.take(subset.rows, selected)
+                remaining = backend.take(subset.rows, remaining)
+            count -= len(fired)
+            if len(fired):
+                value = self._action(action, rows.subset(fired, len(fired)))
+                backend.put(outputs, fired, value)
+        if error is not None and count:
+            raise error
+        return outputs
+
+    def _action(self, action: EvaluableAction, rows: Rows) -> Any:
+        """Evaluate an action for some rows."""
+        names = self._variables(action)
+        if not names:
+            value = action.evaluate()
+            if isinstance(value, IMMUTABLE_TYPES):
+                return value
+        match action.contents:
+            case [ReturnAction(), VariableOperand() as operand]:
+                return rows[operand.token_value]
+        return self._each_row(action, rows, names)
+
+    def _value(self, item: Any, rows: Rows) -> Any:
+        """Evaluate an operand or an Evaluable for some rows."""
+        if isinstance(item, VariableOperand):
+            return rows[item.token_value]
+        if isinstance(item, Operand):
+            return item.true_value
+        if isinstance(item, EvaluableExpression):
+            return self._expression(item, rows)
+        names = self._variables(item)
+        if not names:
+            return item.evaluate()
+        return self._each_row(item, rows, names)
+
+    def _expression(self, expression: EvaluableExpression, rows: Rows) -> Any:
+        """
+        Evaluate an expression for some rows in the same order of operations
+        as EvaluableExpression.evaluate, with operators applied to columns.
+        """
+        operators: deque[UnitaryOperator | BinaryOperator] = deque()
+        operands: deque[Any] = deque()
+        for item in expression.contents:
+            if isinstance(item, (UnitaryOperator, BinaryOperator)):
+                operators.append(item)
+            elif (
+                isinstance(item, (Evaluable, Operand))
+                and len(operators) == 1
+                and len(operands) == 1
+                and isinstance(operators[0], (AndOperator, OrOperator))
+            ):
+                operator = operators.popleft()
+                x = operands.pop()
+                operands.append(self._short_circuit(operator, x, item, rows))
+                continue
+            elif isinstance(item, (Evaluable, Operand)):
+                operands.append(self._value(item, rows))
+
+            if not operators:
+                continue
+
+            if operands and isinstance(operators[0], UnitaryOperator):
+                operator = operators.popleft()
+                operands.append(self._apply(operator, operands.pop()))
+            elif len(operands) > 1 and isinstance(
+                operators[0], BinaryOperator
+            ):
+                operator = operators.popleft()
+                x, y = operands.popleft(), operands.popleft()
+                operands.append(self._apply(operator, x, y))
+
+        if operators or len(operands) != 1:
+            raise DSLRuntimeError(
+                f"Evaluation of Evaluable with {expression.contents=} did not "
+                f"collapse to a single value."
+            )
+        return operands.pop()
+
+    def _short_circuit(
+        self,
+        operator: AndOperator | OrOperator,
+        x: Any,
+        item: Any,
+        rows: Rows,
+    ) -> Any:
+        """
+        Apply an AND or OR, evaluating its right operand only for the rows
+        whose left operand does not decide its value.
+        """
+        backend = self.backend
+        is_and = isinstance(operator, AndOperator)
+        if not backend.is_column(x):
+            if not isinstance(x, list) and bool(x) != is_and:
+                return x
+            return self._apply(operator, x, self._value(item, rows))
+        decided, undecided = backend.select(
+            backend.rows(rows.count), backend.decides(x, is_and)
+        )
+        if not len(undecided):
+            return x
+        if not len(decided):
+            return self._apply(operator, x, self._value(item, rows))
+        subset = rows.subset(
+            backend.take(rows.rows, undecided), len(undecided)
+        )
+        value = self._apply(
+            operator, backend.take(x, undecided), self._value(item, subset)
+        )
+        return backend.combine(
+            rows.count,
+            [(decided, backend.take(x, decided)), (undecided, value)],
+        )
+
+    def _apply(self, operator: Any, *values: Any) -> Any:
+        """Apply an operator to columns or constants."""
+        if not any(self.backend.is_column(value) for value in values):
+            return operator.evaluate(*values)
+        if isinstance(operator, UnitaryOperator):
+            return self.backend.unary(operator, *values)
+        return self.backend.binary(operator, *values)
+
+    def _each_row(self, item: Evaluable, rows: Rows, names: set[str]) -> Any:
+        """Evaluate an Evaluable against each row on its own."""
+        return self.backend.column(
+            [item.evaluate(context) for context in rows.contexts(names)]
+        )
+
+    @staticmethod
+    def _variables(evaluable: Evaluable) -> set[str]:
+        """Get the names of the variables of an Evaluable."""
+        names = set()
+        stack = [iter(evaluable.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, VariableOperand):
+                    names.add(item.token_value)
+                elif isinstance(item, Evaluable):
+                    stack.append(iter(item.contents))
+                    break
+            else:
+                stack.pop()
+        return names
@@ -0,0 +1,145 @@
+import re
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, is_dataclass
+from typing import Any, Callable, Mapping
+
+from dsl.models.context import EvaluationContext
+from dsl.models.representables import Representable
+from dsl.models.representables.evaluables import Evaluable
+
+# Runs of whitespace outside of string literals
+WHITESPACE = re.compile(r"('[^']*'|\"[^\"]*\")|[ \n]+")
+
+# A function evaluating an execution tree in an evaluation context
+Executable = Callable[[EvaluationContext | None], Any]
+
+
+class Backend(ABC):
+    """
+    Compiles execution trees into functions which evaluate them, as an
+    alternative to walking the tree with Evaluable.evaluate.
+    """
+
+    @abstractmethod
+    def compile(self, tree: Evaluable) -> Executable:
+        """
+        Compile an execution tree
+        :param tree: An execution tree.
+        :return: A function evaluating the tree in an evaluation context, or
+        in the variables bound when the rule was lexed if it is given None.
+        """
+        ...
+
+    @property
+    def persistent(self) -> bool:
+        """
+        Whether compiled rules are stored for later processes, which load
+        them by key rather than constructing their execution trees.
+        """
+        return False
+
+    def load(
+        self, key: str, variables: Mapping[str, Any]
+    ) -> Executable | None:
+        """
+        Load a rule stored by this or an earlier process
+        :param key: The key the rule was stored by.
+        :param variables: The variables bound by the lexer of the rule.
+        :return: The function evaluating the rule, or None if it is not
+        stored.
+        """
+        return None
+
+    def store(self, key: str, tree: Evaluable) -> Executable:
+        """
+        Compile an execution tree and store it for later processes
+        :param key: The key to store the rule by.
+        :param tree: An execution tree.
+        :return: A function evaluating the tree in an evaluation context.
+        """
+        return self.compile(tree)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """
+    A rule lexed, parsed and reduced once so that it can be executed against
+    many sets of variables. Variables are looked up in an EvaluationContext
+    passed down the execution tree rather than bound when the rule is lexed,
+    and executing a rule does not change it, so one compiled rule can be
+    shared between threads and rows. The tree is evaluated by the function
+    a Backend compiled it into, if it was compiled by one. A rule a Backend
+    loaded from a store has no tree.
+    """
+
+    text: str
+    tree: Evaluable | None
+    executable: Executable | None = field(default=None, compare=False)
+
+    def execute(self, variables: Mapping[str, Any] | None = None) -> Any:
+        """
+        Execute the rule against a set of variables
+        :param variables: The variables of the rule, or None to use the
+        variables of the lexer it was compiled with.
+        :return: The outcome from executing the rule.
+        """
+        context = None if variables is None else EvaluationContext(variables)
+        return self.evaluate(context)
+
+    @property
+    def evaluate(self) -> Executable:
+        """The function evaluating the rule in an evaluation context."""
+        if self.executable is not None:
+            return self.executable
+        if self.tree is None:
+            raise ValueError(f"{self.text!r} has no tree or executable.")
+        return self.tree.evaluate
+
+
+def canonical_form(input_string: str) -> str:
+    """
+    Normalize the whitespace of a rule. Whitespace only separates tokens, so
+    rules with the same canonical form have the same tokens.
+    :param input_string: An input string.
+    :return: The rule with each run of whitespace outside of string literals
+    replaced by a space, and without leading or trailing whitespace.
+    """
+    return WHITESPACE.sub(
+        lambda match: match.group(1) or " ", input_string
+    ).strip(" \n")
+
+
+def approximate_size(*objects: Any) -> int:
+    """
+    Approximate the memory held by execution trees
+    :param objects: Representable objects or dataclasses holding them, such
+    as compiled rules.
+    :return: The approximate size in bytes of the objects, their attributes
+    and their contents, counting shared objects once.
+    """
+    size = 0
+    seen: set[int] = set()
+    stack = list(objects)
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, Representable) or (
+            is_dataclass(item) and not isinstance(item, type)
+        ):
+            attributes = vars(item)
+            size += sys.getsizeof(attributes)
+            # Variables are shared by every operand of a lexer
+            stack.extend(
+                value
+                for name, value in attributes.items()
+                if name != "variables"
+            )
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+    return size
@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+
+from dsl.models.exceptions import DSLException
+from dsl.models.representables.evaluables import Evaluable, EvaluableAction
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol
+from dsl.models.symbols.nonterminals import BlockSymbol
+
+
+@dataclass(frozen=True)
+class ParsedStatement:
+    """
+    An IF statement of a parsed document with the result of parsing it.
+    Statements are not changed once parsed, so they can be shared between
+    the documents of successive edits.
+    """
+
+    tokens: list[TerminalSymbol]
+    tree: NonTerminalSymbol | None = None
+    evaluable: Evaluable | None = None
+    actions: list[EvaluableAction] = field(default_factory=list)
+    error: DSLException | None = None
+    has_invalid_symbol: bool = False
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    """
+    A document parsed one IF statement at a time, so that an edit only
+    re-lexes and re-parses the statements it touches. The statement at
+    index i starts at text offset starts[i]; the first statement starts at 0
+    and each later one at its IF token.
+    """
+
+    text: str
+    starts: list[int]
+    statements: list[ParsedStatement]
+
+    @property
+    def tokens(self) -> list[TerminalSymbol]:
+        """:return: The tokens of the document."""
+        return [token for s in self.statements for token in s.tokens]
+
+    @property
+    def tree(self) -> BlockSymbol | None:
+        """
+        :return: The parse tree of the document, or None if a statement
+        cannot be parsed.
+        """
+        block = None
+        for statement in reversed(self.statements):
+            if statement.tree is None:
+                return None
+            block = BlockSymbol(
+                [statement.tree] if block is None else [statement.tree, block]
+            )
+        return block
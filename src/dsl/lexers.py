@@ -1,7 +1,24 @@
+import io
+import mmap
 import re
+import string
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar
+from array import array
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    BinaryIO,
+    ClassVar,
+    Hashable,
+    Iterator,
+    Mapping,
+    Sequence,
+    overload,
+)
 
+from dsl.cache import CacheInfo, LRUCache
 from dsl.models.exceptions import DSLSyntaxError
 from dsl.models.symbols import TerminalSymbol
 from dsl.models.symbols.terminals import (
@@ -41,6 +58,210 @@ from dsl.models.symbols.terminals import (
     VariableLiteral,
 )
 
+# The parser of the re module is private, so regexes are not analysed (and
+# are all tried) if it is moved
+try:
+    import re._constants as sre_constants
+    import re._parser as sre_parse
+except ImportError:  # pragma: no cover
+    sre_constants = sre_parse = None  # type: ignore[assignment]
+
+
+# Sources are strings, or bytes-like buffers such as mmap regions holding
+# UTF-8 encoded text, or binary files which are memory-mapped if possible
+Buffer = str | bytes | bytearray | memoryview | mmap.mmap
+Source = Buffer | BinaryIO
+
+
+@contextmanager
+def open_buffer(source: Source) -> Iterator[Buffer]:
+    """
+    Get a string or bytes-like buffer of the text of a source. Files are
+    memory-mapped from their current position rather than read where
+    possible, and the map is closed on exit.
+    :param source: A string, bytes-like object or binary file.
+    :return: A context manager of a string or bytes-like object.
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview, mmap.mmap)):
+        yield source
+        return
+    try:
+        position = source.tell()
+        # Maps start at a multiple of the allocation granularity
+        offset = position - position % mmap.ALLOCATIONGRANULARITY
+        region = mmap.mmap(
+            source.fileno(), 0, access=mmap.ACCESS_READ, offset=offset
+        )
+    except (OSError, ValueError, io.UnsupportedOperation):
+        # Such as empty files, in-memory files and pipes
+        yield source.read()
+        return
+    with region, memoryview(region)[position - offset :] as buffer:
+        yield buffer
+
+
+def decode(lexeme: str | bytes | memoryview) -> str:
+    """
+    Decode a lexeme sliced from a buffer
+    :param lexeme: A string, or bytes of UTF-8 encoded text.
+    :return: The lexeme as a string.
+    """
+    return lexeme if isinstance(lexeme, str) else bytes(lexeme).decode()
+
+
+@lru_cache(maxsize=1024)
+def byte_pattern(regex: str) -> re.Pattern[bytes]:
+    """
+    Compile a regex to match UTF-8 encoded text. Character classes such as
+    \\w only match ASCII characters in bytes.
+    :param regex: A regex.
+    :return: The compiled bytes regex.
+    """
+    return re.compile(regex.encode())
+
+
+def unknown_syntax(lexeme: str, source: Source) -> DSLSyntaxError:
+    """
+    Get the error of an invalid symbol. Bytes-like sources and files are
+    split by bytes regexes, which only match ASCII symbols other than string
+    literals, so their other non-ASCII symbols are reported as such.
+    :param lexeme: The lexeme of the invalid symbol.
+    :param source: The input string the symbol was split from.
+    :return: The DSLSyntaxError to raise.
+    """
+    if isinstance(source, str) or lexeme.isascii():
+        return DSLSyntaxError(f"Unknown syntax {lexeme}.")
+    return DSLSyntaxError(
+        f"Unknown syntax {lexeme}. Only string literals can hold non-ASCII "
+        "characters in bytes and files, decode them to split other symbols."
+    )
+
+
+def freeze_trie(trie: Mapping[str | int, Any]) -> Mapping[str | int, Any]:
+    """
+    Make a trie read-only, so that the lexers sharing it cannot change it
+    :param trie: A trie of dicts.
+    :return: The trie of read-only mappings.
+    """
+    return MappingProxyType(
+        {
+            key: freeze_trie(child) if isinstance(child, Mapping) else child
+            for key, child in trie.items()
+        }
+    )
+
+
+def create_token(
+    symbol: type[TerminalSymbol], lexeme: str, variables: dict[str, Any]
+) -> TerminalSymbol:
+    """
+    Create a token object of a symbol
+    :param symbol: The type of terminal symbol.
+    :param lexeme: The lexeme of the token.
+    :param variables: The variables of the lexer.
+    :return: The token object.
+    """
+    if symbol == VariableLiteral:
+        return symbol(lexeme=lexeme, variables=variables)
+    return symbol(lexeme=lexeme)
+
+
+class TokenStream(Sequence[TerminalSymbol]):
+    """
+    A compact sequence of the tokens of an input string. Each token is
+    stored as the index of its symbol and the offsets of its lexeme in the
+    input string, in arrays, and token objects are only created when they
+    are accessed. The input string can be a bytes-like buffer such as an
+    mmap region, whose lexemes are decoded when they are accessed.
+    """
+
+    def __init__(
+        self,
+        source: Buffer,
+        symbols: Sequence[type[TerminalSymbol]],
+        variables: dict[str, Any] | None = None,
+    ):
+        """
+        :param source: The input string or buffer the tokens were split from.
+        :param symbols: The symbols the tokens are indices of.
+        :param variables: The variables of VariableLiteral tokens.
+        """
+        self.source = source
+        self.symbols = tuple(symbols)
+        self.variables = variables or {}
+        self.kinds = array("B" if len(self.symbols) <= 0x100 else "H")
+        offset = "I" if len(source) <= 0xFFFFFFFF else "Q"
+        self.starts = array(offset)
+        self.ends = array(offset)
+        self.resources = ExitStack()
+
+    def append(self, kind: int, start: int, end: int) -> None:
+        """
+        Append a token
+        :param kind: The index of the symbol of the token.
+        :param start: The offset of the start of the lexeme.
+        :param end: The offset after the end of the lexeme.
+        :return: None
+        """
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def symbol_type(self, index: int) -> type[TerminalSymbol]:
+        """
+        :param index: The index of a token.
+        :return: The type of the token, without creating it.
+        """
+        return self.symbols[self.kinds[index]]
+
+    def lexeme(self, index: int) -> str:
+        """
+        :param index: The index of a token.
+        :return: The lexeme of the token.
+        """
+        return decode(self.source[self.starts[index] : self.ends[index]])
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> TerminalSymbol:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TerminalSymbol]:
+        ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> TerminalSymbol | list[TerminalSymbol]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return create_token(
+            self.symbol_type(index), self.lexeme(index), self.variables
+        )
+
+    def __iter__(self) -> Iterator[TerminalSymbol]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        """
+        Close the memory-mapped file the tokens were split from, if any, after
+        which their lexemes cannot be accessed
+        :return: None
+        """
+        self.resources.close()
+
+    def __enter__(self) -> "TokenStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)})"
+
 
 class Lexer(ABC):
     DEFAULT_BASE_SYMBOLS: ClassVar[list[type[TerminalSymbol]]] = [
@@ -81,12 +302,40 @@ class Lexer(ABC):
     ]
 
     @abstractmethod
-    def tokenize(self, input_string: str) -> list[TerminalSymbol]:
+    def tokenize(self, input_string: Source) -> list[TerminalSymbol]:
         """Return a list of terminals for a given input string."""
         ...
 
+    def iter_tokens(self, input_string: Source) -> Iterator[TerminalSymbol]:
+        """Return an iterator of terminals for a given input string."""
+        yield from self.tokenize(input_string)
+
+    def scan(
+        self, input_string: Source, pos: int = 0
+    ) -> Iterator[tuple[TerminalSymbol, int, int]]:
+        """
+        Split an input string into token objects without validating them. By
+        default it is split into the base symbols like DefaultLexer does, so
+        lexers splitting it into other symbols should override this.
+        :param input_string: The input_string to split.
+        :param pos: The index of the input string to start splitting from.
+        :return: An iterator of tokens with the start and end of their lexeme.
+        """
+        lexer = DefaultLexer(base_symbols=self.DEFAULT_BASE_SYMBOLS)
+        lexer.variables = getattr(self, "variables", lexer.variables)
+        return lexer.scan(input_string, pos)
+
 
 class DefaultLexer(Lexer):
+    # Lexers of the same type and symbols share their compiled patterns,
+    # which are read-only so that no lexer can change them for the others
+    patterns: ClassVar[LRUCache[Hashable, dict[str, Any]]] = LRUCache(256)
+
+    inclusions: Mapping[str, type[TerminalSymbol]]
+    pattern: re.Pattern
+    symbols: tuple[type[TerminalSymbol], ...]
+    kinds: Mapping[str, int]
+
     def __init__(
         self,
         variables: dict[str, Any] | None = None,
@@ -95,37 +344,170 @@ class DefaultLexer(Lexer):
         base_symbols: list[type[TerminalSymbol]] | None = None,
     ):
         self.variables = variables or {}
+        inclusions = inclusions or []
+        exclusions = exclusions or []
+        base_symbols = base_symbols or self.DEFAULT_BASE_SYMBOLS
+        self.pattern_key = (
+            type(self),
+            tuple(inclusions),
+            tuple(exclusions),
+            tuple(base_symbols),
+        )
+        vars(self).update(self.compiled_patterns())
 
-        symbols = {
-            s.__name__: s for s in base_symbols or self.DEFAULT_BASE_SYMBOLS
-        }
-        self.inclusions = {s.__name__: s for s in inclusions or []} | symbols
-        for symbol in exclusions or []:
-            self.inclusions.pop(symbol.__name__, None)
+    def compiled_patterns(self) -> dict[str, Any]:
+        """
+        :return: The attributes holding the compiled patterns of the lexer,
+        from the cache of the patterns shared by lexers.
+        """
+        _, inclusions, exclusions, base_symbols = self.pattern_key
+        return self.patterns.get_or_create(
+            self.pattern_key,
+            lambda: self.compile(
+                list(inclusions), list(exclusions), list(base_symbols)
+            ),
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The compiled patterns are shared, so they are not pickled
+        compiled = self.compiled_patterns()
+        return {k: v for k, v in vars(self).items() if k not in compiled}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        vars(self).update(state)
+        vars(self).update(self.compiled_patterns())
+
+    def compile(
+        self,
+        inclusions: list[type[TerminalSymbol]],
+        exclusions: list[type[TerminalSymbol]],
+        base_symbols: list[type[TerminalSymbol]],
+    ) -> dict[str, Any]:
+        """
+        Compile the patterns matching a set of symbols. They are cached per
+        type of lexer and set of symbols, and shared by the lexers using them
+        :param inclusions: Symbols to include before the base symbols.
+        :param exclusions: Symbols to exclude.
+        :param base_symbols: The base symbols.
+        :return: The attributes of a lexer holding the compiled patterns.
+        """
+        symbols = {s.__name__: s for s in base_symbols}
+        included = {s.__name__: s for s in inclusions} | symbols
+        for symbol in exclusions:
+            included.pop(symbol.__name__, None)
 
         # Create a regex matching map of symbols regexes to their name
         regexes = [
-            f"(?P<{name}>{sym.regex})" for name, sym in self.inclusions.items()
+            f"(?P<{name}>{sym.regex})" for name, sym in included.items()
         ]
-        self.pattern = re.compile(r"|".join(regexes))
+        return {
+            "inclusions": MappingProxyType(included),
+            "pattern": re.compile(r"|".join(regexes)),
+            # Index the symbols for token streams
+            "symbols": tuple(included.values()),
+            "kinds": MappingProxyType(
+                {name: kind for kind, name in enumerate(included)}
+            ),
+        }
 
-    def tokenize(self, input_string: str) -> list[TerminalSymbol]:
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
         """
-        Return a list of validated token objects from a given input string
-        :param input_string: The input_string to split.
+        :return: The statistics of the cache of compiled patterns.
+        """
+        return cls.patterns.info()
+
+    def tokenize(self, input_string: Source) -> list[TerminalSymbol]:
+        """
+        Return a list of validated token objects from a given input string.
+        Symbols other than string literals must be ASCII in bytes-like
+        inputs and files.
+        :param input_string: The input_string to split, which can also be
+        bytes of UTF-8 encoded text, an mmap region or a binary file.
         :return: A list of Tokens obtained by splitting the input string.
         """
-        tokens = []
-        for match in re.finditer(self.pattern, input_string):
-            lexeme = match.group()
-            symbol = self.inclusions[str(match.lastgroup)]
-            if symbol == VariableLiteral:
-                token = symbol(lexeme=lexeme, variables=self.variables)
-            else:
-                token = symbol(lexeme=lexeme)
-            tokens.append(token)
-        self.validate_tokens(tokens)
-        return tokens
+        return list(self.iter_tokens(input_string))
+
+    def iter_tokens(self, input_string: Source) -> Iterator[TerminalSymbol]:
+        """
+        Lazily split an input string into validated token objects, raising
+        at the first invalid symbol without splitting the rest of the input
+        :param input_string: The input_string to split.
+        :return: An iterator of Tokens obtained by splitting the input string.
+        """
+        for token, _, _ in self.scan(input_string):
+            # Disallow invalid symbols
+            if isinstance(token, InvalidSymbol):
+                raise unknown_syntax(token.lexeme, input_string)
+            yield token
+
+    def scan(
+        self, input_string: Source, pos: int = 0
+    ) -> Iterator[tuple[TerminalSymbol, int, int]]:
+        """
+        Split an input string into token objects without validating them
+        :param input_string: The input_string to split.
+        :param pos: The index of the input string to start splitting from.
+        :return: An iterator of tokens with the start and end of their lexeme.
+        """
+        with open_buffer(input_string) as source:
+            pattern = self.source_pattern(source)
+            for match in pattern.finditer(source, pos):
+                symbol = self.inclusions[str(match.lastgroup)]
+                lexeme = decode(match.group())
+                token = create_token(symbol, lexeme, self.variables)
+                yield token, match.start(), match.end()
+
+    def source_pattern(self, source: Buffer) -> re.Pattern:
+        """
+        :param source: A string or bytes-like buffer.
+        :return: The pattern matching the symbols in the source.
+        """
+        if isinstance(source, str):
+            return self.pattern
+        return byte_pattern(self.pattern.pattern)
+
+    def match_spans(
+        self, input_string: Buffer, pos: int = 0
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Find the symbols in an input string
+        :param input_string: The string or bytes-like buffer to split.
+        :param pos: The index of the input string to start splitting from.
+        :return: An iterator of the indices in symbols of the symbols found,
+        with the start and end of their lexeme.
+        """
+        pattern = self.source_pattern(input_string)
+        for match in pattern.finditer(input_string, pos):
+            yield self.kinds[str(match.lastgroup)], match.start(), match.end()
+
+    def token_stream(self, input_string: Source) -> TokenStream:
+        """
+        Split an input string into a compact stream of validated tokens.
+        Bytes-like inputs and files are not decoded, so an mmap region or a
+        file is split without a copy of its text in memory, and symbols other
+        than string literals must be ASCII in them.
+        :param input_string: The input_string to split, which can also be
+        bytes of UTF-8 encoded text, an mmap region or a binary file.
+        :return: A TokenStream of the tokens of the input string.
+        """
+        invalid = {
+            kind
+            for kind, symbol in enumerate(self.symbols)
+            if issubclass(symbol, InvalidSymbol)
+        }
+        with ExitStack() as stack:
+            source = stack.enter_context(open_buffer(input_string))
+            stream = TokenStream(source, self.symbols, self.variables)
+            for kind, start, end in self.match_spans(source):
+                # Disallow invalid symbols
+                if kind in invalid:
+                    lexeme = decode(source[start:end])
+                    raise unknown_syntax(lexeme, source)
+                stream.append(kind, start, end)
+            # The stream keeps a mapped file open until it is closed
+            stream.resources = stack.pop_all()
+        return stream
 
     @staticmethod
     def validate_tokens(tokens: list[TerminalSymbol]) -> None:
@@ -138,3 +520,321 @@ class DefaultLexer(Lexer):
             # Disallow invalid symbols
             if isinstance(token, InvalidSymbol):
                 raise DSLSyntaxError(f"Unknown syntax {token.lexeme}.")
+
+
+# Regexes are analysed from their parse trees by the re module
+Node = list[tuple[Any, Any]]
+ASCII = frozenset(map(chr, range(0x80)))
+CATEGORIES: dict[str, frozenset[str]] = {
+    "CATEGORY_DIGIT": frozenset(string.digits),
+    "CATEGORY_WORD": frozenset(string.ascii_letters + string.digits + "_"),
+    "CATEGORY_SPACE": frozenset(string.whitespace),
+}
+CATEGORIES |= {
+    "CATEGORY_NOT_DIGIT": ASCII - set(string.digits),
+    "CATEGORY_NOT_WORD": ASCII - CATEGORIES["CATEGORY_WORD"],
+    "CATEGORY_NOT_SPACE": ASCII - set(string.whitespace),
+}
+# Parse trees of a re module whose parser has changed are not understood
+ANALYSIS_ERRORS = (AttributeError, IndexError, TypeError, ValueError)
+
+
+def parse_regex(regex: str) -> Node | None:
+    """
+    Parse a regex with the parser of the re module
+    :param regex: A regex.
+    :return: The parse tree of the regex, or None if there is no parser.
+    """
+    return None if sre_parse is None else sre_parse.parse(regex).data
+
+
+def regex_literals(regex: str) -> list[str] | None:
+    """
+    Get the strings a regex matches if it only matches a few fixed strings
+    :param regex: A regex.
+    :return: The strings the regex matches, or None.
+    """
+    node = parse_regex(regex)
+    try:
+        literals = None if node is None else _literals(node)
+    except ANALYSIS_ERRORS:
+        return None
+    return None if literals is None or "" in literals else literals
+
+
+def _literals(node: Node, limit: int = 256) -> list[str] | None:
+    """Get the strings a regex parse tree matches, if there are few."""
+    literals = [""]
+    for op, av in node:
+        if op is sre_constants.LITERAL:
+            options: list[str] | None = [chr(av)]
+        elif op is sre_constants.SUBPATTERN:
+            options = _literals(av[-1], limit)
+        elif op is sre_constants.BRANCH:
+            branches = [_literals(branch, limit) for branch in av[1]]
+            options = None
+            if all(branch is not None for branch in branches):
+                options = [s for branch in branches if branch for s in branch]
+        elif op is sre_constants.IN and all(
+            item_op is sre_constants.LITERAL for item_op, _ in av
+        ):
+            options = [chr(item_av) for _, item_av in av]
+        else:
+            return None
+        if options is None or len(literals) * len(options) > limit:
+            return None
+        literals = [
+            prefix + option for prefix in literals for option in options
+        ]
+    return list(dict.fromkeys(literals))
+
+
+def regex_first(regex: str) -> frozenset[str]:
+    """
+    Get the ASCII characters a match of a regex can start with. Regexes
+    which can match an empty string, or which cannot be parsed, can start
+    with any character.
+    :param regex: A regex.
+    :return: A set of ASCII characters.
+    """
+    node = parse_regex(regex)
+    try:
+        first, nullable = (ASCII, True) if node is None else _first(node)
+    except ANALYSIS_ERRORS:
+        return ASCII
+    return ASCII if nullable else first
+
+
+def _first(node: Node) -> tuple[frozenset[str], bool]:
+    """Get the FIRST set of a regex parse tree and if it is nullable."""
+    first: frozenset[str] = frozenset()
+    for op, av in node:
+        item_first, nullable = _first_item(op, av)
+        first |= item_first
+        if not nullable:
+            return first, False
+    return first, True
+
+
+def _first_item(op: Any, av: Any) -> tuple[frozenset[str], bool]:
+    """Get the FIRST set of an item of a regex parse tree."""
+    match op:
+        case sre_constants.LITERAL:
+            return frozenset(chr(av)) & ASCII, False
+        case sre_constants.NOT_LITERAL:
+            return ASCII - {chr(av)}, False
+        case sre_constants.IN:
+            chars: set[str] = set()
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL:
+                    chars.add(chr(item_av))
+                elif item_op is sre_constants.RANGE:
+                    low, high = item_av
+                    chars.update(map(chr, range(low, min(high + 1, 0x80))))
+                elif item_op is sre_constants.CATEGORY:
+                    chars |= CATEGORIES.get(str(item_av), ASCII)
+                elif item_op is not sre_constants.NEGATE:
+                    return ASCII, False
+            if av and av[0][0] is sre_constants.NEGATE:
+                return ASCII - chars, False
+            return frozenset(chars) & ASCII, False
+        case sre_constants.BRANCH:
+            results = [_first(branch) for branch in av[1]]
+            return frozenset().union(*(f for f, _ in results)), any(
+                nullable for _, nullable in results
+            )
+        case sre_constants.SUBPATTERN:
+            return _first(av[-1])
+        case (
+            sre_constants.MAX_REPEAT
+            | sre_constants.MIN_REPEAT
+            | sre_constants.POSSESSIVE_REPEAT
+        ):
+            first, nullable = _first(av[2])
+            return first, nullable or av[0] == 0
+        case sre_constants.AT:
+            return frozenset(), True
+    # Anything else may start with any character
+    return ASCII, True
+
+
+class TrieLexer(DefaultLexer):
+    """
+    A lexer matching the longest lexeme at each position, in one left to
+    right scan. Symbols whose regex is a fixed string (keywords and
+    punctuation) are matched by walking a trie of their strings, and the
+    other regexes are only tried at characters they can start with. Ties
+    go to the symbol listed first, and invalid symbols are only matched
+    where no other symbol is, so `IFFY` is one VariableLiteral and `IF` is
+    still an IfLiteral.
+    """
+
+    trie: Mapping[str | int, Any]
+    dispatch: tuple[tuple[tuple[int, re.Pattern], ...], ...]
+    others: tuple[tuple[int, re.Pattern], ...]
+    fallbacks: tuple[tuple[int, re.Pattern], ...]
+    byte_tables: tuple[Any, ...]
+
+    def compile(
+        self,
+        inclusions: list[type[TerminalSymbol]],
+        exclusions: list[type[TerminalSymbol]],
+        base_symbols: list[type[TerminalSymbol]],
+    ) -> dict[str, Any]:
+        """
+        Compile the trie and regexes matching a set of symbols
+        :param inclusions: Symbols to include before the base symbols.
+        :param exclusions: Symbols to exclude.
+        :param base_symbols: The base symbols.
+        :return: The attributes of a lexer holding the compiled patterns.
+        """
+        compiled = super().compile(inclusions, exclusions, base_symbols)
+        # A trie of the strings of the fixed string symbols, where the key
+        # "" of a node holds the symbol of the string ending at the node
+        trie: dict[str | int, Any] = {}
+        regexes: list[tuple[int, re.Pattern, frozenset[str]]] = []
+        fallbacks: list[tuple[int, re.Pattern]] = []
+        for kind, symbol in enumerate(compiled["symbols"]):
+            literals = regex_literals(symbol.regex)
+            if issubclass(symbol, InvalidSymbol):
+                fallbacks.append((kind, re.compile(symbol.regex)))
+            elif literals is not None:
+                for literal in literals:
+                    node = trie
+                    for char in literal:
+                        node = node.setdefault(char, {})
+                    node.setdefault("", kind)
+            else:
+                pattern = re.compile(symbol.regex)
+                regexes.append((kind, pattern, regex_first(symbol.regex)))
+        tables: dict[str, Any] = {
+            "trie": freeze_trie(trie),
+            # The regexes to try at each ASCII character, and at any other
+            "dispatch": tuple(
+                tuple(
+                    (kind, pattern)
+                    for kind, pattern, first in regexes
+                    if c in first
+                )
+                for c in map(chr, range(0x80))
+            ),
+            "others": tuple((kind, pattern) for kind, pattern, _ in regexes),
+            "fallbacks": tuple(fallbacks),
+        }
+        return (
+            compiled
+            | tables
+            | {"byte_tables": self.compile_byte_tables(**tables)}
+        )
+
+    @staticmethod
+    def compile_byte_tables(
+        trie: Mapping[str | int, Any],
+        dispatch: Sequence[Sequence[tuple[int, re.Pattern]]],
+        others: Sequence[tuple[int, re.Pattern]],
+        fallbacks: Sequence[tuple[int, re.Pattern]],
+    ) -> tuple[Any, ...]:
+        """
+        Compile the tables matching symbols in bytes-like buffers
+        :param trie: The trie of the fixed string symbols.
+        :param dispatch: The regexes to try at each ASCII character.
+        :param others: The regexes to try at any other character.
+        :param fallbacks: The regexes of invalid symbols.
+        :return: The trie and regexes for bytes-like buffers, whose trie is
+        keyed by the bytes of UTF-8 encoded strings.
+        """
+        byte_trie: dict[str | int, Any] = {}
+        stack = [(trie, b"")]
+        while stack:
+            node, prefix = stack.pop()
+            for key, child in node.items():
+                if key == "":
+                    byte_node = byte_trie
+                    for byte in prefix:
+                        byte_node = byte_node.setdefault(byte, {})
+                    byte_node.setdefault("", child)
+                else:
+                    stack.append((child, prefix + str(key).encode()))
+
+        def compile_bytes(regexes: Sequence[tuple[int, re.Pattern]]) -> tuple:
+            return tuple((k, byte_pattern(p.pattern)) for k, p in regexes)
+
+        return (
+            freeze_trie(byte_trie),
+            tuple(compile_bytes(regexes) for regexes in dispatch),
+            compile_bytes(others),
+            compile_bytes(fallbacks),
+        )
+
+    def scan(
+        self, input_string: Source, pos: int = 0
+    ) -> Iterator[tuple[TerminalSymbol, int, int]]:
+        """
+        Split an input string into token objects without validating them
+        :param input_string: The input_string to split.
+        :param pos: The index of the input string to start splitting from.
+        :return: An iterator of tokens with the start and end of their lexeme.
+        """
+        with open_buffer(input_string) as source:
+            for kind, start, end in self.match_spans(source, pos):
+                lexeme = decode(source[start:end])
+                token = create_token(
+                    self.symbols[kind], lexeme, self.variables
+                )
+                yield token, start, end
+
+    def match_spans(
+        self, input_string: Buffer, pos: int = 0
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Find the longest symbol at each position of an input string
+        :param input_string: The string or bytes-like buffer to split.
+        :param pos: The index of the input string to start splitting from.
+        :return: An iterator of the indices in symbols of the symbols found,
+        with the start and end of their lexeme.
+        """
+        is_text = isinstance(input_string, str)
+        if is_text:
+            trie, dispatch = self.trie, self.dispatch
+            others, fallbacks = self.others, self.fallbacks
+        else:
+            # Bytes-like buffers are indexed by byte values
+            trie, dispatch, others, fallbacks = self.byte_tables
+        length = len(input_string)
+        while pos < length:
+            char = input_string[pos]
+            kind, end = -1, pos
+
+            node = trie.get(char)
+            index = pos
+            while node is not None:
+                index += 1
+                if "" in node:
+                    kind, end = node[""], index
+                if index == length:
+                    break
+                node = node.get(input_string[index])
+
+            code = ord(char) if is_text else char
+            regexes = dispatch[code] if code < 0x80 else others
+            for regex_kind, pattern in regexes:
+                match = pattern.match(input_string, pos)
+                if match is not None and (
+                    match.end() > end
+                    or match.end() == end
+                    and regex_kind < kind
+                ):
+                    kind, end = regex_kind, match.end()
+
+            if kind < 0:
+                for regex_kind, pattern in fallbacks:
+                    match = pattern.match(input_string, pos)
+                    if match is not None and match.end() > pos:
+                        kind, end = regex_kind, match.end()
+                        break
+                else:
+                    # Characters no symbol matches are skipped
+                    pos += 1
+                    continue
+            yield kind, pos, end
+            pos = end
@@ -1,6 +1,14 @@
+from dsl.models.context import EvaluationContext
 from dsl.models.grammar import Grammar
 from dsl.models.representables.operands import Operand
 from dsl.models.representables.operators import Function, Operator
 from dsl.models.representables.punctuator import Punctuator
 
-__all__ = ["Function", "Operand", "Operator", "Punctuator", "Grammar"]
+__all__ = [
+    "EvaluationContext",
+    "Function",
+    "Operand",
+    "Operator",
+    "Punctuator",
+    "Grammar",
+]
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+
+@dataclass(frozen=True)
+class EvaluationContext:
+    """
+    The data an Evaluable is evaluated against. A context is passed down the
+    evaluate calls of an execution tree, so one tree can be evaluated against
+    many sets of variables, including from several threads at once.
+    """
+
+    variables: Mapping[str, Any] = field(default_factory=dict)
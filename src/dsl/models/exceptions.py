@@ -12,3 +12,7 @@ class DSLRuntimeError(DSLException):
 
 class DSLValidationError(DSLException):
     pass
+
+
+class DSLGrammarError(DSLException):
+    pass
@@ -1,6 +1,8 @@
-from typing import Any
+import hashlib
+from functools import lru_cache
+from typing import Any, Iterable
 
-from dsl.models.symbols import NonTerminalSymbol, TSymbol
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol, TSymbol
 from dsl.models.symbols.nonterminals import (
     ActionArgSymbol,
     ActionSymbol,
@@ -16,6 +18,7 @@ from dsl.models.symbols.nonterminals import (
     ListArgSymbol,
     ListSymbol,
     OperandSymbol,
+    SuffixSymbol,
     TermSymbol,
 )
 from dsl.models.symbols.terminals import (
@@ -72,7 +75,323 @@ class Production:
 
 
 class Grammar(dict[type[NonTerminalSymbol], list[Production]]):
-    pass
+    def compile(self) -> "ParseTable":
+        """
+        Compile the grammar into FIRST/FOLLOW sets and a predictive dispatch
+        table. Tables are cached, so grammars with the same productions share
+        the same table.
+        :return: The parse table of the grammar.
+        """
+        return _compile(
+            tuple((head, tuple(body)) for head, body in self.items())
+        )
+
+    def fingerprint(self) -> str:
+        """
+        Get a digest of the productions of the grammar which is stable across
+        processes, for keying artifacts generated from the grammar on disk.
+        :return: The hex digest.
+        """
+
+        def name(symbol: type[TSymbol]) -> str:
+            return f"{symbol.__module__}.{symbol.__qualname__}"
+
+        description = "\n".join(
+            f"{name(head)}: {' '.join(map(name, production.body))}"
+            for head, productions in self.items()
+            for production in productions
+        )
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def left_factor(self) -> "LeftFactoredGrammar":
+        """
+        Left-factor the grammar so productions of a non-terminal which share a
+        prefix parse it once, e.g. the ConditionSymbol comparisons become
+        `ExpressionSymbol ConditionSymbolSuffix` where the suffix non-terminal
+        has the productions `EqualLiteral ConditionSymbol`, ..., and an empty
+        production. Productions are only grouped when it does not change which
+        alternative is chosen first, so the grammar parses the same trees once
+        SuffixSymbol nodes are spliced into their parents. Factored grammars
+        are cached, so grammars with the same productions share them.
+        :return: The left-factored grammar.
+        """
+        return _left_factor(
+            tuple((head, tuple(body)) for head, body in self.items())
+        )
+
+
+class LeftFactoredGrammar(Grammar):
+    """
+    A grammar produced by Grammar.left_factor, with the SuffixSymbol types it
+    introduced mapped to the non-terminals they were factored out of.
+    """
+
+    def __init__(
+        self,
+        productions: dict[type[NonTerminalSymbol], list[Production]],
+        suffixes: dict[type[SuffixSymbol], type[NonTerminalSymbol]],
+    ):
+        super().__init__(productions)
+        self.suffixes = suffixes
+
+
+class _LeftFactoring:
+    """Left-factor the productions of a grammar. See Grammar.left_factor."""
+
+    def __init__(self, grammar: Grammar):
+        self.table = grammar.compile()
+        self.grammar = grammar
+        self.productions: dict[type[NonTerminalSymbol], list[Production]] = {}
+        self.suffixes: dict[type[SuffixSymbol], type[NonTerminalSymbol]] = {}
+
+    def factor(self) -> LeftFactoredGrammar:
+        """Left-factor every non-terminal of the grammar."""
+        for head, productions in self.grammar.items():
+            # Keep the order of the grammar, with suffixes after their heads
+            self.productions[head] = []
+            self.productions[head] = self._factor(head, productions)
+        return LeftFactoredGrammar(self.productions, self.suffixes)
+
+    def _factor(
+        self, head: type[NonTerminalSymbol], productions: list[Production]
+    ) -> list[Production]:
+        """Group productions sharing a prefix behind a suffix non-terminal."""
+        factored = []
+        remaining = list(productions)
+        while remaining:
+            production = remaining.pop(0)
+            group, skipped = [production], []
+            for other in remaining:
+                if (
+                    production.body
+                    and other.body[:1] == production.body[:1]
+                    and all(self._disjoint(other, s) for s in skipped)
+                ):
+                    group.append(other)
+                else:
+                    skipped.append(other)
+            remaining = skipped
+            if len(group) == 1:
+                factored.append(production)
+                continue
+
+            prefix = group[0].body
+            for other in group[1:]:
+                length = 0
+                while (
+                    length < min(len(prefix), len(other.body))
+                    and prefix[length] == other.body[length]
+                ):
+                    length += 1
+                prefix = prefix[:length]
+            suffix = self._suffix(head)
+            self.productions[suffix] = []
+            self.productions[suffix] = self._factor(
+                suffix,
+                [Production(*other.body[len(prefix) :]) for other in group],
+            )
+            factored.append(Production(*prefix, suffix))
+        return factored
+
+    def _disjoint(self, production: Production, other: Production) -> bool:
+        """
+        Check if two productions can never start parsing the same input, so
+        trying them in either order chooses the same one.
+        """
+        first, nullable = self.table.first_of(production.body)
+        other_first, other_nullable = self.table.first_of(other.body)
+        return not (nullable or other_nullable) and not any(
+            issubclass(a, b) or issubclass(b, a)
+            for a in first
+            for b in other_first
+        )
+
+    def _suffix(self, head: type[NonTerminalSymbol]) -> type[SuffixSymbol]:
+        """Create a suffix non-terminal for productions of a head."""
+        origin = self.suffixes.get(head, head)  # type: ignore[call-overload]
+        name = f"{origin.__name__}Suffix"
+        count = sum(1 for suffix in self.suffixes if suffix.head is origin)
+        if count:
+            name += str(count + 1)
+        suffix = type(name, (SuffixSymbol,), {"head": origin})
+        self.suffixes[suffix] = origin
+        return suffix
+
+
+@lru_cache(maxsize=None)
+def _left_factor(
+    productions: tuple[tuple[type[NonTerminalSymbol], tuple[Production, ...]]]
+) -> LeftFactoredGrammar:
+    """Left-factor a grammar from a hashable snapshot of it."""
+    return _LeftFactoring(
+        Grammar({head: list(body) for head, body in productions})
+    ).factor()
+
+
+# The end of input marker used in FOLLOW sets
+END_OF_INPUT = None
+
+FirstSet = frozenset[type[TerminalSymbol]]
+FollowSet = frozenset[type[TerminalSymbol] | None]
+
+
+class ParseTable:
+    """
+    FIRST/FOLLOW sets of a grammar and a table mapping each non-terminal and
+    the type of the current token to the productions which can start with it.
+    """
+
+    def __init__(self, grammar: Grammar):
+        self.grammar = grammar
+        self.nullable: set[type[NonTerminalSymbol]] = set()
+        self.first: dict[type[NonTerminalSymbol], FirstSet] = {}
+        self._follow: dict[
+            type[NonTerminalSymbol], dict[type[NonTerminalSymbol], FollowSet]
+        ] = {}
+        self._compute_first()
+        self.table: dict[
+            type[NonTerminalSymbol],
+            dict[type[TerminalSymbol], tuple[Production, ...]],
+        ] = {head: {} for head in grammar}
+        for terminal in self.terminals:
+            for head in grammar:
+                self.predict(head, terminal)
+
+    @property
+    def terminals(self) -> set[type[TerminalSymbol]]:
+        """:return: The terminals used in the productions of the grammar."""
+        return {
+            symbol
+            for productions in self.grammar.values()
+            for production in productions
+            for symbol in production.body
+            if issubclass(symbol, TerminalSymbol)
+        }
+
+    def _compute_first(self) -> None:
+        """Compute the nullable non-terminals and their FIRST sets."""
+        first: dict[type[NonTerminalSymbol], set[type[TerminalSymbol]]] = {
+            head: set() for head in self.grammar
+        }
+        changed = True
+        while changed:
+            changed = False
+            for head, productions in self.grammar.items():
+                for production in productions:
+                    body_first, nullable = self._first_of(
+                        production.body, first
+                    )
+                    if not body_first <= first[head]:
+                        first[head] |= body_first
+                        changed = True
+                    if nullable and head not in self.nullable:
+                        self.nullable.add(head)
+                        changed = True
+        self.first = {head: frozenset(f) for head, f in first.items()}
+
+    def _first_of(
+        self,
+        symbols: Iterable[type[TSymbol]],
+        first: dict[type[NonTerminalSymbol], Any],
+    ) -> tuple[set[type[TerminalSymbol]], bool]:
+        """
+        Get the FIRST set of a sequence of symbols
+        :param symbols: A sequence of terminals and non-terminals.
+        :param first: The FIRST sets of the non-terminals.
+        :return: The FIRST set and whether the whole sequence is nullable.
+        """
+        body_first: set[type[TerminalSymbol]] = set()
+        for symbol in symbols:
+            if issubclass(symbol, TerminalSymbol):
+                body_first.add(symbol)
+                return body_first, False
+            body_first |= first.get(symbol, set())
+            if symbol not in self.nullable:
+                return body_first, False
+        return body_first, True
+
+    def first_of(
+        self, symbols: Iterable[type[TSymbol]]
+    ) -> tuple[FirstSet, bool]:
+        """
+        Get the FIRST set of a sequence of symbols
+        :param symbols: A sequence of terminals and non-terminals.
+        :return: The FIRST set and whether the whole sequence is nullable.
+        """
+        body_first, nullable = self._first_of(symbols, self.first)
+        return frozenset(body_first), nullable
+
+    def follow(
+        self, start_symbol: type[NonTerminalSymbol]
+    ) -> dict[type[NonTerminalSymbol], FollowSet]:
+        """
+        Get the FOLLOW sets of the non-terminals when parsing from a start
+        symbol. END_OF_INPUT marks that a non-terminal can end the input.
+        :param start_symbol: The non-terminal parsing starts from.
+        :return: A FOLLOW set for every non-terminal of the grammar.
+        """
+        if start_symbol in self._follow:
+            return self._follow[start_symbol]
+
+        follow: dict[type[NonTerminalSymbol], set[Any]] = {
+            head: set() for head in self.grammar
+        }
+        follow[start_symbol] = {END_OF_INPUT}
+        changed = True
+        while changed:
+            changed = False
+            for head, productions in self.grammar.items():
+                for production in productions:
+                    body = production.body
+                    for i, symbol in enumerate(body):
+                        if issubclass(symbol, TerminalSymbol):
+                            continue
+                        rest_first, nullable = self.first_of(body[i + 1 :])
+                        update = set(rest_first)
+                        if nullable:
+                            update |= follow[head]
+                        if not update <= follow.setdefault(symbol, set()):
+                            follow[symbol] |= update
+                            changed = True
+
+        self._follow[start_symbol] = {
+            head: frozenset(f) for head, f in follow.items()
+        }
+        return self._follow[start_symbol]
+
+    def predict(
+        self,
+        head: type[NonTerminalSymbol],
+        token_type: type[TerminalSymbol],
+    ) -> tuple[Production, ...]:
+        """
+        Get the productions of a non-terminal that can start with a token, in
+        the order they appear in the grammar
+        :param head: The non-terminal to expand.
+        :param token_type: The type of the current token.
+        :return: The viable productions.
+        """
+        table = self.table[head]
+        if token_type not in table:
+            viable = []
+            for production in self.grammar[head]:
+                body_first, nullable = self.first_of(production.body)
+                if nullable or any(
+                    issubclass(token_type, symbol) for symbol in body_first
+                ):
+                    viable.append(production)
+            table[token_type] = tuple(viable)
+        return table[token_type]
+
+
+@lru_cache(maxsize=None)
+def _compile(
+    productions: tuple[tuple[type[NonTerminalSymbol], tuple[Production, ...]]]
+) -> ParseTable:
+    """Build the parse table of a grammar from a hashable snapshot of it."""
+    return ParseTable(
+        Grammar({head: list(body) for head, body in productions})
+    )
 
 
 base_grammar = Grammar(
@@ -3,6 +3,7 @@ from collections import deque
 from dataclasses import MISSING
 from typing import Any
 
+from dsl.models.context import EvaluationContext
 from dsl.models.exceptions import DSLRuntimeError
 from dsl.models.representables import Representable
 from dsl.models.representables.actions import Action
@@ -10,10 +11,16 @@ from dsl.models.representables.keywords import (
     ElifKeyword,
     ElseKeyword,
     IfKeyword,
+    Keyword,
     ThenKeyword,
 )
 from dsl.models.representables.operands import Operand
-from dsl.models.representables.operators import BinaryOperator, UnitaryOperator
+from dsl.models.representables.operators import (
+    AndOperator,
+    BinaryOperator,
+    OrOperator,
+    UnitaryOperator,
+)
 
 
 class Evaluable(Representable):
@@ -32,29 +39,41 @@ class Evaluable(Representable):
         )
 
     @abstractmethod
-    def evaluate(self) -> Any:
-        """Evaluate the contents of the Evaluable."""
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
+        """
+        Evaluate the contents of the Evaluable
+        :param context: The variables to evaluate against, or None to use the
+        variables bound to the operands when they were lexed.
+        :return: The value of the Evaluable.
+        """
         ...
 
 
 class EvaluableBlock(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the contents of the Evaluable."""
         outputs = []
-        for item in self.contents:
-            output = item.evaluate()
-            if (
-                isinstance(item, EvaluableIfStatement)
-                and output is not MISSING
-            ):
-                outputs.append(output)
-            elif isinstance(item, EvaluableBlock) and output:
-                outputs.extend(output)
+        # Nested blocks are walked with a stack rather than by recursion so
+        # long chains of IF statements do not hit the recursion limit
+        stack = [iter(self.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                output = item.evaluate(context)
+                if (
+                    isinstance(item, EvaluableIfStatement)
+                    and output is not MISSING
+                ):
+                    outputs.append(output)
+            else:
+                stack.pop()
         return outputs
 
 
 class EvaluableIfStatement(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the contents of the IF statement."""
         condition: EvaluableExpression
         action: EvaluableAction
@@ -68,11 +87,11 @@ class EvaluableIfStatement(Evaluable):
             ]:
                 if (
                     isinstance(condition, Operand)
-                    and condition.true_value
+                    and condition.resolve(context)
                     or isinstance(condition, EvaluableExpression)
-                    and condition.evaluate()
+                    and condition.evaluate(context)
                 ):
-                    return action.evaluate()
+                    return action.evaluate(context)
                 else:
                     return MISSING
             case [
@@ -84,67 +103,107 @@ class EvaluableIfStatement(Evaluable):
             ]:
                 if (
                     isinstance(condition, Operand)
-                    and condition.true_value
+                    and condition.resolve(context)
                     or isinstance(condition, EvaluableExpression)
-                    and condition.evaluate()
+                    and condition.evaluate(context)
                 ):
-                    return action.evaluate()
+                    return action.evaluate(context)
                 else:
-                    return elif_statement.evaluate()
+                    return elif_statement.evaluate(context)
             case _:
                 raise DSLRuntimeError(
                     f"Cannot evaluate IF statement {self.contents}."
                 )
 
+    def branches(self) -> list[tuple[Any, "EvaluableAction"]] | None:
+        """
+        Get the condition and action of each branch of the IF statement and
+        its chain of ELIF statements, in order
+        :return: The branches, with None for the condition of an ELSE
+        branch, or None if the IF statement cannot be evaluated.
+        """
+        branches: list[tuple[Any, EvaluableAction]] = []
+        contents = self.contents
+        keyword: type[Keyword] = IfKeyword
+        while True:
+            match contents:
+                case [ElseKeyword(), EvaluableAction() as action] if (
+                    keyword is ElifKeyword
+                ):
+                    branches.append((None, action))
+                    return branches
+                case [
+                    Keyword() as found,
+                    EvaluableExpression() | Operand() as condition,
+                    ThenKeyword(),
+                    EvaluableAction() as action,
+                    *rest,
+                ] if isinstance(found, keyword):
+                    branches.append((condition, action))
+                    match rest:
+                        case []:
+                            return branches
+                        case [EvaluableElifStatement() as elif_statement]:
+                            contents = elif_statement.contents
+                            keyword = ElifKeyword
+                        case _:
+                            return None
+                case _:
+                    return None
+
 
 class EvaluableElifStatement(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the contents of the ELIF statement."""
         condition: EvaluableExpression
         action: EvaluableAction
         elif_statement: EvaluableElifStatement
-        match self.contents:
-            case [ElseKeyword(), EvaluableAction() as action]:
-                return action.evaluate()
-            case [
-                ElifKeyword(),
-                EvaluableExpression() | Operand() as condition,
-                ThenKeyword(),
-                EvaluableAction() as action,
-            ]:
-                if (
-                    isinstance(condition, Operand)
-                    and condition.true_value
-                    or isinstance(condition, EvaluableExpression)
-                    and condition.evaluate()
-                ):
-                    return action.evaluate()
-                else:
-                    return MISSING
-            case [
-                ElifKeyword(),
-                EvaluableExpression() | Operand() as condition,
-                ThenKeyword(),
-                EvaluableAction() as action,
-                EvaluableElifStatement() as elif_statement,
-            ]:
-                if (
-                    isinstance(condition, Operand)
-                    and condition.true_value
-                    or isinstance(condition, EvaluableExpression)
-                    and condition.evaluate()
-                ):
-                    return action.evaluate()
-                else:
-                    return elif_statement.evaluate()
-            case _:
-                raise DSLRuntimeError(
-                    f"Cannot evaluate ELIF statement {self.contents}."
-                )
+        statement = self
+        # Chained ELIF statements are followed in a loop rather than by
+        # recursion so long chains do not hit the recursion limit
+        while True:
+            match statement.contents:
+                case [ElseKeyword(), EvaluableAction() as action]:
+                    return action.evaluate(context)
+                case [
+                    ElifKeyword(),
+                    EvaluableExpression() | Operand() as condition,
+                    ThenKeyword(),
+                    EvaluableAction() as action,
+                ]:
+                    if (
+                        isinstance(condition, Operand)
+                        and condition.resolve(context)
+                        or isinstance(condition, EvaluableExpression)
+                        and condition.evaluate(context)
+                    ):
+                        return action.evaluate(context)
+                    else:
+                        return MISSING
+                case [
+                    ElifKeyword(),
+                    EvaluableExpression() | Operand() as condition,
+                    ThenKeyword(),
+                    EvaluableAction() as action,
+                    EvaluableElifStatement() as elif_statement,
+                ]:
+                    if (
+                        isinstance(condition, Operand)
+                        and condition.resolve(context)
+                        or isinstance(condition, EvaluableExpression)
+                        and condition.evaluate(context)
+                    ):
+                        return action.evaluate(context)
+                    else:
+                        statement = elif_statement
+                case _:
+                    raise DSLRuntimeError(
+                        f"Cannot evaluate ELIF statement {statement.contents}."
+                    )
 
 
 class EvaluableAction(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the Action."""
         first_item = self.contents[0]
         if not isinstance(first_item, Action):
@@ -153,54 +212,70 @@ class EvaluableAction(Evaluable):
         action_args = []
         for item in self.contents[1:]:
             if isinstance(item, Operand):
-                action_args.append(item.true_value)
+                action_args.append(item.resolve(context))
             elif isinstance(item, EvaluableList):
-                action_args.append(item.evaluate())
+                action_args.append(item.evaluate(context))
             elif isinstance(item, Evaluable):
-                action_args.extend(item.evaluate())
+                action_args.extend(item.evaluate(context))
         return action.execute(*action_args)
 
 
 class EvaluableActionArg(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the Action arg."""
         action_args: list[Any] = []
-        for item in self.contents:
-            if isinstance(item, Operand):
-                action_args.append(item.true_value)
-            elif isinstance(item, Evaluable):
-                action_args.extend(item.evaluate())
+        # Nested action args are walked with a stack rather than by recursion
+        stack = [iter(self.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableActionArg):
+                    stack.append(iter(item.contents))
+                    break
+                if isinstance(item, Operand):
+                    action_args.append(item.resolve(context))
+                elif isinstance(item, Evaluable):
+                    action_args.extend(item.evaluate(context))
+            else:
+                stack.pop()
         return action_args
 
 
 class EvaluableList(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the contents of the Evaluable list."""
         list_obj: list[Any] = []
         for item in self.contents:
             if isinstance(item, Operand):
-                list_obj.append(item.true_value)
+                list_obj.append(item.resolve(context))
             elif isinstance(item, EvaluableList):
-                list_obj.append(item.evaluate())
+                list_obj.append(item.evaluate(context))
             elif isinstance(item, Evaluable):
-                list_obj.extend(item.evaluate())
+                list_obj.extend(item.evaluate(context))
         return list_obj
 
 
 class EvaluableListArg(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """Evaluate the contents of the Evaluable list arg."""
         list_ext: list[Any] = []
-        for item in self.contents:
-            if isinstance(item, Operand):
-                list_ext.append(item.true_value)
-            elif isinstance(item, Evaluable):
-                list_ext.extend(item.evaluate())
+        # Nested list args are walked with a stack rather than by recursion
+        stack = [iter(self.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableListArg):
+                    stack.append(iter(item.contents))
+                    break
+                if isinstance(item, Operand):
+                    list_ext.append(item.resolve(context))
+                elif isinstance(item, Evaluable):
+                    list_ext.extend(item.evaluate(context))
+            else:
+                stack.pop()
         return list_ext
 
 
 class EvaluableExpression(Evaluable):
-    def evaluate(self) -> Any:
+    def evaluate(self, context: EvaluationContext | None = None) -> Any:
         """
         Evaluate the contents of the Evaluable expression.
 
@@ -218,10 +293,17 @@ class EvaluableExpression(Evaluable):
             # (which we treat as operands).
             if isinstance(item, (UnitaryOperator, BinaryOperator)):
                 operators.append(item)
+            elif isinstance(
+                item, (Evaluable, Operand)
+            ) and self.short_circuits(operators, operands):
+                # The left operand is the value of the AND/OR, so the right
+                # operand is not evaluated
+                operators.popleft()
+                continue
             if isinstance(item, Evaluable):
-                operands.append(item.evaluate())
+                operands.append(item.evaluate(context))
             elif isinstance(item, Operand):
-                operands.append(item.true_value)
+                operands.append(item.resolve(context))
 
             if not operators:
                 continue
@@ -250,3 +332,25 @@ class EvaluableExpression(Evaluable):
             )
 
         return operands.pop()
+
+    @staticmethod
+    def short_circuits(
+        operators: deque[UnitaryOperator | BinaryOperator],
+        operands: deque[Any],
+    ) -> bool:
+        """
+        Whether the next operand is the right operand of an AND/OR whose
+        value is its left operand: a scalar which is falsy for AND or truthy
+        for OR. Lists are compared elementwise so always need both operands.
+        :param operators: The operators waiting for operands.
+        :param operands: The values of the operands waiting for operators.
+        :return: Whether to skip the next operand.
+        """
+        if len(operators) != 1 or len(operands) != 1:
+            return False
+        operator, x = operators[0], operands[0]
+        if not isinstance(operator, (AndOperator, OrOperator)):
+            return False
+        return not isinstance(x, list) and bool(x) != isinstance(
+            operator, AndOperator
+        )
@@ -1,3 +1,5 @@
+from typing import Any
+
 from dsl.models.representables import Representable
 
 
@@ -5,6 +7,11 @@ class Keyword(Representable):
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Keyword):
+            return False
+        return self.__class__.__name__ == other.__class__.__name__
+
 
 class IfKeyword(Keyword):
     pass
@@ -1,6 +1,7 @@
 from abc import abstractmethod
 from typing import Any
 
+from dsl.models.context import EvaluationContext
 from dsl.models.exceptions import DSLException, DSLRuntimeError
 from dsl.models.representables import Representable
 
@@ -32,6 +33,14 @@ class Operand(Representable):
         """Get the true value of the operand."""
         ...
 
+    def resolve(self, context: EvaluationContext | None = None) -> Any:
+        """
+        Get the true value of the operand in an evaluation context
+        :param context: An evaluation context, or None.
+        :return: The true value of the operand.
+        """
+        return self.true_value
+
 
 class NoneOperand(Operand):
     @property
@@ -58,8 +67,18 @@ class VariableOperand(Operand):
     @property
     def true_value(self) -> Any:
         """Get the value of variable token."""
+        return self.resolve()
+
+    def resolve(self, context: EvaluationContext | None = None) -> Any:
+        """
+        Get the value of the variable in an evaluation context
+        :param context: An evaluation context, or None to look the variable
+        up in the variables bound when it was lexed.
+        :return: The value of the variable.
+        """
+        variables = self.variables if context is None else context.variables
         try:
-            return self.variables[self.token_value]
+            return variables[self.token_value]
         except KeyError as err:
             raise DSLRuntimeError(
                 f"{self.token_value} does not exist."
@@ -78,3 +97,33 @@ class IntegerOperand(Operand):
     def true_value(self) -> int:
         """Get the integer value of integer token."""
         return int(self.token_value)
+
+
+class ConstantOperand(Operand):
+    def __init__(self, constant: Any, token_value: str | None = None):
+        """
+        :param constant: The value of the operand, computed when the rule
+        was optimized.
+        :param token_value: The token the value was computed from.
+        """
+        super().__init__(
+            repr(constant) if token_value is None else token_value
+        )
+        self.constant = constant
+
+    @property
+    def true_value(self) -> Any:
+        """Get the constant, copying lists so that it cannot be changed."""
+        if not isinstance(self.constant, list):
+            return self.constant
+        constant: list[Any] = []
+        stack = [(self.constant, constant)]
+        while stack:
+            values, copy = stack.pop()
+            for value in values:
+                if isinstance(value, list):
+                    copy.append([])
+                    stack.append((value, copy[-1]))
+                else:
+                    copy.append(value)
+        return constant
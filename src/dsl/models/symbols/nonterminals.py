@@ -76,3 +76,14 @@ class ListSymbol(NonTerminalSymbol):
 
 class ListArgSymbol(NonTerminalSymbol):
     represents: ClassVar[type[Evaluable]] = EvaluableListArg
+
+
+class SuffixSymbol(NonTerminalSymbol):
+    """
+    The remainders of left-factored productions after their shared prefix.
+    Its contents are spliced into its parent when parsed, so it is never
+    reduced. See Grammar.left_factor.
+    """
+
+    represents: ClassVar[type[Evaluable]] = Evaluable
+    head: ClassVar[type[NonTerminalSymbol]]
@@ -0,0 +1,316 @@
+"""
+Optimization of reduced execution trees.
+
+Literal operands are replaced by ConstantOperands holding their values, and
+expressions and lists which do not depend on any variable are evaluated
+once into ConstantOperands. IF/ELIF branches whose conditions are constant
+are pruned: a branch which can never fire is removed, and a branch which
+always fires ends its statement. The optimized tree evaluates to the same
+outcome as the tree it was optimized from.
+"""
+from typing import Any, Iterator, Mapping
+
+from dsl.models.context import EvaluationContext
+from dsl.models.representables.evaluables import (
+    Evaluable,
+    EvaluableAction,
+    EvaluableActionArg,
+    EvaluableBlock,
+    EvaluableElifStatement,
+    EvaluableExpression,
+    EvaluableIfStatement,
+    EvaluableList,
+    EvaluableListArg,
+)
+from dsl.models.representables.keywords import (
+    ElifKeyword,
+    ElseKeyword,
+    IfKeyword,
+    ThenKeyword,
+)
+from dsl.models.representables.operands import (
+    BoolOperand,
+    ConstantOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    Operand,
+    StringOperand,
+    VariableOperand,
+)
+from dsl.models.representables.operators import (
+    AndOperator,
+    AttributeOperator,
+    CountFunction,
+    DivOperator,
+    EqualOperator,
+    GreaterThanOperator,
+    GreaterThanOrEqualOperator,
+    IndexingOperator,
+    LessThanOperator,
+    LessThanOrEqualOperator,
+    MinusOperator,
+    ModOperator,
+    MultOperator,
+    NotEqualOperator,
+    NotOperator,
+    OrOperator,
+    PlusOperator,
+)
+
+# Operands whose value only depends on their token
+LITERAL_OPERANDS = (
+    BoolOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    StringOperand,
+)
+
+# Operators which always give the same value for the same operands, so that
+# they can be evaluated once. Other operators, such as functions defined
+# outside this package, may not.
+FOLDABLE_OPERATORS = frozenset(
+    {
+        AndOperator,
+        AttributeOperator,
+        CountFunction,
+        DivOperator,
+        EqualOperator,
+        GreaterThanOperator,
+        GreaterThanOrEqualOperator,
+        IndexingOperator,
+        LessThanOperator,
+        LessThanOrEqualOperator,
+        MinusOperator,
+        ModOperator,
+        MultOperator,
+        NotEqualOperator,
+        NotOperator,
+        OrOperator,
+        PlusOperator,
+    }
+)
+
+# Types of the values of expressions which can be shared between evaluations
+CONSTANT_TYPES = (bool, int, float, str, type(None))
+
+
+class VariableLookupError(Exception):
+    """Raised when an expression being folded looks up a variable."""
+
+
+class NoVariables(Mapping[str, Any]):
+    """Variables which raise VariableLookupError when they are looked up."""
+
+    def __getitem__(self, name: str) -> Any:
+        raise VariableLookupError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+
+class Optimizer:
+    """
+    Fold constants and prune dead branches of execution trees. Trees are not
+    changed; the optimized tree is built from new nodes which share the
+    nodes that could not be optimized.
+    """
+
+    def __init__(self):
+        self.context = EvaluationContext(NoVariables())
+
+    def optimize(self, tree: Evaluable) -> Evaluable:
+        """
+        Optimize an execution tree
+        :param tree: An execution tree, such as the tree of a compiled rule.
+        :return: An execution tree with the same outcome.
+        """
+        if isinstance(tree, EvaluableBlock):
+            return self._block(tree)
+        if isinstance(tree, EvaluableIfStatement):
+            statement = self._statement(tree)
+            if statement is not None:
+                return statement
+            # The statement never fires but its outcome is still MISSING
+            return EvaluableIfStatement(
+                [
+                    IfKeyword(),
+                    ConstantOperand(False, "FALSE"),
+                    ThenKeyword(),
+                    tree.contents[3],
+                ]
+            )
+        return self._fold(tree)
+
+    def _block(self, block: EvaluableBlock) -> EvaluableBlock:
+        """Optimize the statements of a block into a flat block."""
+        contents: list[Any] = []
+        stack = [iter(block.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                if not isinstance(item, EvaluableIfStatement):
+                    contents.append(item)
+                    continue
+                statement = self._statement(item)
+                if statement is not None:
+                    contents.append(statement)
+            else:
+                stack.pop()
+        return EvaluableBlock(contents)
+
+    def _statement(
+        self, statement: EvaluableIfStatement
+    ) -> EvaluableIfStatement | None:
+        """
+        Optimize an IF statement, pruning the branches whose conditions are
+        constant
+        :param statement: An IF statement.
+        :return: The optimized statement, or None if it can never fire.
+        """
+        branches = statement.branches()
+        if branches is None:
+            return statement
+        optimized: list[tuple[Any, Any]] = []
+        for condition, action in branches:
+            if condition is not None:
+                condition = self._fold(condition)
+                if isinstance(condition, ConstantOperand):
+                    if not condition.true_value:
+                        continue
+                    condition = None
+            optimized.append((condition, self._action(action)))
+            if condition is None:
+                break
+        if not optimized:
+            return None
+
+        # Rebuild the ELIF chain from its end
+        elif_statement = None
+        for condition, action in reversed(optimized[1:]):
+            if condition is None:
+                contents = [ElseKeyword(), action]
+            else:
+                contents = [ElifKeyword(), condition, ThenKeyword(), action]
+            if elif_statement is not None:
+                contents.append(elif_statement)
+            elif_statement = EvaluableElifStatement(contents)
+        condition, action = optimized[0]
+        if condition is None:
+            condition = ConstantOperand(True, "TRUE")
+        contents = [IfKeyword(), condition, ThenKeyword(), action]
+        if elif_statement is not None:
+            contents.append(elif_statement)
+        return EvaluableIfStatement(contents)
+
+    def _action(self, action: EvaluableAction) -> EvaluableAction:
+        """Fold the arguments of an action."""
+        return self._chain(action, EvaluableActionArg)
+
+    def _list(self, evaluable: EvaluableList) -> EvaluableList:
+        """Fold the items of a list."""
+        return self._chain(evaluable, EvaluableListArg)
+
+    def _chain(self, node: Evaluable, chain_type: type[Evaluable]) -> Any:
+        """
+        Fold the items of a chain of nested nodes, such as the action args
+        of an action, without recursion. Lists directly in the first node
+        are appended to its value so can be folded, but lists in the
+        nested nodes are extended into it so keep their own node.
+        :param node: The first node of the chain.
+        :param chain_type: The type of the nodes nested in the chain.
+        :return: The first node of the folded chain.
+        """
+        nodes = []
+        child: Any = node
+        while child is not None:
+            nodes.append(child)
+            children = [c for c in child.contents if isinstance(c, chain_type)]
+            if len(children) > 1:
+                return node
+            child = children[0] if children else None
+
+        folded = None
+        for child in reversed(nodes):
+            contents = []
+            for item in child.contents:
+                if isinstance(item, chain_type):
+                    contents.append(folded)
+                elif child is not node and isinstance(item, EvaluableList):
+                    contents.append(self._list(item))
+                else:
+                    contents.append(self._fold(item))
+            folded = type(child)(contents)
+        return folded
+
+    def _fold(self, item: Any) -> Any:
+        """
+        Fold an operand, expression or list into a ConstantOperand if its
+        value does not depend on any variable
+        :param item: An item of an execution tree.
+        :return: A ConstantOperand, or the item with its contents folded.
+        """
+        if isinstance(item, EvaluableExpression):
+            folded, _ = self._expression(item)
+            return folded
+        if isinstance(item, LITERAL_OPERANDS):
+            return ConstantOperand(item.true_value, item.token_value)
+        if isinstance(item, EvaluableList):
+            return self._constant(self._list(item), types=(list,))
+        return item
+
+    def _expression(self, expression: EvaluableExpression) -> tuple[Any, bool]:
+        """
+        Fold an expression and the expressions nested in it
+        :param expression: An expression.
+        :return: The folded expression, and whether it is pure: whether it
+        only has foldable operators, literals, variables and lists, so that
+        it can be evaluated once when it does not look up any variable.
+        """
+        contents = []
+        is_pure = True
+        for item in expression.contents:
+            if isinstance(item, EvaluableExpression):
+                item, is_item_pure = self._expression(item)
+                is_pure = is_pure and is_item_pure
+            elif isinstance(item, (Evaluable, Operand)):
+                item = self._fold(item)
+                is_pure = is_pure and isinstance(
+                    item, (ConstantOperand, EvaluableList, VariableOperand)
+                )
+            else:
+                is_pure = is_pure and type(item) in FOLDABLE_OPERATORS
+            contents.append(item)
+        folded = type(expression)(contents)
+        if not is_pure:
+            return folded, False
+        return self._constant(folded, types=CONSTANT_TYPES), True
+
+    def _constant(self, evaluable: Evaluable, types: tuple[type, ...]) -> Any:
+        """
+        Evaluate an Evaluable into a ConstantOperand if it does not look up
+        any variable, does not raise, and has a value of one of some types.
+        """
+        try:
+            value = evaluable.evaluate(self.context)
+        except Exception:
+            # Errors are raised when the tree is evaluated instead
+            return evaluable
+        if type(value) not in types:
+            return evaluable
+        return ConstantOperand(value)
+
+
+def optimize(tree: Evaluable) -> Evaluable:
+    """
+    Optimize an execution tree by folding constants and pruning dead branches
+    :param tree: An execution tree.
+    :return: An execution tree with the same outcome.
+    """
+    return Optimizer().optimize(tree)
@@ -0,0 +1,972 @@
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Iterable, Iterator, MutableSequence, Sequence
+
+from dsl.lexers import TokenStream
+from dsl.models import Grammar, Punctuator
+from dsl.models.exceptions import DSLSyntaxError
+from dsl.models.grammar import ParseTable, Production, base_grammar
+from dsl.models.representables import Representable
+from dsl.models.representables.operators import (
+    AndOperator,
+    DivOperator,
+    EqualOperator,
+    GreaterThanOperator,
+    GreaterThanOrEqualOperator,
+    LessThanOperator,
+    LessThanOrEqualOperator,
+    MinusOperator,
+    ModOperator,
+    MultOperator,
+    NotEqualOperator,
+    NotOperator,
+    Operator,
+    OrOperator,
+    PlusOperator,
+)
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol, TSymbol
+from dsl.models.symbols.nonterminals import (
+    BlockSymbol,
+    ConditionExprSymbol,
+    ConditionFactorSymbol,
+    ConditionSymbol,
+    ConditionTermSymbol,
+    ExpressionSymbol,
+    FactorSymbol,
+    SuffixSymbol,
+    TermSymbol,
+)
+from dsl.models.symbols.terminals import (
+    AndLiteral,
+    DivLiteral,
+    EqualLiteral,
+    GreaterThanLiteral,
+    GreaterThanOrEqualLiteral,
+    LessThanLiteral,
+    LessThanOrEqualLiteral,
+    MinusLiteral,
+    ModLiteral,
+    MultLiteral,
+    NotEqualLiteral,
+    NotLiteral,
+    OrLiteral,
+    PlusLiteral,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def reduce_tree(node: TSymbol) -> list[Representable]:
+    """
+    Reduces a parse tree into an execution tree without recursion
+    :param node: A terminal or non-terminal symbol.
+    :return: A list of Representable objects (objects a symbol represents)
+    """
+    represents: list[Representable] = []
+    stack: list[tuple[TSymbol, list[Representable]]] = [(node, represents)]
+    while stack:
+        node, contents = stack.pop()
+        if isinstance(node, TerminalSymbol):
+            contents.append(node.represents)
+            continue
+
+        non_punctuations = [
+            sub_node
+            for sub_node in node.contents
+            if not isinstance(sub_node.represents, Punctuator)
+        ]
+
+        if len(non_punctuations) > 1 or isinstance(node, BlockSymbol):
+            non_terminal_represent = node.represents()
+            contents.append(non_terminal_represent)
+            stack.extend(
+                (sub_node, non_terminal_represent.contents)
+                for sub_node in reversed(non_punctuations)
+            )
+        else:
+            stack.append((non_punctuations[0], contents))
+    return represents
+
+
+def token_list(
+    tokens: Iterable[TerminalSymbol],
+) -> Sequence[TerminalSymbol]:
+    """
+    Get the tokens of a parse as a sequence, for parsers which backtrack
+    :param tokens: An iterable of terminals.
+    :return: The terminals as a sequence, without copying a sequence.
+    """
+    return tokens if isinstance(tokens, Sequence) else list(tokens)
+
+
+@dataclass
+class ParseContext:
+    """
+    The state of a single parse. Parsers keep all state which changes while
+    parsing in a context, so a parser can be shared between threads.
+    """
+
+    tokens: Sequence[TerminalSymbol]
+    table: ParseTable
+    parse_tree: MutableSequence[TSymbol] = field(default_factory=deque)
+    rejected: set[tuple[Production, int]] = field(default_factory=set)
+    memo: dict[
+        tuple[type[NonTerminalSymbol], int], tuple[NonTerminalSymbol, int]
+    ] = field(default_factory=dict)
+
+    def token_type(self, index: int) -> type[TerminalSymbol]:
+        """
+        Get the type of a token, without creating it if the tokens are a
+        TokenStream
+        :param index: The index of the token.
+        :return: The type of the token.
+        """
+        if isinstance(self.tokens, TokenStream):
+            return self.tokens.symbol_type(index)
+        return self.tokens[index].__class__
+
+
+class Parser(ABC):
+    DEFAULT_START_SYMBOL: ClassVar[type[NonTerminalSymbol]]
+
+    @abstractmethod
+    def parse(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[TSymbol]:
+        """Parse an iterable of terminals from a starting non-terminal."""
+        ...
+
+    @abstractmethod
+    def reduce(self, node: TSymbol) -> list[Representable]:
+        """
+        Reduce a parse tree into an abstract syntax tree of objects
+        the symbols represent.
+        """
+        ...
+
+    def construct(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[Representable]:
+        """
+        Parse terminals from a starting non-terminal and reduce the parse
+        tree into an abstract syntax tree.
+        :param tokens: An iterable of terminals, such as Lexer.iter_tokens
+        :param start_symbol: A optional non-terminal.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        parse_tree = self.parse(tokens, start_symbol=start_symbol)
+        return self.reduce(parse_tree[0])
+
+
+class DefaultParser(Parser):
+    """
+    A backtracking recursive descent parser trying the productions of each
+    non-terminal in the order of the grammar.
+
+    The state of each parse is kept in a ParseContext created per call, so a
+    parser can be shared between threads.
+    """
+
+    DEFAULT_START_SYMBOL: ClassVar[type[NonTerminalSymbol]] = BlockSymbol
+
+    def __init__(self, grammar: Grammar | None = None):
+        self.grammar = grammar or base_grammar
+
+    def parse(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[TSymbol]:
+        """
+        Parse terminals from a starting non-terminal.
+        :param tokens: An iterable of terminals
+        :param start_symbol: A optional non-terminal.
+        :return: A parse tree represented by a list of nested tokens.
+        """
+        return self.parse_context(self.create_context(tokens), start_symbol)
+
+    def create_context(self, tokens: Iterable[TerminalSymbol]) -> ParseContext:
+        """
+        Create the state of a parse of terminals
+        :param tokens: An iterable of terminals
+        :return: The context to parse in.
+        """
+        # The grammar may have changed since the last parse
+        return ParseContext(token_list(tokens), self.grammar.compile())
+
+    def parse_context(
+        self,
+        context: ParseContext,
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[TSymbol]:
+        """
+        Parse the terminals of a context from a starting non-terminal.
+        :param context: The context to parse in.
+        :param start_symbol: A optional non-terminal, whose type is parsed.
+        :return: A parse tree represented by a list of nested tokens.
+        """
+        symbol_type = (
+            start_symbol.__class__
+            if start_symbol
+            else self.DEFAULT_START_SYMBOL
+        )
+        pointer = self.expand(symbol_type(), context.parse_tree, 0, context)
+        logger.debug("Parse Tree: %s", context.parse_tree)
+        if not context.parse_tree or pointer < len(context.tokens):
+            raise DSLSyntaxError("Input cannot be parsed.")
+        return list(context.parse_tree)
+
+    def expand(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> int:
+        """
+        Expand a parse tree by trying all possible productions in the subtree
+        :param node: The non-terminal node to expand
+        :param tree: The super-tree of the non-terminal node
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        tree.append(node)
+        for production in self.productions(node.__class__, origin, context):
+            if (production, origin) in context.rejected:
+                continue
+            pointer = origin
+            for symbol_type in production.body:
+                if pointer >= len(context.tokens):
+                    break
+
+                if issubclass(symbol_type, TerminalSymbol):
+                    if issubclass(context.token_type(pointer), symbol_type):
+                        node.contents.append(context.tokens[pointer])
+                        pointer += 1
+                        continue
+                    break
+
+                terminal_count = self.expand(
+                    symbol_type(), node.contents, pointer, context
+                )
+                if terminal_count == 0:
+                    break
+                pointer += terminal_count
+            else:
+                return pointer - origin
+            node.contents = deque()
+            context.rejected.add((production, origin))
+        tree.pop()
+        return 0
+
+    def productions(
+        self,
+        symbol_type: type[NonTerminalSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> tuple[Production, ...] | list[Production]:
+        """
+        Get the productions of a non-terminal which can start with the terminal
+        at a given index
+        :param symbol_type: The type of non-terminal to expand.
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: The productions to try, in the order of the grammar.
+        """
+        if origin < len(context.tokens):
+            token_type = context.token_type(origin)
+            return context.table.predict(symbol_type, token_type)
+        return self.grammar[symbol_type]
+
+    def reduce(self, node: TSymbol) -> list[Representable]:
+        """
+        Reduces the parse tree into an execution tree
+        :param node: A terminal or non-terminal symbol.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        if isinstance(node, TerminalSymbol):
+            return [node.represents]
+
+        non_punctuations = [
+            sub_node
+            for sub_node in node.contents
+            if not isinstance(sub_node.represents, Punctuator)
+        ]
+
+        if len(non_punctuations) > 1 or isinstance(node, BlockSymbol):
+            non_terminal_represent = node.represents()
+            for sub_node in non_punctuations:
+                non_terminal_represent.contents.extend(self.reduce(sub_node))
+            return [non_terminal_represent]
+        return self.reduce(non_punctuations[0])
+
+
+class LeftFactoredParser(DefaultParser):
+    """
+    A DefaultParser which parses with the left-factored form of its grammar.
+
+    Productions sharing a prefix (e.g. the seven ConditionSymbol productions
+    starting with ExpressionSymbol) parse the prefix once and then try only
+    the remainders. SuffixSymbol nodes are spliced into their parents as they
+    are parsed, so parse trees and their reductions are the same as the ones
+    produced by DefaultParser with the original grammar.
+    """
+
+    def __init__(self, grammar: Grammar | None = None):
+        self.original_grammar = grammar or base_grammar
+        super().__init__(grammar=self.original_grammar.left_factor())
+
+    def expand(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> int:
+        """
+        Expand a parse tree by trying all possible productions in the subtree,
+        where suffix non-terminals may match no terminals
+        :param node: The non-terminal node to expand
+        :param tree: The super-tree of the non-terminal node
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        tree.append(node)
+        for production in self.productions(node.__class__, origin, context):
+            if (production, origin) in context.rejected:
+                continue
+            pointer = origin
+            for symbol_type in production.body:
+                if issubclass(symbol_type, TerminalSymbol):
+                    if pointer < len(context.tokens) and issubclass(
+                        context.token_type(pointer), symbol_type
+                    ):
+                        node.contents.append(context.tokens[pointer])
+                        pointer += 1
+                        continue
+                    break
+
+                if not issubclass(symbol_type, SuffixSymbol):
+                    if pointer >= len(context.tokens):
+                        break
+                    terminal_count = self.expand(
+                        symbol_type(), node.contents, pointer, context
+                    )
+                    if terminal_count == 0:
+                        break
+                    pointer += terminal_count
+                    continue
+
+                # A suffix has succeeded when it is added to the tree, even
+                # if it matched no terminals
+                suffix = symbol_type()
+                pointer += self.expand(suffix, node.contents, pointer, context)
+                if not node.contents or node.contents[-1] is not suffix:
+                    break
+                node.contents.pop()
+                node.contents.extend(suffix.contents)
+            else:
+                return pointer - origin
+            node.contents = deque()
+            context.rejected.add((production, origin))
+        tree.pop()
+        return 0
+
+
+class PackratParser(DefaultParser):
+    """
+    A DefaultParser which memoizes the outcome of every expansion.
+
+    Each (non-terminal, position) pair is expanded at most once per parse, so
+    alternatives sharing a prefix (e.g. the three ExpressionSymbol
+    productions) reuse the sub-tree parsed by the first alternative instead
+    of parsing it again. Parsing is linear in the number of tokens.
+    """
+
+    def expand(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> int:
+        """
+        Expand a parse tree, reusing the result of a previous expansion of the
+        same non-terminal at the same position if there is one
+        :param node: The non-terminal node to expand
+        :param tree: The super-tree of the non-terminal node
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        key = (node.__class__, origin)
+        if key in context.memo:
+            subtree, terminal_count = context.memo[key]
+            if terminal_count:
+                tree.append(subtree)
+            return terminal_count
+        terminal_count = super().expand(node, tree, origin, context)
+        context.memo[key] = (node, terminal_count)
+        return terminal_count
+
+
+@dataclass
+class FusedContext(ParseContext):
+    """
+    The state of a single parse by FusedParser, with the objects each
+    non-terminal expanded into at each position memoized.
+    """
+
+    built: dict[
+        tuple[type[NonTerminalSymbol], int], tuple[Representable | None, int]
+    ] = field(default_factory=dict)
+
+
+class FusedParser(PackratParser):
+    """
+    A PackratParser which reduces while it parses.
+
+    construct creates the objects symbols represent as soon as their
+    production has been parsed, dropping punctuators and collapsing
+    non-terminals with a single remaining child like reduce does, so no
+    NonTerminalSymbol tree is built. parse still builds parse trees.
+    """
+
+    def create_context(self, tokens: Iterable[TerminalSymbol]) -> FusedContext:
+        """
+        Create the state of a parse of terminals
+        :param tokens: An iterable of terminals
+        :return: The context to parse in.
+        """
+        return FusedContext(token_list(tokens), self.grammar.compile())
+
+    def construct(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[Representable]:
+        """
+        Parse terminals from a starting non-terminal straight into an
+        abstract syntax tree.
+        :param tokens: An iterable of terminals
+        :param start_symbol: A optional non-terminal.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        context = self.create_context(tokens)
+        symbol_type = (
+            start_symbol.__class__
+            if start_symbol
+            else self.DEFAULT_START_SYMBOL
+        )
+        tree: list[Any] = []
+        pointer = self.build(symbol_type, tree, 0, context)
+        if not tree or pointer < len(context.tokens):
+            raise DSLSyntaxError("Input cannot be parsed.")
+        return tree
+
+    def build(
+        self,
+        symbol_type: type[NonTerminalSymbol],
+        tree: list[Any],
+        origin: int,
+        context: FusedContext,
+    ) -> int:
+        """
+        Expand a non-terminal into the object it represents by trying all
+        possible productions
+        :param symbol_type: The type of non-terminal to expand.
+        :param tree: The contents of the object the parent represents.
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        key = (symbol_type, origin)
+        if key in context.built:
+            represents, terminal_count = context.built[key]
+            if represents is not None:
+                tree.append(represents)
+            return terminal_count
+
+        tokens = context.tokens
+        for production in self.productions(symbol_type, origin, context):
+            if (production, origin) in context.rejected:
+                continue
+            pointer = origin
+            contents: list[Representable | TerminalSymbol] = []
+            for body_symbol_type in production.body:
+                if pointer >= len(tokens):
+                    break
+
+                if issubclass(body_symbol_type, TerminalSymbol):
+                    if issubclass(
+                        context.token_type(pointer), body_symbol_type
+                    ):
+                        # Only represent terminals once the production parses
+                        contents.append(tokens[pointer])
+                        pointer += 1
+                        continue
+                    break
+
+                terminal_count = self.build(
+                    body_symbol_type, contents, pointer, context
+                )
+                if terminal_count == 0:
+                    break
+                pointer += terminal_count
+            else:
+                represents = self._represent(symbol_type, contents)
+                context.built[key] = (represents, pointer - origin)
+                tree.append(represents)
+                return pointer - origin
+            context.rejected.add((production, origin))
+        context.built[key] = (None, 0)
+        return 0
+
+    @staticmethod
+    def _represent(
+        symbol_type: type[NonTerminalSymbol],
+        contents: list[Representable | TerminalSymbol],
+    ) -> Representable:
+        """Create the object a parsed non-terminal represents."""
+        non_punctuations = []
+        for sub_node in contents:
+            if isinstance(sub_node, TerminalSymbol):
+                sub_node = sub_node.represents
+                if isinstance(sub_node, Punctuator):
+                    continue
+            non_punctuations.append(sub_node)
+
+        if len(non_punctuations) > 1 or issubclass(symbol_type, BlockSymbol):
+            represents = symbol_type.represents()
+            represents.contents.extend(non_punctuations)
+            return represents
+        return non_punctuations[0]
+
+
+@dataclass(slots=True)
+class _Expansion:
+    """The state of a single non-terminal expansion in IterativeParser."""
+
+    node: NonTerminalSymbol
+    tree: MutableSequence[TSymbol]
+    origin: int
+    productions: Iterator[Production]
+    production: Production | None = None
+    index: int = 0
+    pointer: int = 0
+
+
+class IterativeParser(PackratParser):
+    """
+    A PackratParser which expands and reduces using an explicit work stack.
+
+    The parse and execution trees are the same as the ones produced by
+    DefaultParser, but their depth is no longer bounded by Python's recursion
+    limit, e.g. for long chains of IF statements, ELIF statements or list
+    elements in the right-recursive base grammar.
+    """
+
+    def expand(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> int:
+        """
+        Expand a parse tree by trying all possible productions in the subtree
+        :param node: The non-terminal node to expand
+        :param tree: The super-tree of the non-terminal node
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        stack = [self._start_expansion(node, tree, origin, context)]
+        terminal_count: int | None = None
+        while stack:
+            expansion = stack[-1]
+            if terminal_count is not None:
+                # A child expansion has just finished
+                if terminal_count == 0:
+                    self._reject(expansion, context)
+                else:
+                    expansion.pointer += terminal_count
+                    expansion.index += 1
+                terminal_count = None
+
+            child = self._advance(expansion, context)
+            if isinstance(child, _Expansion):
+                stack.append(child)
+                continue
+            if child is None:
+                # Either a child was found in the memo or a production failed
+                continue
+
+            stack.pop()
+            terminal_count = child
+            key = (expansion.node.__class__, expansion.origin)
+            context.memo[key] = (expansion.node, terminal_count)
+        return terminal_count or 0
+
+    def _start_expansion(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> _Expansion:
+        """Append a node to its super-tree and start expanding it."""
+        tree.append(node)
+        productions = iter(self.productions(node.__class__, origin, context))
+        return _Expansion(node, tree, origin, productions)
+
+    def _reject(self, expansion: _Expansion, context: ParseContext) -> None:
+        """Reject the production an expansion is currently trying."""
+        expansion.node.contents = deque()
+        context.rejected.add((expansion.production, expansion.origin))
+        expansion.production = None
+
+    def _advance(
+        self, expansion: _Expansion, context: ParseContext
+    ) -> _Expansion | int | None:
+        """
+        Match terminals of the current production until a non-terminal needs
+        expanding
+        :param expansion: The expansion to advance.
+        :param context: The context to parse in.
+        :return: The expansion of a non-terminal child, the terminal count of
+        the finished expansion, or None if the expansion should be advanced
+        again.
+        """
+        if expansion.production is None:
+            for production in expansion.productions:
+                if (production, expansion.origin) not in context.rejected:
+                    break
+            else:
+                expansion.tree.pop()
+                return 0
+            expansion.production = production
+            expansion.index = 0
+            expansion.pointer = expansion.origin
+
+        node, body = expansion.node, expansion.production.body
+        while expansion.index < len(body):
+            if expansion.pointer >= len(context.tokens):
+                self._reject(expansion, context)
+                return None
+
+            symbol_type = body[expansion.index]
+            if issubclass(symbol_type, TerminalSymbol):
+                token_type = context.token_type(expansion.pointer)
+                if not issubclass(token_type, symbol_type):
+                    self._reject(expansion, context)
+                    return None
+                node.contents.append(context.tokens[expansion.pointer])
+                expansion.pointer += 1
+                expansion.index += 1
+                continue
+
+            key = (symbol_type, expansion.pointer)
+            if key not in context.memo:
+                return self._start_expansion(
+                    symbol_type(), node.contents, expansion.pointer, context
+                )
+            subtree, terminal_count = context.memo[key]
+            if terminal_count == 0:
+                self._reject(expansion, context)
+                return None
+            node.contents.append(subtree)
+            expansion.pointer += terminal_count
+            expansion.index += 1
+        return expansion.pointer - expansion.origin
+
+    def reduce(self, node: TSymbol) -> list[Representable]:
+        """
+        Reduces the parse tree into an execution tree without recursion
+        :param node: A terminal or non-terminal symbol.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        return reduce_tree(node)
+
+
+@dataclass
+class PrecedenceContext(ParseContext):
+    """
+    The state of a single parse by PrecedenceParser, with the precedence
+    levels and units of token types cached for the grammar being parsed.
+    """
+
+    levels: dict[type[TerminalSymbol], int | None] = field(
+        default_factory=dict
+    )
+    units: dict[type[TerminalSymbol], bool] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class OperatorRule:
+    """
+    How PrecedenceParser parses an operator token.
+
+    :param symbol: The non-terminal the operation is parsed into.
+    :param operator: The operator whose precedence the operation has.
+    :param operand: The operator whose precedence is the lowest the (right)
+    operand can contain, e.g. `a AND b OR c` parses as `a AND (b OR c)`.
+    """
+
+    symbol: type[NonTerminalSymbol]
+    operator: type[Operator]
+    operand: type[Operator]
+
+
+class PrecedenceParser(DefaultParser):
+    """
+    A DefaultParser which parses expressions by precedence climbing over
+    Operator.precedence instead of descending through every level of the
+    grammar.
+
+    Operations are parsed into a single non-terminal each, e.g. `1 + 2` is
+    parsed into ExpressionSymbol([1, +, 2]) rather than a ConditionExprSymbol
+    nesting seven more non-terminals, and reduce into the same Evaluable
+    trees as DefaultParser. Factors, e.g. variables, COUNT( and parenthesis,
+    are expanded using the grammar.
+    """
+
+    # Non-terminals parsed by precedence climbing and the operator whose
+    # precedence is the lowest they can contain
+    EXPRESSION_SYMBOLS: ClassVar[
+        dict[type[NonTerminalSymbol], type[Operator]]
+    ] = {
+        ConditionExprSymbol: OrOperator,
+        ConditionTermSymbol: AndOperator,
+        ConditionFactorSymbol: NotOperator,
+        ConditionSymbol: EqualOperator,
+        ExpressionSymbol: PlusOperator,
+        TermSymbol: MultOperator,
+    }
+    FACTOR_SYMBOL: ClassVar[type[NonTerminalSymbol]] = FactorSymbol
+    PREFIX_OPERATORS: ClassVar[dict[type[TerminalSymbol], OperatorRule]] = {
+        NotLiteral: OperatorRule(
+            ConditionFactorSymbol, NotOperator, EqualOperator
+        ),
+    }
+    INFIX_OPERATORS: ClassVar[dict[type[TerminalSymbol], OperatorRule]] = {
+        OrLiteral: OperatorRule(ConditionExprSymbol, OrOperator, OrOperator),
+        AndLiteral: OperatorRule(ConditionTermSymbol, AndOperator, OrOperator),
+        EqualLiteral: OperatorRule(
+            ConditionSymbol, EqualOperator, EqualOperator
+        ),
+        NotEqualLiteral: OperatorRule(
+            ConditionSymbol, NotEqualOperator, EqualOperator
+        ),
+        GreaterThanLiteral: OperatorRule(
+            ConditionSymbol, GreaterThanOperator, EqualOperator
+        ),
+        LessThanLiteral: OperatorRule(
+            ConditionSymbol, LessThanOperator, EqualOperator
+        ),
+        LessThanOrEqualLiteral: OperatorRule(
+            ConditionSymbol, LessThanOrEqualOperator, EqualOperator
+        ),
+        GreaterThanOrEqualLiteral: OperatorRule(
+            ConditionSymbol, GreaterThanOrEqualOperator, EqualOperator
+        ),
+        PlusLiteral: OperatorRule(
+            ExpressionSymbol, PlusOperator, PlusOperator
+        ),
+        MinusLiteral: OperatorRule(
+            ExpressionSymbol, MinusOperator, PlusOperator
+        ),
+        MultLiteral: OperatorRule(TermSymbol, MultOperator, PlusOperator),
+        DivLiteral: OperatorRule(TermSymbol, DivOperator, PlusOperator),
+        ModLiteral: OperatorRule(TermSymbol, ModOperator, PlusOperator),
+    }
+
+    def create_context(
+        self, tokens: Iterable[TerminalSymbol]
+    ) -> "PrecedenceContext":
+        """
+        Create the state of a parse of terminals
+        :param tokens: An iterable of terminals
+        :return: The context to parse in.
+        """
+        return PrecedenceContext(token_list(tokens), self.grammar.compile())
+
+    def expand(
+        self,
+        node: NonTerminalSymbol,
+        tree: MutableSequence[TSymbol],
+        origin: int,
+        context: ParseContext,
+    ) -> int:
+        """
+        Expand a parse tree, parsing expressions by precedence climbing
+        :param node: The non-terminal node to expand
+        :param tree: The super-tree of the non-terminal node
+        :param origin: Starting index of terminal list to try to fit production
+        :param context: The context to parse in.
+        :return: Total number of terminals contained within the expanded tree
+        """
+        if node.__class__ not in self.EXPRESSION_SYMBOLS:
+            return super().expand(node, tree, origin, context)
+
+        precedence = self.EXPRESSION_SYMBOLS[node.__class__].precedence
+        parsed = self.parse_expression(precedence, origin, context)
+        if parsed is None:
+            return 0
+        expression, pointer = parsed
+        if not isinstance(expression, node.__class__):
+            node.contents.append(expression)
+            expression = node
+        tree.append(expression)
+        return pointer - origin
+
+    def parse_expression(
+        self, precedence: int, origin: int, context: "PrecedenceContext"
+    ) -> tuple[TSymbol, int] | None:
+        """
+        Parse the longest expression containing no operator with a lower
+        precedence than a given precedence
+        :param precedence: The lowest precedence the expression can contain.
+        :param origin: Starting index of terminal list to parse.
+        :param context: The context to parse in.
+        :return: The expression and the index of the terminal after it, or
+        None if no expression can be parsed.
+        """
+        if origin >= len(context.tokens):
+            return None
+
+        # Operators following an operand must have a lower precedence than
+        # its bound, e.g. `NOT a` can only be followed by AND and OR
+        bound = None
+        token = context.tokens[origin]
+        prefix = self._find_rule(self.PREFIX_OPERATORS, token)
+        level = self._find_level(token, context)
+        if prefix is not None and prefix.operator.precedence >= precedence:
+            parsed = self.parse_expression(
+                prefix.operand.precedence, origin + 1, context
+            )
+            if parsed is None:
+                return None
+            operand, pointer = parsed
+            left: TSymbol = prefix.symbol([token, operand])
+            bound = prefix.operator.precedence
+        elif level is not None and level >= precedence:
+            left, pointer = token, origin + 1
+            bound = level
+        else:
+            parsed = self.parse_factor(origin, context)
+            if parsed is None:
+                return None
+            left, pointer = parsed
+
+        while pointer < len(context.tokens):
+            infix = self._find_rule(
+                self.INFIX_OPERATORS, context.tokens[pointer]
+            )
+            if infix is None:
+                break
+            infix_precedence = infix.operator.precedence
+            if infix_precedence < precedence or (
+                bound is not None and infix_precedence >= bound
+            ):
+                break
+            parsed = self.parse_expression(
+                infix.operand.precedence, pointer + 1, context
+            )
+            if parsed is None:
+                break
+            right, end = parsed
+            left = infix.symbol([left, context.tokens[pointer], right])
+            pointer = end
+            bound = infix.operand.precedence
+        return left, pointer
+
+    def parse_factor(
+        self, origin: int, context: "PrecedenceContext"
+    ) -> tuple[TSymbol, int] | None:
+        """
+        Parse a factor using the grammar. Factors which are a single terminal
+        are not wrapped in non-terminals.
+        :param origin: Starting index of terminal list to parse.
+        :param context: The context to parse in.
+        :return: The factor and the index of the terminal after it, or None if
+        no factor can be parsed.
+        """
+        token = context.tokens[origin]
+        token_type = token.__class__
+        if token_type not in context.units:
+            context.units[token_type] = self._is_unit(
+                self.FACTOR_SYMBOL, token_type, context.table, set()
+            )
+        if context.units[token_type]:
+            return token, origin + 1
+        tree: list[TSymbol] = []
+        terminal_count = super().expand(
+            self.FACTOR_SYMBOL(), tree, origin, context
+        )
+        if terminal_count == 0:
+            return None
+        return tree[0], origin + terminal_count
+
+    def _is_unit(
+        self,
+        symbol_type: type[NonTerminalSymbol],
+        token_type: type[TerminalSymbol],
+        table: ParseTable,
+        seen: set[type[NonTerminalSymbol]],
+    ) -> bool:
+        """
+        Check whether the only way a non-terminal can be expanded from a token
+        is into that single token.
+        """
+        productions = table.predict(symbol_type, token_type)
+        if len(productions) != 1 or len(productions[0].body) != 1:
+            return False
+        symbol = productions[0].body[0]
+        if issubclass(symbol, TerminalSymbol):
+            return True
+        if symbol in seen:
+            return False
+        seen.add(symbol)
+        return self._is_unit(symbol, token_type, table, seen)
+
+    def _find_level(
+        self, token: TerminalSymbol, context: "PrecedenceContext"
+    ) -> int | None:
+        """
+        Get the precedence of the expression symbol a token alone can be
+        expanded into by the grammar, e.g. a BoolLiteral is a complete
+        ConditionFactorSymbol. The highest precedence is returned if there are
+        several.
+        """
+        token_type = token.__class__
+        if token_type not in context.levels:
+            context.levels[token_type] = max(
+                (
+                    operator.precedence
+                    for symbol, operator in self.EXPRESSION_SYMBOLS.items()
+                    for production in self.grammar.get(symbol, [])
+                    if len(production.body) == 1
+                    and issubclass(token_type, production.body[0])
+                ),
+                default=None,
+            )
+        return context.levels[token_type]
+
+    @staticmethod
+    def _find_rule(
+        rules: dict[type[TerminalSymbol], OperatorRule], token: TerminalSymbol
+    ) -> OperatorRule | None:
+        """Get the rule of an operator token, if it is an operator."""
+        for symbol_type in token.__class__.__mro__:
+            if symbol_type in rules:
+                return rules[symbol_type]
+        return None
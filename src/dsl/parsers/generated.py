@@ -0,0 +1,310 @@
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, ClassVar, Iterable
+
+from dsl.cache import write_atomic
+from dsl.models import Grammar
+from dsl.models.exceptions import DSLGrammarError, DSLSyntaxError
+from dsl.models.grammar import base_grammar
+from dsl.models.representables import Representable
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol, TSymbol
+from dsl.models.symbols.nonterminals import BlockSymbol
+from dsl.parsers import Parser, reduce_tree, token_list
+
+logger = logging.getLogger(__name__)
+
+# A parse function takes the tokens, their token_kinds, the index to parse
+# from and a memo, and returns the parsed node and the index after it or None
+ParseFunction = Callable[
+    [list[TerminalSymbol], list[int], int, dict],
+    tuple[NonTerminalSymbol, int] | None,
+]
+
+# The version of the generated source, which keys the modules cached on disk
+FORMAT_VERSION = 1
+
+HEADER = '''"""
+Parser generated from a Grammar by dsl.parsers.generated. Do not edit.
+
+Format version: {version}
+Grammar fingerprint: {fingerprint}
+"""
+from collections import deque
+'''
+
+
+class ParserGenerator:
+    """
+    Generate the Python source of a parser module for a Grammar.
+
+    The module has one function per non-terminal which tries its productions
+    in the order of the grammar. Terminal checks are inlined as bitmask tests
+    against token_kinds, which are computed once per token type, and each
+    production is skipped unless the current token is in its FIRST set. Results
+    are memoized per (non-terminal, position), so the module parses the same
+    trees as PackratParser. PARSE_FUNCTIONS maps each non-terminal to its
+    function.
+    """
+
+    def __init__(self, grammar: Grammar):
+        self.grammar = grammar
+        self.table = grammar.compile()
+        self.names: dict[type[TSymbol], str] = {}
+        # Each token is matched against terminals by a bit in a bitmask
+        self.terminals = sorted(
+            self.table.terminals, key=lambda terminal: terminal.__name__
+        )
+
+    def generate(self) -> str:
+        """
+        Generate the source of the parser module.
+        :return: Python source code.
+        """
+        self.names = {}
+        functions = [self._generate_token_kinds()] + [
+            self._generate_function(index, head)
+            for index, head in enumerate(self.grammar)
+        ]
+        parse_functions = "".join(
+            f"    {self._name(head)}: parse_{index},\n"
+            for index, head in enumerate(self.grammar)
+        )
+        return "\n\n".join(
+            [
+                HEADER.format(
+                    version=FORMAT_VERSION,
+                    fingerprint=self.grammar.fingerprint(),
+                )
+                + self._generate_imports(),
+                *functions,
+                f"PARSE_FUNCTIONS = {{\n{parse_functions}}}\n",
+            ]
+        )
+
+    def write(self, path: Path | str) -> Path:
+        """
+        Write the source of the parser module to a file.
+        :param path: The file to write to.
+        :return: The path of the file.
+        """
+        path = Path(path)
+        write_atomic(path, self.generate().encode())
+        return path
+
+    def _name(self, symbol_type: type[TSymbol]) -> str:
+        """Get the name a symbol is imported as in the generated module."""
+        if symbol_type not in self.names:
+            module = sys.modules.get(symbol_type.__module__)
+            imported = getattr(module, symbol_type.__qualname__, None)
+            if imported is not symbol_type:
+                raise DSLGrammarError(
+                    f"{symbol_type.__qualname__} cannot be imported by a "
+                    "generated parser."
+                )
+            name = f"_{symbol_type.__name__}"
+            if name in self.names.values():
+                name += f"_{len(self.names)}"
+            self.names[symbol_type] = name
+        return self.names[symbol_type]
+
+    def _generate_imports(self) -> str:
+        """Generate the imports of the symbols used by the functions."""
+        return "".join(
+            f"from {symbol_type.__module__} import "
+            f"{symbol_type.__qualname__} as {name}\n"
+            for symbol_type, name in self.names.items()
+        )
+
+    def _generate_token_kinds(self) -> str:
+        """Generate the function mapping tokens to the terminals they match."""
+        terminals = "".join(
+            f"    {self._name(terminal)},\n" for terminal in self.terminals
+        )
+        return f'''TERMINALS = (
+{terminals})
+_KINDS = {{}}
+
+
+def token_kinds(tokens):
+    """
+    Get a bitmask of the TERMINALS each token is an instance of, followed by
+    0 for the end of input.
+    """
+    kinds = []
+    for token in tokens:
+        token_type = type(token)
+        if token_type not in _KINDS:
+            _KINDS[token_type] = sum(
+                1 << bit
+                for bit, terminal in enumerate(TERMINALS)
+                if issubclass(token_type, terminal)
+            )
+        kinds.append(_KINDS[token_type])
+    kinds.append(0)
+    return kinds
+'''
+
+    def _mask(self, terminals: Iterable[type[TerminalSymbol]]) -> str:
+        """Get the bitmask of a set of terminals with a comment naming them."""
+        terminals = set(terminals)
+        mask = sum(
+            1 << bit
+            for bit, terminal in enumerate(self.terminals)
+            if terminal in terminals
+        )
+        names = ", ".join(sorted(terminal.__name__ for terminal in terminals))
+        return f"{mask:#x}:  # {names}"
+
+    def _generate_function(
+        self, index: int, head: type[NonTerminalSymbol]
+    ) -> str:
+        """Generate the parse function of a non-terminal."""
+        lines = [
+            f"def parse_{index}(tokens, kinds, origin, memo):",
+            f'    """Parse {head.__name__} at tokens[origin]."""',
+            f"    key = ({index}, origin)",
+            "    if key in memo:",
+            "        return memo[key]",
+            "    end = len(tokens)",
+        ]
+        heads = list(self.grammar)
+        for production in self.grammar[head]:
+            first, nullable = self.table.first_of(production.body)
+            lines.append(f"    # {production!r}")
+            if nullable:
+                lines.append("    while True:")
+            else:
+                # Skip the production unless its FIRST set has the token
+                lines.append(f"    while kinds[origin] & {self._mask(first)}")
+            lines.append("        pointer = origin")
+            lines.append("        contents = deque()")
+            for position, symbol_type in enumerate(production.body):
+                guarded = position == 0 and not nullable
+                if issubclass(symbol_type, TerminalSymbol):
+                    if not guarded:
+                        lines += [
+                            "        if not kinds[pointer] & "
+                            + self._mask([symbol_type]),
+                            "            break",
+                        ]
+                    lines += [
+                        "        contents.append(tokens[pointer])",
+                        "        pointer += 1",
+                    ]
+                    continue
+                if not guarded:
+                    lines += [
+                        "        if pointer >= end:",
+                        "            break",
+                    ]
+                lines += [
+                    f"        result = parse_{heads.index(symbol_type)}("
+                    "tokens, kinds, pointer, memo)",
+                    "        if result is None:",
+                    "            break",
+                    "        contents.append(result[0])",
+                    "        pointer = result[1]",
+                ]
+            lines += [
+                f"        memo[key] = ({self._name(head)}(contents), pointer)",
+                "        return memo[key]",
+            ]
+        lines += ["    memo[key] = None", "    return None", ""]
+        return "\n".join(lines)
+
+
+class GeneratedParser(Parser):
+    """
+    A parser which runs a module generated from a Grammar by ParserGenerator.
+
+    It parses the same trees as DefaultParser. Generated modules are cached
+    in memory per grammar and, when given a cache directory, written to it
+    as regular `.py` files so later processes only import them.
+    """
+
+    DEFAULT_START_SYMBOL: ClassVar[type[NonTerminalSymbol]] = BlockSymbol
+
+    modules: ClassVar[dict[tuple[int, str, Path | None], ModuleType]] = {}
+
+    def __init__(
+        self,
+        grammar: Grammar | None = None,
+        cache_dir: Path | str | None = None,
+    ):
+        """
+        :param grammar: The grammar to parse with.
+        :param cache_dir: An optional directory to write generated modules to.
+        """
+        self.grammar = grammar or base_grammar
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.module = self.load_module()
+        self.parse_functions: dict[
+            type[NonTerminalSymbol], ParseFunction
+        ] = self.module.PARSE_FUNCTIONS
+
+    def load_module(self) -> ModuleType:
+        """
+        Load the parser module of the grammar, generating it if it is not
+        cached in memory or in the cache directory
+        :return: The generated module.
+        """
+        fingerprint = self.grammar.fingerprint()
+        key = (FORMAT_VERSION, fingerprint, self.cache_dir)
+        if key in self.modules:
+            return self.modules[key]
+
+        # Modules generated by other versions of the generator are not reused
+        module_name = (
+            f"dsl_generated_parser_v{FORMAT_VERSION}_{fingerprint[:32]}"
+        )
+        if self.cache_dir is None:
+            source = ParserGenerator(self.grammar).generate()
+            module = ModuleType(module_name)
+            exec(compile(source, f"<{module_name}>", "exec"), module.__dict__)
+        else:
+            path = self.cache_dir / f"{module_name}.py"
+            if not path.exists():
+                ParserGenerator(self.grammar).write(path)
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Cannot import generated parser {path}.")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            logger.debug("Loaded generated parser %s", path)
+        self.modules[key] = module
+        return module
+
+    def parse(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[TSymbol]:
+        """
+        Parse terminals from a starting non-terminal.
+        :param tokens: An iterable of terminals
+        :param start_symbol: A optional non-terminal.
+        :return: A parse tree represented by a list of nested tokens.
+        """
+        symbol_type = (
+            start_symbol.__class__
+            if start_symbol
+            else self.DEFAULT_START_SYMBOL
+        )
+        tokens = token_list(tokens)
+        kinds = self.module.token_kinds(tokens)
+        result = self.parse_functions[symbol_type](tokens, kinds, 0, {})
+        if result is None or result[1] < len(tokens):
+            raise DSLSyntaxError("Input cannot be parsed.")
+        return [result[0]]
+
+    def reduce(self, node: TSymbol) -> list[Representable]:
+        """
+        Reduces the parse tree into an execution tree without recursion
+        :param node: A terminal or non-terminal symbol.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        return reduce_tree(node)
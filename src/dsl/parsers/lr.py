@@ -0,0 +1,439 @@
+import hashlib
+import logging
+import pickle
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import ClassVar, Iterable
+
+from dsl.cache import write_atomic
+from dsl.models import Grammar
+from dsl.models.exceptions import DSLGrammarError, DSLSyntaxError
+from dsl.models.grammar import END_OF_INPUT, base_grammar
+from dsl.models.representables import Representable
+from dsl.models.symbols import NonTerminalSymbol, TerminalSymbol, TSymbol
+from dsl.models.symbols.nonterminals import BlockSymbol
+from dsl.parsers import Parser, reduce_tree
+
+logger = logging.getLogger(__name__)
+
+# An LR(0) item is a production index and the position of the dot in its body
+Item = tuple[int, int]
+Lookahead = type[TerminalSymbol] | None
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """A parsing conflict found while building an LRTable."""
+
+    state: int
+    lookahead: Lookahead
+    kept: str
+    discarded: str
+
+    def __str__(self) -> str:
+        name = getattr(self.lookahead, "__name__", "end of input")
+        return (
+            f"State {self.state} on {name}: {self.kept} was chosen over "
+            f"{self.discarded}."
+        )
+
+
+@dataclass
+class LRTable:
+    """
+    LALR(1) action and goto tables of a grammar from a start symbol.
+
+    Actions are encoded as integers: a non-negative action shifts the current
+    token and goes to that state, a negative action reduces by production
+    ~action, with production 0 (the augmented start production) accepting.
+    """
+
+    start_symbol: type[NonTerminalSymbol]
+    productions: list[tuple[type[NonTerminalSymbol], int]]
+    actions: list[dict[Lookahead, int]]
+    gotos: list[dict[type[NonTerminalSymbol], int]]
+    conflicts: list[Conflict] = field(default_factory=list)
+
+    def save(self, path: Path) -> None:
+        """
+        Save the table to disk.
+        :param path: The file to save the table to.
+        :return: None
+        """
+        write_atomic(path, pickle.dumps(self))
+
+    @classmethod
+    def load(cls, path: Path) -> "LRTable":
+        """
+        Load a table saved to disk.
+        :param path: The file the table was saved to.
+        :return: The table.
+        """
+        with path.open("rb") as file:
+            table = pickle.load(file)
+        if not isinstance(table, cls):
+            raise TypeError(f"{path} does not contain an {cls.__name__}.")
+        return table
+
+
+class LRTableBuilder:
+    """Build the LALR(1) table of a grammar from a start symbol."""
+
+    def __init__(
+        self, grammar: Grammar, start_symbol: type[NonTerminalSymbol]
+    ):
+        self.grammar = grammar
+        self.start_symbol = start_symbol
+        self.parse_table = grammar.compile()
+        # Production 0 is the augmented production accepting the start symbol
+        self.productions: list[tuple[type[NonTerminalSymbol], tuple]] = [
+            (start_symbol, (start_symbol,))
+        ]
+        self.by_head: dict[type[NonTerminalSymbol], list[int]] = {}
+        for head, productions in grammar.items():
+            for production in productions:
+                self.by_head.setdefault(head, []).append(len(self.productions))
+                self.productions.append((head, production.body))
+
+    def build(self) -> LRTable:
+        """
+        Build the LALR(1) table, resolving shift/reduce conflicts by shifting
+        and reduce/reduce conflicts by the production earliest in the grammar.
+        :return: The table.
+        """
+        kernels, transitions = self._build_lr0_automaton()
+        lookaheads = self._build_lookaheads(kernels, transitions)
+
+        table = LRTable(
+            start_symbol=self.start_symbol,
+            productions=[(head, len(body)) for head, body in self.productions],
+            actions=[{} for _ in kernels],
+            gotos=[{} for _ in kernels],
+        )
+        for state, kernel in enumerate(kernels):
+            items = self._closure_lr1(
+                {(item, a) for item in kernel for a in lookaheads[state][item]}
+            )
+            for (production, dot), lookahead in sorted(
+                items, key=lambda i: i[0]
+            ):
+                body = self.productions[production][1]
+                if dot < len(body):
+                    symbol = body[dot]
+                    target = transitions[state][symbol]
+                    if issubclass(symbol, TerminalSymbol):
+                        self._set_action(table, state, symbol, target)
+                    else:
+                        table.gotos[state][symbol] = target
+                else:
+                    self._set_action(table, state, lookahead, ~production)
+        for conflict in table.conflicts:
+            logger.info("Grammar conflict: %s", conflict)
+        return table
+
+    def _set_action(
+        self, table: LRTable, state: int, lookahead: Lookahead, action: int
+    ) -> None:
+        """Set an action, resolving and recording any conflict."""
+        actions = table.actions[state]
+        if lookahead not in actions or actions[lookahead] == action:
+            actions[lookahead] = action
+            return
+
+        # Shifts are non-negative and earlier productions reduce to greater
+        # actions, so the greatest action shifts or reduces by the earliest
+        current = actions[lookahead]
+        kept, discarded = max(current, action), min(current, action)
+        actions[lookahead] = kept
+        table.conflicts.append(
+            Conflict(
+                state,
+                lookahead,
+                self._describe(kept),
+                self._describe(discarded),
+            )
+        )
+
+    def _describe(self, action: int) -> str:
+        """Describe an action for conflict reports."""
+        if action >= 0:
+            return f"shift to state {action}"
+        head, body = self.productions[~action]
+        names = " ".join(symbol.__name__ for symbol in body)
+        return f"reduce {head.__name__} -> {names}"
+
+    def _closure_lr0(self, items: frozenset[Item]) -> set[Item]:
+        """Get the LR(0) closure of a set of items."""
+        closure = set(items)
+        stack = list(items)
+        while stack:
+            production, dot = stack.pop()
+            body = self.productions[production][1]
+            if dot < len(body) and body[dot] in self.by_head:
+                for index in self.by_head[body[dot]]:
+                    if (index, 0) not in closure:
+                        closure.add((index, 0))
+                        stack.append((index, 0))
+        return closure
+
+    def _closure_lr1(
+        self, items: set[tuple[Item, Lookahead | str]]
+    ) -> set[tuple[Item, Lookahead | str]]:
+        """Get the LR(1) closure of a set of items and their lookaheads."""
+        closure = set(items)
+        stack = list(items)
+        while stack:
+            (production, dot), lookahead = stack.pop()
+            body = self.productions[production][1]
+            if dot >= len(body) or body[dot] not in self.by_head:
+                continue
+            first, nullable = self.parse_table.first_of(body[dot + 1 :])
+            follow: set[Lookahead | str] = set(first)
+            if nullable:
+                follow.add(lookahead)
+            for index in self.by_head[body[dot]]:
+                for a in follow:
+                    if ((index, 0), a) not in closure:
+                        closure.add(((index, 0), a))
+                        stack.append(((index, 0), a))
+        return closure
+
+    def _build_lr0_automaton(
+        self,
+    ) -> tuple[list[frozenset[Item]], list[dict[type[TSymbol], int]]]:
+        """
+        Build the LR(0) automaton of the grammar
+        :return: The kernel items of each state and the transitions from each
+        state on each symbol.
+        """
+        start = frozenset({(0, 0)})
+        kernels = [start]
+        states = {start: 0}
+        transitions: list[dict[type[TSymbol], int]] = []
+        queue = deque([start])
+        while queue:
+            kernel = queue.popleft()
+            gotos: dict[type[TSymbol], set[Item]] = {}
+            for production, dot in sorted(self._closure_lr0(kernel)):
+                body = self.productions[production][1]
+                if dot < len(body):
+                    gotos.setdefault(body[dot], set()).add(
+                        (production, dot + 1)
+                    )
+            transition = {}
+            for symbol, items in gotos.items():
+                target = frozenset(items)
+                if target not in states:
+                    states[target] = len(kernels)
+                    kernels.append(target)
+                    queue.append(target)
+                transition[symbol] = states[target]
+            transitions.append(transition)
+        return kernels, transitions
+
+    def _build_lookaheads(
+        self,
+        kernels: list[frozenset[Item]],
+        transitions: list[dict[type[TSymbol], int]],
+    ) -> list[dict[Item, set[Lookahead]]]:
+        """
+        Compute the LALR(1) lookaheads of each kernel item by propagation
+        :param kernels: The kernel items of each state.
+        :param transitions: The transitions from each state on each symbol.
+        :return: The lookaheads of each kernel item of each state.
+        """
+        # A lookahead which cannot occur, used to find propagated lookaheads
+        propagate = "#"
+        lookaheads: list[dict[Item, set[Lookahead]]] = [
+            {item: set() for item in kernel} for kernel in kernels
+        ]
+        lookaheads[0][(0, 0)].add(END_OF_INPUT)
+        propagation: dict[tuple[int, Item], list[tuple[int, Item]]] = {}
+        for state, kernel in enumerate(kernels):
+            for kernel_item in kernel:
+                closure = self._closure_lr1({(kernel_item, propagate)})
+                for (production, dot), lookahead in closure:
+                    body = self.productions[production][1]
+                    if dot >= len(body):
+                        continue
+                    target = transitions[state][body[dot]]
+                    item = (production, dot + 1)
+                    if lookahead == propagate:
+                        propagation.setdefault(
+                            (state, kernel_item), []
+                        ).append((target, item))
+                    else:
+                        lookaheads[target][item].add(lookahead)
+
+        changed = True
+        while changed:
+            changed = False
+            for (state, item), targets in propagation.items():
+                for target, target_item in targets:
+                    source = lookaheads[state][item]
+                    if not source <= lookaheads[target][target_item]:
+                        lookaheads[target][target_item] |= source
+                        changed = True
+        return lookaheads
+
+
+class LRParser(Parser):
+    """
+    A table-driven LALR(1) parser generated from a Grammar.
+
+    It parses in linear time without backtracking, into the same parse trees
+    as DefaultParser for the inputs both parsers accept. Grammar conflicts are
+    resolved when the table is built (see LRTable.conflicts), by shifting or
+    by reducing by the production which appears first in the grammar,
+    mirroring the ordered alternatives of DefaultParser. Unlike DefaultParser
+    it does not commit to the first alternative which parses, so it accepts
+    some inputs DefaultParser rejects, e.g. `COUNT(TRUE > 1)` or
+    `IF TRUE AND TRUE == TRUE THEN RETURN(None)`. Tables can be cached to
+    disk by passing a cache directory.
+    """
+
+    DEFAULT_START_SYMBOL: ClassVar[type[NonTerminalSymbol]] = BlockSymbol
+
+    def __init__(
+        self,
+        grammar: Grammar | None = None,
+        cache_dir: Path | str | None = None,
+        strict: bool = False,
+    ):
+        """
+        :param grammar: The grammar to parse with.
+        :param cache_dir: An optional directory to cache built tables in.
+        :param strict: Raise a DSLGrammarError if the grammar has conflicts.
+        """
+        self.grammar = grammar or base_grammar
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.strict = strict
+        self.tables: dict[type[NonTerminalSymbol], LRTable] = {}
+        self.terminals: dict[type[NonTerminalSymbol], _TerminalMap] = {}
+
+    def table(self, start_symbol: type[NonTerminalSymbol]) -> LRTable:
+        """
+        Get the table to parse from a start symbol, building it if it is not
+        cached in memory or on disk
+        :param start_symbol: The type of non-terminal to parse from.
+        :return: The LALR(1) table.
+        """
+        if start_symbol in self.tables:
+            return self.tables[start_symbol]
+
+        path = self._cache_path(start_symbol)
+        table = None
+        if path is not None and path.exists():
+            try:
+                table = LRTable.load(path)
+            except (OSError, pickle.UnpicklingError, TypeError) as err:
+                logger.warning("Could not load LR table %s: %s", path, err)
+        if table is None:
+            table = LRTableBuilder(self.grammar, start_symbol).build()
+            if path is not None:
+                try:
+                    table.save(path)
+                except (OSError, pickle.PicklingError, AttributeError) as err:
+                    logger.warning("Could not save LR table %s: %s", path, err)
+
+        if self.strict and table.conflicts:
+            conflicts = "\n".join(map(str, table.conflicts))
+            raise DSLGrammarError(f"Grammar has conflicts:\n{conflicts}")
+        self.tables[start_symbol] = table
+        self.terminals[start_symbol] = _TerminalMap(table)
+        return table
+
+    def _cache_path(
+        self, start_symbol: type[NonTerminalSymbol]
+    ) -> Path | None:
+        """Get the file a table is cached in, keyed by the grammar."""
+        if self.cache_dir is None:
+            return None
+
+        digest = hashlib.sha256(
+            f"{start_symbol.__module__}.{start_symbol.__qualname__}\n"
+            f"{self.grammar.fingerprint()}".encode()
+        ).hexdigest()
+        return self.cache_dir / f"lr-{digest[:32]}.pickle"
+
+    def parse(
+        self,
+        tokens: Iterable[TerminalSymbol],
+        start_symbol: NonTerminalSymbol | None = None,
+    ) -> list[TSymbol]:
+        """
+        Parse terminals from a starting non-terminal. The terminals are read
+        one at a time, so an iterator such as Lexer.iter_tokens is consumed
+        only up to the first syntax error.
+        :param tokens: An iterable of terminals
+        :param start_symbol: A optional non-terminal.
+        :return: A parse tree represented by a list of nested tokens.
+        """
+        symbol_type = (
+            start_symbol.__class__
+            if start_symbol
+            else self.DEFAULT_START_SYMBOL
+        )
+        table = self.table(symbol_type)
+        terminals = self.terminals[symbol_type]
+
+        states = [0]
+        nodes: list[TSymbol] = []
+        remaining = iter(tokens)
+        token: TerminalSymbol | None = next(remaining, None)
+        while True:
+            if token is not None:
+                lookahead = terminals.get(token.__class__, token.__class__)
+            else:
+                lookahead = END_OF_INPUT
+            action = table.actions[states[-1]].get(lookahead)
+            if action is None:
+                raise DSLSyntaxError("Input cannot be parsed.")
+            if action >= 0:
+                nodes.append(token)
+                states.append(action)
+                token = next(remaining, None)
+                continue
+            if action == ~0:
+                return nodes
+
+            head, length = table.productions[~action]
+            node = head(nodes[len(nodes) - length :])
+            del nodes[len(nodes) - length :]
+            del states[len(states) - length :]
+            nodes.append(node)
+            states.append(table.gotos[states[-1]][head])
+
+    def reduce(self, node: TSymbol) -> list[Representable]:
+        """
+        Reduces the parse tree into an execution tree without recursion
+        :param node: A terminal or non-terminal symbol.
+        :return: A list of Representable objects (objects a symbol represents)
+        """
+        return reduce_tree(node)
+
+
+class _TerminalMap(dict[type[TerminalSymbol], Lookahead]):
+    """Lazily map token types to the terminal of a table they subclass."""
+
+    def __init__(self, table: LRTable):
+        super().__init__()
+        self.terminals = {
+            lookahead
+            for actions in table.actions
+            for lookahead in actions
+            if lookahead is not END_OF_INPUT
+        }
+
+    def get(  # type: ignore[override]
+        self, token_type: type[TerminalSymbol], default: Lookahead = None
+    ) -> Lookahead:
+        if token_type not in self:
+            for symbol_type in token_type.__mro__:
+                if symbol_type in self.terminals:
+                    self[token_type] = symbol_type
+                    break
+            else:
+                self[token_type] = default
+        return self[token_type]
@@ -0,0 +1,333 @@
+"""
+A bytecode virtual machine for execution trees.
+
+An execution tree is lowered once into a flat Program of instructions for a
+stack machine: operands are pushed, operators pop their operands and push
+their value, and IF/ELIF/ELSE chains and short-circuiting AND/OR are relative
+jumps. Running a Program is a single loop over its instructions, without the
+isinstance checks, structural matching, deques and recursion of evaluating
+the tree. Parts of a tree which cannot be lowered are evaluated by the tree
+itself, so a Program has the same outcome as the tree it was compiled from.
+"""
+from collections import deque
+from dataclasses import MISSING, dataclass
+from typing import Any
+
+from dsl.compiled import Backend
+from dsl.models.context import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.actions import Action
+from dsl.models.representables.evaluables import (
+    Evaluable,
+    EvaluableAction,
+    EvaluableActionArg,
+    EvaluableBlock,
+    EvaluableExpression,
+    EvaluableIfStatement,
+    EvaluableList,
+    EvaluableListArg,
+)
+from dsl.models.representables.operands import (
+    BoolOperand,
+    ConstantOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    Operand,
+    StringOperand,
+    VariableOperand,
+)
+from dsl.models.representables.operators import (
+    AndOperator,
+    BinaryOperator,
+    OrOperator,
+    UnitaryOperator,
+)
+
+# Opcodes of the instructions, ordered by how often they are run
+LOAD = 0  # Push the variable named by the argument
+CONST = 1  # Push the argument
+BINARY = 2  # Pop y, then replace x with the argument applied to x and y
+JUMP_IF_FALSE = 3  # Pop a value and jump by the argument if it is falsy
+JUMP = 4  # Jump by the argument
+UNARY = 5  # Replace the top of the stack with the argument applied to it
+SHORT_CIRCUIT = 6  # Jump by the argument if the AND/OR is decided
+NEW_LIST = 7  # Push an empty list
+APPEND = 8  # Pop a value and append it to the list below it
+EXTEND = 9  # Pop a list and extend the list below it with it
+CALL = 10  # Replace the top of the stack with the action called with it
+OUTPUT = 11  # Pop a value and append it to the outputs unless it is MISSING
+POP = 12  # Pop a value
+RESOLVE = 13  # Push the value of the operand in the argument
+EVALUATE = 14  # Push the value of the Evaluable in the argument
+
+Instruction = tuple[int, Any]
+
+# Operands whose value can be pushed as a constant
+CONSTANT_OPERANDS = (
+    BoolOperand,
+    FloatOperand,
+    IntegerOperand,
+    NoneOperand,
+    StringOperand,
+)
+
+
+@dataclass(frozen=True)
+class Program:
+    """
+    Instructions for the stack machine. A Program is not changed by running
+    it, so it can be shared between threads.
+    """
+
+    instructions: tuple[Instruction, ...]
+
+    def __call__(self, context: EvaluationContext | None = None) -> Any:
+        """
+        Run the program
+        :param context: The variables to run against, or None to use the
+        variables bound to the operands when they were lexed.
+        :return: The value left on the stack.
+        """
+        variables = None if context is None else context.variables
+        instructions = self.instructions
+        end = len(instructions)
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        while pc < end:
+            opcode, argument = instructions[pc]
+            pc += 1
+            if opcode == LOAD:
+                name, bound = argument
+                try:
+                    push((bound if variables is None else variables)[name])
+                except KeyError as err:
+                    raise DSLRuntimeError(f"{name} does not exist.") from err
+            elif opcode == CONST:
+                push(argument)
+            elif opcode == BINARY:
+                y = pop()
+                stack[-1] = argument(stack[-1], y)
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc += argument
+            elif opcode == JUMP:
+                pc += argument
+            elif opcode == UNARY:
+                stack[-1] = argument(stack[-1])
+            elif opcode == SHORT_CIRCUIT:
+                is_and, offset = argument
+                x = stack[-1]
+                if not isinstance(x, list) and bool(x) != is_and:
+                    pc += offset
+            elif opcode == NEW_LIST:
+                push([])
+            elif opcode == APPEND:
+                value = pop()
+                stack[-1].append(value)
+            elif opcode == EXTEND:
+                value = pop()
+                stack[-1].extend(value)
+            elif opcode == CALL:
+                stack[-1] = argument(*stack[-1])
+            elif opcode == OUTPUT:
+                value = pop()
+                if value is not MISSING:
+                    stack[-1].append(value)
+            elif opcode == POP:
+                pop()
+            elif opcode == RESOLVE:
+                push(argument.resolve(context))
+            elif opcode == EVALUATE:
+                push(argument.evaluate(context))
+            else:
+                raise DSLRuntimeError(f"Unknown opcode {opcode}.")
+        return pop()
+
+
+class VirtualMachine(Backend):
+    """
+    Lowers execution trees into Programs for the stack machine.
+    """
+
+    def compile(self, tree: Evaluable) -> Program:
+        """
+        Lower an execution tree into a Program
+        :param tree: An execution tree.
+        :return: A Program with the same outcome as the tree.
+        """
+        if isinstance(tree, EvaluableBlock):
+            return Program(tuple(self._block(tree)))
+        return Program(tuple(self._value(tree)))
+
+    def _block(self, block: EvaluableBlock) -> list[Instruction]:
+        """Lower a block into instructions pushing its outputs."""
+        code: list[Instruction] = [(NEW_LIST, None)]
+        stack = [iter(block.contents)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, EvaluableBlock):
+                    stack.append(iter(item.contents))
+                    break
+                code += self._value(item)
+                is_statement = isinstance(item, EvaluableIfStatement)
+                code.append((OUTPUT, None) if is_statement else (POP, None))
+            else:
+                stack.pop()
+        return code
+
+    def _value(self, item: Any) -> list[Instruction]:
+        """Lower an operand or Evaluable into instructions pushing it."""
+        if isinstance(item, Operand):
+            return self._operand(item)
+        if isinstance(item, EvaluableExpression):
+            return self._expression(item)
+        if isinstance(item, EvaluableIfStatement):
+            return self._statement(item)
+        if isinstance(item, EvaluableAction):
+            return self._action(item)
+        if isinstance(item, EvaluableList):
+            return self._list(
+                item.contents, EvaluableListArg, (Operand, EvaluableList)
+            )
+        if isinstance(item, EvaluableBlock):
+            return self._block(item)
+        return [(EVALUATE, item)]
+
+    @staticmethod
+    def _operand(operand: Operand) -> list[Instruction]:
+        """Lower an operand into an instruction pushing its value."""
+        if type(operand) is VariableOperand:
+            return [(LOAD, (operand.token_value, operand.variables))]
+        if type(operand) in CONSTANT_OPERANDS or (
+            type(operand) is ConstantOperand
+            and not isinstance(operand.constant, list)
+        ):
+            return [(CONST, operand.true_value)]
+        return [(RESOLVE, operand)]
+
+    def _statement(self, statement: EvaluableIfStatement) -> list[Instruction]:
+        """
+        Lower an IF statement into conditional jumps, building the code of
+        its branches from the last so the offsets of the jumps are known.
+        """
+        branches = statement.branches()
+        if branches is None:
+            return [(EVALUATE, statement)]
+        code: list[Instruction] = []
+        if branches[-1][0] is not None:
+            code.append((CONST, MISSING))
+        for condition, action in reversed(branches):
+            if condition is None:
+                code = self._action(action)
+                continue
+            body = self._action(action)
+            if code:
+                body.append((JUMP, len(code)))
+            code = [
+                *self._value(condition),
+                (JUMP_IF_FALSE, len(body)),
+                *body,
+                *code,
+            ]
+        return code
+
+    def _action(self, action: EvaluableAction) -> list[Instruction]:
+        """Lower an action into instructions calling it with its args."""
+        if not action.contents or not isinstance(action.contents[0], Action):
+            return [(EVALUATE, action)]
+        code = self._list(
+            action.contents[1:], EvaluableActionArg, (Operand, EvaluableList)
+        )
+        code.append((CALL, action.contents[0].execute))
+        return code
+
+    def _list(
+        self,
+        contents: list[Any],
+        chain_type: type[Evaluable],
+        appended: tuple[type, ...],
+    ) -> list[Instruction]:
+        """
+        Lower the contents of an Evaluable into instructions building a list
+        of them. Items of the chain of nested args are added to the same list.
+        :param contents: The contents of a list or the args of an action.
+        :param chain_type: The type of the nested args.
+        :param appended: The types of the items appended rather than
+        extended into the list, which are only operands in nested args.
+        :return: The instructions.
+        """
+        code: list[Instruction] = [(NEW_LIST, None)]
+        stack = [(iter(contents), appended)]
+        while stack:
+            items, types = stack[-1]
+            for item in items:
+                if isinstance(item, chain_type):
+                    stack.append((iter(item.contents), (Operand,)))
+                    break
+                if isinstance(item, types):
+                    code += self._value(item)
+                    code.append((APPEND, None))
+                elif isinstance(item, Evaluable):
+                    code += self._value(item)
+                    code.append((EXTEND, None))
+            else:
+                stack.pop()
+        return code
+
+    def _expression(
+        self, expression: EvaluableExpression
+    ) -> list[Instruction]:
+        """
+        Lower an expression by following EvaluableExpression.evaluate with
+        the code of each operand in place of its value. Expressions whose
+        operands would be applied out of order are evaluated by the tree.
+        """
+        operators: deque[UnitaryOperator | BinaryOperator] = deque()
+        operands: deque[list[Instruction]] = deque()
+        for item in expression.contents:
+            if isinstance(item, (UnitaryOperator, BinaryOperator)):
+                operators.append(item)
+            elif (
+                isinstance(item, (Evaluable, Operand))
+                and len(operators) == 1
+                and len(operands) == 1
+                and isinstance(operators[0], (AndOperator, OrOperator))
+            ):
+                # The right operand is skipped if the left operand decides
+                operator = operators.popleft()
+                right = self._value(item)
+                is_and = isinstance(operator, AndOperator)
+                operands.append(
+                    [
+                        *operands.pop(),
+                        (SHORT_CIRCUIT, (is_and, len(right) + 1)),
+                        *right,
+                        (BINARY, operator.evaluate),
+                    ]
+                )
+                continue
+            if isinstance(item, (Evaluable, Operand)):
+                operands.append(self._value(item))
+
+            if not operators:
+                continue
+
+            if operands and isinstance(operators[0], UnitaryOperator):
+                operator = operators.popleft()
+                operands.append([*operands.pop(), (UNARY, operator.evaluate)])
+            elif len(operands) > 1 and isinstance(
+                operators[0], BinaryOperator
+            ):
+                if len(operands) > 2:
+                    return [(EVALUATE, expression)]
+                operator = operators.popleft()
+                x, y = operands.popleft(), operands.popleft()
+                operands.append([*x, *y, (BINARY, operator.evaluate)])
+
+        if operators or len(operands) != 1:
+            # Evaluating the expression raises the error
+            return [(EVALUATE, expression)]
+        return operands.pop()
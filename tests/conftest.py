@@ -0,0 +1,32 @@
+import pytest
+
+from dsl import DefaultDSL
+from dsl.closures import ClosureCompiler
+from dsl.codegen import PythonCompiler
+from dsl.compiled import Backend
+from dsl.vm import VirtualMachine
+
+BACKENDS: dict[str, type[Backend]] = {
+    "closure": ClosureCompiler,
+    "python": PythonCompiler,
+    "vm": VirtualMachine,
+}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=None,
+        help="Execute rules with a backend rather than evaluating the trees.",
+    )
+
+
+@pytest.fixture(autouse=True)
+def default_backend(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Set the default backend of DefaultDSL to the --backend option."""
+    name = request.config.getoption("--backend")
+    if name is not None:
+        monkeypatch.setattr(DefaultDSL, "DEFAULT_BACKEND", BACKENDS[name]())
@@ -0,0 +1,97 @@
+"""
+Rules, rows and generators shared by the differential tests, which check
+that each way of executing rules has the same outcome as the tree.
+"""
+import random
+
+rules = [
+    "IF a + 2 > 3 THEN RETURN(3)",
+    "IF (a + 2) * 3.4 > 3 THEN RETURN(3)",
+    "IF 1 == 2 THEN RETURN(1) ELIF 2 == 2 THEN RETURN(2) ELSE RETURN(3)",
+    "IF NOT a.b == 'c' AND COUNT(d[1].e != 2) > 0 OR f THEN RETURN(1, 2)",
+    "IF ((((1 - 2)))) <= 3 % 4 / 5 THEN RETURN([1, [2, 3]], None)",
+    "IF TRUE THEN RETURN(1) IF FALSE THEN RETURN(2) ELSE RETURN(3)",
+]
+
+rows = [
+    {"x": 0, "y": 1, "z": True, "s": "a"},
+    {"x": 3, "y": 1.5, "z": 0, "s": "a"},
+    {"a": 1, "d": [{"e": 2}, {"e": 3}], "f": True},
+    {"a": {"b": "c"}, "d": [[], {"e": 2}], "f": 0},
+]
+
+
+def random_operand(rng: random.Random) -> str:
+    """Return a random literal or variable."""
+    return rng.choice(
+        ["0", "1", "2", "3", "1.5", "None", "'a'", "''", "x", "y", "z", "s"]
+    )
+
+
+def random_condition(rng: random.Random, depth: int = 0) -> str:
+    """Return a random condition of literals and variables."""
+    if rng.random() < 0.15:
+        condition = rng.choice(["TRUE", "FALSE"])
+    else:
+        condition = random_comparison(rng, depth)
+    if rng.random() < 0.2:
+        condition = f"NOT {condition}"
+    if depth < 2 and rng.random() < 0.3:
+        operator = rng.choice(["AND", "OR"])
+        condition += f" {operator} {random_condition(rng, depth + 1)}"
+    return condition
+
+
+def random_comparison(rng: random.Random, depth: int) -> str:
+    """Return a random comparison of arithmetic expressions."""
+    comparison = random_expression(rng, depth)
+    if rng.random() < 0.5:
+        operator = rng.choice(["==", "!=", ">", "<", ">=", "<="])
+        comparison += f" {operator} {random_expression(rng, depth)}"
+    return comparison
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    """Return a random arithmetic expression."""
+    if depth < 2 and rng.random() < 0.2:
+        expression = f"({random_comparison(rng, depth + 1)})"
+    else:
+        expression = random_operand(rng)
+    if depth < 2 and rng.random() < 0.4:
+        operator = rng.choice(["+", "-", "*", "/", "%"])
+        expression += f" {operator} {random_expression(rng, depth + 1)}"
+    return expression
+
+
+def random_action(rng: random.Random) -> str:
+    """Return a random RETURN action of operands and lists."""
+    args = [
+        f"[{random_operand(rng)}, {random_operand(rng)}]"
+        if rng.random() < 0.3
+        else rng.choice(["TRUE", random_operand(rng)])
+        for _ in range(rng.randint(1, 3))
+    ]
+    return f"RETURN({', '.join(args)})"
+
+
+def random_rule(rng: random.Random) -> str:
+    """Return a random rule of IF/ELIF/ELSE statements."""
+    statements = []
+    for _ in range(rng.randint(1, 3)):
+        statement = f"IF {random_condition(rng)} THEN {random_action(rng)}"
+        for _ in range(rng.randint(0, 2)):
+            statement += (
+                f" ELIF {random_condition(rng)} THEN {random_action(rng)}"
+            )
+        if rng.random() < 0.5:
+            statement += f" ELSE {random_action(rng)}"
+        statements.append(statement)
+    return " ".join(statements)
+
+
+def outcome(compiled, variables):
+    """Return the outcome of a compiled rule, or the type of its error."""
+    try:
+        return compiled.execute(variables)
+    except Exception as err:
+        return type(err)
@@ -2,6 +2,7 @@ from dataclasses import MISSING
 
 import pytest
 
+from dsl.models import EvaluationContext
 from dsl.models.exceptions import DSLRuntimeError
 from dsl.models.representables.actions import ReturnAction
 from dsl.models.representables.evaluables import (
@@ -20,12 +21,18 @@ from dsl.models.representables.keywords import (
     IfKeyword,
     ThenKeyword,
 )
-from dsl.models.representables.operands import BoolOperand, IntegerOperand
+from dsl.models.representables.operands import (
+    BoolOperand,
+    IntegerOperand,
+    VariableOperand,
+)
 from dsl.models.representables.operators import (
+    AndOperator,
     CountFunction,
     GreaterThanOperator,
     LessThanOperator,
     MultOperator,
+    OrOperator,
     PlusOperator,
 )
 
@@ -130,6 +137,79 @@ class TestEvaluableEvaluate:
         assert evaluable_1.evaluate() == 7
         assert evaluable_2.evaluate() == 9
 
+    @pytest.mark.parametrize(
+        "left, operator, expected",
+        [
+            (BoolOperand("FALSE"), AndOperator("AND"), False),
+            (IntegerOperand("0"), AndOperator("AND"), 0),
+            (BoolOperand("TRUE"), OrOperator("OR"), True),
+            (IntegerOperand("2"), OrOperator("OR"), 2),
+        ],
+    )
+    def test_short_circuit(self, left, operator, expected):
+        # The right operand would raise if it were evaluated
+        right = EvaluableExpression(
+            [VariableOperand("missing"), GreaterThanOperator(">")]
+        )
+        evaluable = EvaluableExpression([left, operator, right])
+        result = evaluable.evaluate()
+        assert result == expected and type(result) is type(expected)
+
+    def test_no_short_circuit(self):
+        variables = {"x": 5}
+        evaluable = EvaluableExpression(
+            [BoolOperand("TRUE"), AndOperator("AND"), VariableOperand("x")]
+        )
+        assert evaluable.evaluate(EvaluationContext(variables)) == 5
+        evaluable = EvaluableExpression(
+            [BoolOperand("FALSE"), OrOperator("OR"), VariableOperand("y")]
+        )
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            evaluable.evaluate(EvaluationContext(variables))
+
+    def test_short_circuit_elementwise(self):
+        variables = {"x": [True, False], "y": [False, False]}
+        context = EvaluationContext(variables)
+        evaluable = EvaluableExpression(
+            [VariableOperand("y"), AndOperator("AND"), VariableOperand("x")]
+        )
+        assert evaluable.evaluate(context) == [False, False]
+        evaluable = EvaluableExpression(
+            [VariableOperand("x"), OrOperator("OR"), VariableOperand("y")]
+        )
+        assert evaluable.evaluate(context) == [True, False]
+
+    def test_short_circuit_condition(self):
+        evaluable = EvaluableIfStatement(
+            [
+                IfKeyword(),
+                EvaluableExpression(
+                    [
+                        BoolOperand("FALSE"),
+                        AndOperator("AND"),
+                        VariableOperand("missing"),
+                    ]
+                ),
+                ThenKeyword(),
+                EvaluableAction([ReturnAction(), IntegerOperand("1")]),
+                EvaluableElifStatement(
+                    [
+                        ElifKeyword(),
+                        EvaluableExpression(
+                            [
+                                BoolOperand("TRUE"),
+                                OrOperator("OR"),
+                                VariableOperand("missing"),
+                            ]
+                        ),
+                        ThenKeyword(),
+                        EvaluableAction([ReturnAction(), IntegerOperand("2")]),
+                    ]
+                ),
+            ]
+        )
+        assert evaluable.evaluate() == 2
+
     def test_return_action(self):
         evaluable_1 = EvaluableAction([ReturnAction(), IntegerOperand("123")])
         evaluable_2 = EvaluableAction(
@@ -1,6 +1,27 @@
-from dsl.models.grammar import Production
-from dsl.models.symbols.nonterminals import ExpressionSymbol
-from dsl.models.symbols.terminals import IfLiteral
+from dsl.models.grammar import END_OF_INPUT, Grammar, Production, base_grammar
+from dsl.models.symbols.nonterminals import (
+    ActionSymbol,
+    BlockSymbol,
+    ConditionSymbol,
+    ExpressionSymbol,
+    FactorSymbol,
+    IfStatementSymbol,
+    OperandSymbol,
+    SuffixSymbol,
+)
+from dsl.models.symbols.terminals import (
+    AndLiteral,
+    AttributeLiteral,
+    CountLiteral,
+    IfLiteral,
+    IndexingLiteral,
+    IntegerLiteral,
+    OrLiteral,
+    RightParenthesisLiteral,
+    StringLiteral,
+    ThenLiteral,
+    VariableLiteral,
+)
 
 
 class TestProduction:
@@ -14,3 +35,125 @@ class TestProduction:
     def test_repr(self):
         prod = Production(IfLiteral, ExpressionSymbol)
         assert prod.__repr__() == "Production(IfLiteral, ExpressionSymbol)"
+
+
+class TestParseTable:
+    """Test Grammar.compile."""
+
+    def test_first(self):
+        table = base_grammar.compile()
+        assert table.first[BlockSymbol] == {IfLiteral}
+        assert CountLiteral in table.first[FactorSymbol]
+        assert CountLiteral not in table.first[OperandSymbol]
+        assert not table.nullable
+
+    def test_follow(self):
+        follow = base_grammar.compile().follow(BlockSymbol)
+        assert follow[BlockSymbol] == {END_OF_INPUT}
+        assert follow[IfStatementSymbol] == {IfLiteral, END_OF_INPUT}
+        assert follow[ConditionSymbol] == {
+            AndLiteral,
+            OrLiteral,
+            ThenLiteral,
+            RightParenthesisLiteral,
+        }
+
+    def test_nullable(self):
+        grammar = Grammar(
+            {
+                ActionSymbol: [Production(OperandSymbol, StringLiteral)],
+                OperandSymbol: [Production(IntegerLiteral), Production()],
+            }
+        )
+        table = grammar.compile()
+        assert table.nullable == {OperandSymbol}
+        assert table.first[ActionSymbol] == {IntegerLiteral, StringLiteral}
+        assert table.follow(ActionSymbol)[OperandSymbol] == {StringLiteral}
+
+    def test_predict(self):
+        table = base_grammar.compile()
+        assert table.predict(OperandSymbol, IntegerLiteral) == (
+            Production(IntegerLiteral),
+        )
+        assert table.predict(FactorSymbol, VariableLiteral) == tuple(
+            base_grammar[FactorSymbol][1:6]
+        )
+        assert table.predict(FactorSymbol, ThenLiteral) == ()
+
+    def test_predict_terminal_subclass(self):
+        class HexLiteral(IntegerLiteral):
+            regex = r"0x[0-9a-f]+"
+
+        table = base_grammar.compile()
+        assert table.predict(OperandSymbol, HexLiteral) == (
+            Production(IntegerLiteral),
+        )
+
+    def test_cached(self):
+        assert base_grammar.compile() is base_grammar.compile()
+        assert Grammar(base_grammar).compile() is base_grammar.compile()
+
+    def test_modified_grammar(self):
+        grammar = Grammar(base_grammar)
+        grammar[OperandSymbol] = [Production(IntegerLiteral)]
+        table = grammar.compile()
+        assert table is not base_grammar.compile()
+        assert table.predict(OperandSymbol, StringLiteral) == ()
+
+
+class TestLeftFactor:
+    """Test Grammar.left_factor."""
+
+    def test_shared_prefix(self):
+        grammar = base_grammar.left_factor()
+        (production,) = grammar[ConditionSymbol]
+        assert production.body[0] is ExpressionSymbol
+        suffix = production.body[1]
+        assert issubclass(suffix, SuffixSymbol)
+        assert grammar.suffixes[suffix] is ConditionSymbol
+        assert len(grammar[suffix]) == 7
+        assert grammar[suffix][-1] == Production()
+
+    def test_nested_suffix(self):
+        grammar = base_grammar.left_factor()
+        variable_productions = [
+            production
+            for production in grammar[FactorSymbol]
+            if production.body[0] is VariableLiteral
+        ]
+        assert len(variable_productions) == 1
+        suffix = variable_productions[0].body[1]
+        assert [p.body[0] for p in grammar[suffix]] == [
+            AttributeLiteral,
+            IndexingLiteral,
+        ]
+        assert all(
+            grammar.suffixes[p.body[1]] is FactorSymbol
+            for p in grammar[suffix]
+        )
+
+    def test_order_preserved(self):
+        grammar = Grammar(
+            {
+                OperandSymbol: [
+                    Production(IntegerLiteral, StringLiteral),
+                    Production(OperandSymbol),
+                    Production(IntegerLiteral),
+                ],
+                ActionSymbol: [
+                    Production(IntegerLiteral, StringLiteral),
+                    Production(StringLiteral),
+                    Production(IntegerLiteral),
+                ],
+            }
+        ).left_factor()
+        assert grammar[OperandSymbol][1:] == [
+            Production(OperandSymbol),
+            Production(IntegerLiteral),
+        ]
+        assert len(grammar[ActionSymbol]) == 2
+
+    def test_cached(self):
+        assert (
+            base_grammar.left_factor() is Grammar(base_grammar).left_factor()
+        )
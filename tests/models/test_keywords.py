@@ -1,4 +1,4 @@
-from dsl.models.representables.keywords import IfKeyword
+from dsl.models.representables.keywords import IfKeyword, ThenKeyword
 
 
 class TestKeyword:
@@ -6,3 +6,8 @@ class TestKeyword:
 
     def test_repr(self):
         assert IfKeyword().__repr__() == "IfKeyword()"
+
+    def test_eq(self):
+        assert IfKeyword() == IfKeyword()
+        assert IfKeyword() != ThenKeyword()
+        assert IfKeyword() != "foo"
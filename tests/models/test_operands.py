@@ -1,5 +1,6 @@
 import pytest
 
+from dsl.models import EvaluationContext
 from dsl.models.exceptions import DSLException, DSLRuntimeError
 from dsl.models.representables.operands import (
     BoolOperand,
@@ -41,3 +42,13 @@ def test_operands():
 
     with pytest.raises(DSLRuntimeError, match="d does not exist."):
         assert VariableOperand("d", variables).true_value
+
+
+def test_resolve():
+    operand = VariableOperand("a", {"a": 1})
+    assert operand.resolve() == 1
+    assert operand.resolve(EvaluationContext({"a": 2})) == 2
+    assert IntegerOperand("2").resolve(EvaluationContext({"a": 2})) == 2
+
+    with pytest.raises(DSLRuntimeError, match="a does not exist."):
+        operand.resolve(EvaluationContext())
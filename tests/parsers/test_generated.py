@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+from dsl import DefaultDSL, DefaultLexer, DefaultParser, DSLSyntaxError
+from dsl.models.exceptions import DSLGrammarError
+from dsl.models.grammar import Grammar, Production, base_grammar
+from dsl.models.symbols.nonterminals import (
+    ConditionFactorSymbol,
+    ExpressionSymbol,
+    OperandSymbol,
+)
+from dsl.models.symbols.terminals import BoolLiteral, IntegerLiteral
+from dsl.parsers.generated import GeneratedParser, ParserGenerator
+from tests.helpers import rules
+
+
+class TestParserGenerator:
+    """Test ParserGenerator."""
+
+    def test_one_function_per_non_terminal(self):
+        source = ParserGenerator(base_grammar).generate()
+        for index, head in enumerate(base_grammar):
+            assert f"def parse_{index}(tokens, kinds, origin, memo):" in source
+            assert f'"""Parse {head.__name__} at tokens[origin]."""' in source
+        compile(source, "<generated>", "exec")
+
+    def test_productions_in_grammar_order(self):
+        source = ParserGenerator(base_grammar).generate()
+        positions = [
+            source.index(f"    # {production!r}\n")
+            for production in base_grammar[ExpressionSymbol]
+        ]
+        assert positions == sorted(positions)
+
+    def test_write(self, tmp_path):
+        path = ParserGenerator(base_grammar).write(tmp_path / "parser.py")
+        assert path.read_text() == ParserGenerator(base_grammar).generate()
+
+    def test_local_symbol(self):
+        class LocalSymbol(OperandSymbol):
+            pass
+
+        grammar = Grammar({LocalSymbol: [Production(IntegerLiteral)]})
+        with pytest.raises(DSLGrammarError):
+            ParserGenerator(grammar).generate()
+
+
+class TestGeneratedParser:
+    """Test GeneratedParser."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_tree_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert GeneratedParser().parse(tokens) == DefaultParser().parse(tokens)
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["IF 1 == 1 THEN RETURN(3) IF", "IF 2 > 1 THEN ELSE", "RETURN(1)"],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert GeneratedParser().parse(tokens)
+
+    def test_start_symbol(self):
+        tokens = [BoolLiteral("TRUE")]
+        assert GeneratedParser().parse(
+            tokens, start_symbol=ConditionFactorSymbol()
+        ) == DefaultParser().parse(
+            tokens, start_symbol=ConditionFactorSymbol()
+        )
+
+    def test_module_cached(self):
+        assert GeneratedParser().module is GeneratedParser().module
+
+    def test_cache_dir(self, tmp_path):
+        parser = GeneratedParser(cache_dir=tmp_path)
+        (path,) = tmp_path.glob("dsl_generated_parser_*.py")
+        assert parser.module.__file__ == str(path)
+
+    def test_cache_dir_format_version(self, tmp_path, monkeypatch):
+        GeneratedParser(cache_dir=tmp_path)
+        monkeypatch.setattr("dsl.parsers.generated.FORMAT_VERSION", 2)
+        parser = GeneratedParser(cache_dir=tmp_path)
+        assert len(list(tmp_path.glob("dsl_generated_parser_*.py"))) == 2
+        assert "Format version: 2" in Path(parser.module.__file__).read_text()
+
+    def test_custom_grammar(self):
+        grammar = Grammar(base_grammar)
+        grammar[OperandSymbol] = grammar[OperandSymbol][1:]
+        tokens = DefaultLexer().tokenize("IF TRUE THEN RETURN(1)")
+        assert GeneratedParser(grammar).parse(tokens) == DefaultParser(
+            grammar
+        ).parse(tokens)
+
+    def test_dsl(self):
+        dsl = DefaultDSL(parser=GeneratedParser())
+        assert dsl.execute("IF 1 + 1 == 2 THEN RETURN(6)") == [6]
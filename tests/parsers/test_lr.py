@@ -0,0 +1,158 @@
+import sys
+
+import pytest
+
+from dsl import DefaultLexer, DefaultParser, DSLSyntaxError
+from dsl.models.exceptions import DSLGrammarError
+from dsl.models.grammar import Grammar, Production, base_grammar
+from dsl.models.representables.evaluables import EvaluableBlock
+from dsl.models.symbols.nonterminals import (
+    ConditionExprSymbol,
+    ConditionFactorSymbol,
+    ExpressionSymbol,
+    OperandSymbol,
+)
+from dsl.models.symbols.terminals import (
+    BoolLiteral,
+    IntegerLiteral,
+    PlusLiteral,
+)
+from dsl.parsers.lr import LRParser, LRTable, LRTableBuilder
+from tests.helpers import rules
+
+
+class TestLRTableBuilder:
+    """Test LRTableBuilder."""
+
+    def test_conflicts_reported(self):
+        table = LRTableBuilder(base_grammar, ConditionExprSymbol).build()
+        conflicts = {str(conflict) for conflict in table.conflicts}
+        assert any(
+            "reduce ConditionFactorSymbol -> BoolLiteral was chosen over "
+            "reduce OperandSymbol -> BoolLiteral" in conflict
+            for conflict in conflicts
+        )
+        assert any("on OrLiteral: shift" in conflict for conflict in conflicts)
+
+    def test_no_conflicts(self):
+        grammar = Grammar(
+            {
+                ExpressionSymbol: [
+                    Production(IntegerLiteral, PlusLiteral, ExpressionSymbol),
+                    Production(IntegerLiteral),
+                ]
+            }
+        )
+        table = LRTableBuilder(grammar, ExpressionSymbol).build()
+        assert table.conflicts == []
+
+    def test_save_and_load(self, tmp_path):
+        table = LRTableBuilder(base_grammar, OperandSymbol).build()
+        table.save(tmp_path / "table.pickle")
+        loaded = LRTable.load(tmp_path / "table.pickle")
+        assert loaded.actions == table.actions
+        assert loaded.gotos == table.gotos
+
+
+class TestLRParser:
+    """Test LRParser."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_tree_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert LRParser().parse(tokens) == DefaultParser().parse(tokens)
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            "IF 2 * 3 + 4 == 14 THEN RETURN(1)",
+            "IF a AND b OR c AND NOT d THEN RETURN(1)",
+            "IF TRUE AND (1 + 2) > 2 THEN RETURN(TRUE)",
+        ],
+    )
+    def test_same_reduction_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        default_parser = DefaultParser()
+        lr_parser = LRParser()
+        assert lr_parser.reduce(lr_parser.parse(tokens)[0]) == (
+            default_parser.reduce(default_parser.parse(tokens)[0])
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["IF 1 == 1 THEN RETURN(3) IF", "IF 2 > 1 THEN ELSE", "RETURN(1)"],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert LRParser().parse(tokens)
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            "IF COUNT(TRUE > 1) THEN RETURN(1)",
+            "IF TRUE AND TRUE == TRUE THEN RETURN(None)",
+        ],
+    )
+    def test_accepts_more_than_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            DefaultParser().parse(tokens)
+        assert isinstance(LRParser().construct(tokens)[0], EvaluableBlock)
+
+    def test_parse_iterator(self):
+        lexer = DefaultLexer()
+        rule = "IF a > 1 THEN RETURN(a) IF b THEN RETURN(b)"
+        assert LRParser().parse(lexer.iter_tokens(rule)) == (
+            DefaultParser().parse(lexer.tokenize(rule))
+        )
+
+    def test_parse_token_stream(self):
+        lexer = DefaultLexer()
+        rule = "IF a > 1 THEN RETURN(a) IF b THEN RETURN(b)"
+        assert LRParser().parse(lexer.token_stream(rule)) == (
+            DefaultParser().parse(lexer.tokenize(rule))
+        )
+
+    def test_iterator_consumed_up_to_error(self):
+        tokens = iter(DefaultLexer().tokenize("IF THEN RETURN(1) IF a"))
+        with pytest.raises(DSLSyntaxError):
+            LRParser().parse(tokens)
+        assert len(list(tokens)) == 5
+
+    def test_start_symbol(self):
+        tokens = [BoolLiteral("TRUE")]
+        assert LRParser().parse(
+            tokens, start_symbol=ConditionFactorSymbol()
+        ) == DefaultParser().parse(
+            tokens, start_symbol=ConditionFactorSymbol()
+        )
+
+    def test_strict(self):
+        with pytest.raises(DSLGrammarError):
+            LRParser(strict=True).parse(DefaultLexer().tokenize("IF a THEN"))
+
+    def test_cache_dir(self, tmp_path):
+        tokens = DefaultLexer().tokenize("IF a > 1 THEN RETURN(a)")
+        parse_tree = LRParser(cache_dir=tmp_path).parse(tokens)
+        assert len(list(tmp_path.glob("lr-*.pickle"))) == 1
+        assert LRParser(cache_dir=tmp_path).parse(tokens) == parse_tree
+
+    def test_cache_keyed_by_grammar(self, tmp_path):
+        grammar = Grammar(base_grammar)
+        grammar[OperandSymbol] = grammar[OperandSymbol][:-1]
+        LRParser(cache_dir=tmp_path).table(ExpressionSymbol)
+        LRParser(grammar, cache_dir=tmp_path).table(ExpressionSymbol)
+        assert len(list(tmp_path.glob("lr-*.pickle"))) == 2
+
+    def test_beyond_recursion_limit(self):
+        count = sys.getrecursionlimit() * 2
+        rule = " ".join(f"IF x > {i} THEN RETURN({i})" for i in range(count))
+        parser = LRParser()
+        parse_tree = parser.parse(DefaultLexer().tokenize(rule))
+        execution_tree = parser.reduce(parse_tree[0])[0]
+        if_statements = 0
+        while isinstance(execution_tree, EvaluableBlock):
+            if_statements += 1
+            execution_tree = execution_tree.contents[-1]
+        assert if_statements == count
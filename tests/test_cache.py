@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dsl.cache import CacheInfo, Identity, LRUCache, write_atomic
+
+
+class TestLRUCache:
+    """Test LRUCache."""
+
+    def test_get_or_create(self):
+        cache: LRUCache[str, int] = LRUCache()
+        assert cache.get_or_create("a", lambda: 1) == 1
+        assert cache.get_or_create("a", lambda: 2) == 1
+        assert "a" in cache
+        assert cache.info() == CacheInfo(1, 1, 0, 1, 128)
+
+    def test_evicts_least_recently_used(self):
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        cache.get_or_create("a", lambda: 1)
+        cache.get_or_create("b", lambda: 2)
+        cache.get_or_create("a", lambda: 1)
+        cache.get_or_create("c", lambda: 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.info() == CacheInfo(1, 3, 1, 2, 2)
+
+    def test_evicts_by_weight(self):
+        cache: LRUCache[str, str] = LRUCache(
+            maxsize=None, maxweight=5, weigh=len
+        )
+        cache.get_or_create("a", lambda: "aa")
+        cache.get_or_create("b", lambda: "bbb")
+        assert cache.info() == CacheInfo(0, 2, 0, 2, None, 5, 5)
+        cache.get_or_create("c", lambda: "c")
+        assert "a" not in cache
+        assert cache.info() == CacheInfo(0, 3, 1, 2, None, 4, 5)
+        assert cache.get_or_create("d", lambda: "dddddd") == "dddddd"
+        assert len(cache) == 0
+        assert cache.info().weight == 0
+
+    def test_unbounded(self):
+        cache: LRUCache[int, int] = LRUCache(maxsize=None)
+        for i in range(1000):
+            cache.get_or_create(i, lambda: i)
+        assert len(cache) == 1000
+        assert cache.info().evictions == 0
+
+    def test_clear(self):
+        cache: LRUCache[str, int] = LRUCache()
+        cache.get_or_create("a", lambda: 1)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.info() == CacheInfo(0, 0, 0, 0, 128)
+
+    def test_threads(self):
+        cache: LRUCache[int, int] = LRUCache(maxsize=10)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda i: cache.get_or_create(i % 20, lambda: i % 20),
+                    range(2000),
+                )
+            )
+        assert results == [i % 20 for i in range(2000)]
+        info = cache.info()
+        assert info.hits + info.misses == 2000
+        assert info.size == 10
+
+
+class TestIdentity:
+    """Test Identity."""
+
+    def test_identity(self):
+        a, b = {"x": 1}, {"x": 1}
+        assert Identity(a) == Identity(a)
+        assert hash(Identity(a)) == hash(Identity(a))
+        assert Identity(a) != Identity(b)
+        assert Identity(a) != a
+
+
+class TestWriteAtomic:
+    """Test write_atomic."""
+
+    def test_write(self, tmp_path):
+        path = tmp_path / "dir" / "file.bin"
+        write_atomic(path, b"a")
+        write_atomic(path, b"b")
+        assert path.read_bytes() == b"b"
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_concurrent_writes(self, tmp_path):
+        path = tmp_path / "file.bin"
+        data = [bytes([i]) * 100000 for i in range(16)]
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda d: write_atomic(path, d), data))
+        assert path.read_bytes() in data
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_failed_write(self, tmp_path):
+        path = tmp_path / "file.bin"
+        with pytest.raises(TypeError):
+            write_atomic(path, "not bytes")  # type: ignore[arg-type]
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,101 @@
+import operator
+import random
+from dataclasses import MISSING
+
+import pytest
+
+from dsl import DefaultDSL
+from dsl.closures import OPERATOR_FUNCTIONS, ClosureCompiler
+from dsl.models import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.evaluables import EvaluableIfStatement
+from dsl.models.representables.operators import EqualOperator, PlusOperator
+from dsl.models.symbols.nonterminals import IfStatementSymbol
+from tests.helpers import outcome, random_rule, rows, rules
+
+
+class TestClosureCompiler:
+    """Test ClosureCompiler."""
+
+    def test_expression(self):
+        tree = DefaultDSL().construct("IF x + 2 > 3 THEN RETURN(x)")
+        closure = ClosureCompiler().compile(tree.contents[0].contents[1])
+        assert closure(EvaluationContext({"x": 2})) is True
+        assert closure(EvaluationContext({"x": 1})) is False
+
+    def test_operator_functions(self):
+        assert OPERATOR_FUNCTIONS[PlusOperator] is operator.add
+        # Equality compares lists elementwise so is not operator.eq
+        assert EqualOperator not in OPERATOR_FUNCTIONS
+        compiled = DefaultDSL(backend=ClosureCompiler()).compile(
+            "IF COUNT(x == 1) == 2 THEN RETURN(x)"
+        )
+        assert compiled.execute({"x": [1, 2, 1]}) == [[1, 2, 1]]
+
+    def test_statements(self):
+        dsl = DefaultDSL(backend=ClosureCompiler())
+        rule = "IF x > 1 THEN RETURN(1) ELIF x THEN RETURN(2) ELSE RETURN(3)"
+        compiled = dsl.compile(rule)
+        assert [compiled.execute({"x": x}) for x in (2, 1, 0)] == [
+            [1],
+            [2],
+            [3],
+        ]
+
+    def test_missing_outputs(self):
+        dsl = DefaultDSL(start_symbol=IfStatementSymbol())
+        tree = dsl.construct("IF x > 1 THEN RETURN(1) ELIF x THEN RETURN(2)")
+        assert isinstance(tree, EvaluableIfStatement)
+        closure = ClosureCompiler().compile(tree)
+        assert closure(EvaluationContext({"x": 0})) is MISSING
+        assert closure(EvaluationContext({"x": 1})) == 2
+
+    def test_short_circuit(self):
+        dsl = DefaultDSL(backend=ClosureCompiler())
+        compiled = dsl.compile("IF y != 0 AND x / y > 1 THEN RETURN(x)")
+        assert compiled.execute({"x": 1, "y": 0}) == []
+        assert compiled.execute({"x": 2, "y": 1}) == [2]
+        compiled = dsl.compile("IF y == 0 OR x / y > 1 THEN RETURN(x)")
+        assert compiled.execute({"x": 1, "y": 0}) == [1]
+
+    def test_action_args(self):
+        rule = "IF TRUE THEN RETURN([x, 1], [1, [2, x]], 3, [4, 5])"
+        compiled = DefaultDSL(backend=ClosureCompiler()).compile(rule)
+        assert compiled.execute({"x": 0}) == [([0, 1], 1, [2, 0], 3, 4, 5)]
+
+    def test_bound_variables(self):
+        dsl = DefaultDSL(backend=ClosureCompiler())
+        dsl.lexer.variables = {"x": 5}
+        assert dsl.execute("IF x > 1 THEN RETURN(x)") == [5]
+
+    def test_missing_variable(self):
+        compiled = DefaultDSL(backend=ClosureCompiler()).compile(
+            "IF x > y THEN RETURN(1)"
+        )
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            compiled.execute({"x": 1})
+
+
+@pytest.mark.parametrize("rule", rules)
+def test_same_as_tree(rule):
+    tree_rule = DefaultDSL().compile(rule)
+    closure_rule = DefaultDSL(backend=ClosureCompiler()).compile(rule)
+    for variables in rows:
+        assert outcome(closure_rule, variables) == outcome(
+            tree_rule, variables
+        )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_tree_random(seed):
+    rng = random.Random(seed)
+    dsl = DefaultDSL()
+    closure_dsl = DefaultDSL(backend=ClosureCompiler())
+    for _ in range(25):
+        rule = random_rule(rng)
+        tree_rule = dsl.compile(rule)
+        closure_rule = closure_dsl.compile(rule, optimize=True)
+        for variables in rows[:2]:
+            assert outcome(closure_rule, variables) == outcome(
+                tree_rule, variables
+            ), rule
@@ -0,0 +1,190 @@
+import logging
+import random
+from dataclasses import MISSING
+
+import pytest
+
+from dsl import DefaultDSL, DefaultLexer
+from dsl.codegen import PythonCompiler, RuleGenerator
+from dsl.lexers import Lexer
+from dsl.models import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.evaluables import (
+    EvaluableExpression,
+    EvaluableIfStatement,
+)
+from dsl.models.representables.operands import FloatOperand, IntegerOperand
+from dsl.models.representables.operators import PlusOperator
+from dsl.models.symbols.nonterminals import IfStatementSymbol
+from tests.helpers import outcome, random_rule, rows, rules
+
+
+class TestRuleGenerator:
+    """Test RuleGenerator."""
+
+    def test_generate(self):
+        tree = DefaultDSL().construct("IF x + 2 > 3 THEN RETURN(x)")
+        generator = RuleGenerator()
+        source = generator.generate(tree)
+        assert "def rule(context):" in source
+        assert "_2 = _1 + 2" in source
+        assert "_3 = _2 > 3" in source
+        assert generator.references == {}
+
+    def test_references(self):
+        # Infinity has no literal so the operand is given to the module
+        expression = EvaluableExpression(
+            [FloatOperand("1e999"), IntegerOperand("1"), PlusOperator("+")]
+        )
+        generator = RuleGenerator()
+        generator.generate(expression)
+        assert list(generator.references) == ["_r0"]
+
+
+class TestPythonCompiler:
+    """Test PythonCompiler."""
+
+    def test_statements(self):
+        dsl = DefaultDSL(backend=PythonCompiler())
+        rule = "IF x > 1 THEN RETURN(1) ELIF x THEN RETURN(2) ELSE RETURN(3)"
+        compiled = dsl.compile(rule)
+        assert [compiled.execute({"x": x}) for x in (2, 1, 0)] == [
+            [1],
+            [2],
+            [3],
+        ]
+
+    def test_missing_outputs(self):
+        dsl = DefaultDSL(start_symbol=IfStatementSymbol())
+        tree = dsl.construct("IF x > 1 THEN RETURN(1) ELIF x THEN RETURN(2)")
+        assert isinstance(tree, EvaluableIfStatement)
+        function = PythonCompiler().compile(tree)
+        assert function(EvaluationContext({"x": 0})) is MISSING
+        assert function(EvaluationContext({"x": 1})) == 2
+
+    def test_short_circuit(self):
+        dsl = DefaultDSL(backend=PythonCompiler())
+        compiled = dsl.compile("IF y != 0 AND x / y > 1 THEN RETURN(x)")
+        assert compiled.execute({"x": 1, "y": 0}) == []
+        assert compiled.execute({"x": 2, "y": 1}) == [2]
+        compiled = dsl.compile("IF y == 0 OR x / y > 1 THEN RETURN(x)")
+        assert compiled.execute({"x": 1, "y": 0}) == [1]
+
+    def test_action_args(self):
+        rule = "IF TRUE THEN RETURN([x, 1], [1, [2, x]], 3, [4, 5])"
+        compiled = DefaultDSL(backend=PythonCompiler()).compile(rule)
+        assert compiled.execute({"x": 0}) == [([0, 1], 1, [2, 0], 3, 4, 5)]
+
+    def test_bound_variables(self):
+        dsl = DefaultDSL(backend=PythonCompiler())
+        dsl.lexer.variables = {"x": 5}
+        assert dsl.execute("IF x > 1 THEN RETURN(x)") == [5]
+
+    def test_missing_variable(self):
+        compiled = DefaultDSL(backend=PythonCompiler()).compile(
+            "IF x > y THEN RETURN(1)"
+        )
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            compiled.execute({"x": 1})
+
+    def test_deep_nesting(self):
+        # Each AND nests its right operand deeper than Python allows
+        rule = f"IF {' AND '.join(['x'] * 120)} THEN RETURN(1)"
+        compiled = DefaultDSL(backend=PythonCompiler()).compile(rule)
+        assert compiled.executable == compiled.tree.evaluate
+        assert compiled.execute({"x": True}) == [1]
+
+
+class TestCodeCache:
+    """Test the code of rules cached on disk by PythonCompiler."""
+
+    rule = "IF x > 1 THEN RETURN(x)"
+
+    def test_cache(self, tmp_path, monkeypatch):
+        compiled = DefaultDSL(backend=PythonCompiler(tmp_path)).compile(
+            self.rule
+        )
+        assert compiled.tree is not None
+        assert len(list(tmp_path.glob("rule-*.marshal"))) == 1
+
+        def construct(dsl, input_string):
+            raise AssertionError("Cached rules are not constructed.")
+
+        # A later process loads the rule without lexing or parsing it
+        monkeypatch.setattr(DefaultDSL, "construct", construct)
+        dsl = DefaultDSL(backend=PythonCompiler(tmp_path))
+        loaded = dsl.compile("IF  x > 1\nTHEN RETURN(x)")
+        assert loaded.tree is None
+        assert loaded.execute({"x": 2}) == [2]
+        assert loaded.execute({"x": 0}) == []
+
+    def test_bound_variables(self, tmp_path):
+        DefaultDSL(backend=PythonCompiler(tmp_path)).compile(self.rule)
+        dsl = DefaultDSL(backend=PythonCompiler(tmp_path))
+        dsl.lexer.variables = {"x": 5}
+        assert dsl.execute(self.rule) == [5]
+
+    def test_custom_lexer(self, tmp_path):
+        class CustomLexer(Lexer):
+            def tokenize(self, input_string):
+                return DefaultLexer().tokenize(input_string)
+
+        for _ in range(2):
+            dsl = DefaultDSL(
+                lexer=CustomLexer(), backend=PythonCompiler(tmp_path)
+            )
+            assert dsl.execute("IF 2 > 1 THEN RETURN(1)") == [1]
+        assert len(list(tmp_path.glob("rule-*.marshal"))) == 1
+
+    def test_cache_key(self, tmp_path):
+        dsl = DefaultDSL(backend=PythonCompiler(tmp_path))
+        dsl.compile(self.rule)
+        dsl.compile(self.rule, optimize=True)
+        dsl.compile("IF x > 2 THEN RETURN(x)")
+        DefaultDSL(
+            start_symbol=IfStatementSymbol(),
+            backend=PythonCompiler(tmp_path),
+        ).compile(self.rule)
+        assert len(list(tmp_path.glob("rule-*.marshal"))) == 4
+
+    def test_invalid_cache(self, tmp_path, caplog):
+        DefaultDSL(backend=PythonCompiler(tmp_path)).compile(self.rule)
+        [path] = tmp_path.glob("rule-*.marshal")
+        path.write_bytes(b"invalid")
+        dsl = DefaultDSL(backend=PythonCompiler(tmp_path))
+        with caplog.at_level(logging.WARNING, logger="dsl.codegen"):
+            compiled = dsl.compile(self.rule)
+        assert "Could not load compiled rule" in caplog.text
+        assert compiled.tree is not None
+        assert compiled.execute({"x": 2}) == [2]
+
+    def test_references_not_cached(self, tmp_path):
+        expression = EvaluableExpression(
+            [FloatOperand("1e999"), IntegerOperand("1"), PlusOperator("+")]
+        )
+        function = PythonCompiler(tmp_path).store("key", expression)
+        assert function(None) == float("inf")
+        assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("rule", rules)
+def test_same_as_tree(rule):
+    tree_rule = DefaultDSL().compile(rule)
+    python_rule = DefaultDSL(backend=PythonCompiler()).compile(rule)
+    for variables in rows:
+        assert outcome(python_rule, variables) == outcome(tree_rule, variables)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_tree_random(seed, tmp_path):
+    rng = random.Random(seed)
+    dsl = DefaultDSL()
+    python_dsl = DefaultDSL(backend=PythonCompiler(tmp_path))
+    for _ in range(25):
+        rule = random_rule(rng)
+        tree_rule = dsl.compile(rule)
+        python_rule = python_dsl.compile(rule, optimize=True)
+        for variables in rows[:2]:
+            assert outcome(python_rule, variables) == outcome(
+                tree_rule, variables
+            ), rule
@@ -0,0 +1,167 @@
+import re
+from dataclasses import MISSING
+
+import pytest
+
+from dsl import DefaultDSL
+from dsl.columnar import HAS_NUMPY, ColumnarEngine, PythonBackend
+from dsl.models.exceptions import DSLRuntimeError
+
+BACKENDS = [
+    False,
+    pytest.param(
+        True,
+        marks=pytest.mark.skipif(not HAS_NUMPY, reason="NumPy is required"),
+    ),
+]
+
+columns = {
+    "x": [1, 4, 6, 9, 0],
+    "y": [1, 2, 3, 4, 5],
+    "z": [False, True, False, 0, "a"],
+    "f": [0.5, 1.5, 2.5, -1.0, 0.0],
+    "s": ["a", "b", "", "a", "c"],
+    "l": [[3], [1], [3, 3], [], [1, 3]],
+    "d": [{"a": 1}, {"a": 2}, {"a": 3}, {"a": 4}, {"a": 5}],
+}
+
+rules = [
+    "IF x / y > 1 AND NOT z THEN RETURN(x) "
+    "ELIF y == 5 OR x > 5 THEN RETURN('a') ELSE RETURN(x, y)",
+    "IF COUNT(l == 3) > 0 THEN RETURN(l) IF d.a % 2 == 0 THEN RETURN(d)",
+    "IF s == 'a' THEN RETURN(s) ELIF s THEN RETURN([1, s]) ELSE RETURN(None)",
+    "IF f * 2 >= x - 1 OR s != 'a' AND y < 3 THEN RETURN(f, TRUE)",
+    "IF x AND f THEN RETURN(1) ELIF z OR s THEN RETURN(2)",
+    "IF (x + 1) * 2 - y <= 6 THEN RETURN(x)",
+    "IF TRUE THEN RETURN(2)",
+]
+
+# Rules with list conditions, which cannot be evaluated once a row reaches them
+invalid_rules = [
+    "IF [1, 2] THEN RETURN(1)",
+    "IF x > 1 THEN RETURN(0) ELIF ([x, 0]) THEN RETURN(1)",
+    "IF x > 1 THEN RETURN(0) ELIF [x, 0] THEN RETURN(1) ELSE RETURN(2)",
+]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestColumnarEngine:
+    """Test ColumnarEngine."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_as_rows(self, rule, use_numpy):
+        dsl = DefaultDSL()
+        rows = [
+            {name: values[i] for name, values in columns.items()}
+            for i in range(5)
+        ]
+        expected = [result.outcome for result in dsl.execute_many(rule, rows)]
+        assert dsl.execute_columns(rule, columns, use_numpy) == expected
+
+    @pytest.mark.parametrize("rule", invalid_rules)
+    @pytest.mark.parametrize("x", [[2, 3], [2, 0]])
+    def test_invalid_conditions(self, rule, x, use_numpy):
+        # The error of the first row reaching a list condition is raised
+        dsl = DefaultDSL()
+        results = list(dsl.execute_many(rule, [{"x": value} for value in x]))
+        errors = [result.error for result in results if result.error]
+        if not errors:
+            expected = [result.outcome for result in results]
+            assert dsl.execute_columns(rule, {"x": x}, use_numpy) == expected
+            return
+        with pytest.raises(DSLRuntimeError, match=re.escape(str(errors[0]))):
+            dsl.execute_columns(rule, {"x": x}, use_numpy)
+
+    def test_masked_selection(self, use_numpy):
+        # Rows which took the first branch never divide by zero
+        rule = "IF y == 0 THEN RETURN(0) ELIF x / y > 1 THEN RETURN(x)"
+        dsl = DefaultDSL()
+        outputs = dsl.execute_columns(
+            rule, {"x": [1, 2, 3], "y": [0, 1, 0]}, use_numpy
+        )
+        assert outputs == [[0], [2], [0]]
+        with pytest.raises(ZeroDivisionError):
+            dsl.execute_columns(
+                "IF x / y > 1 THEN RETURN(x)",
+                {"x": [1, 2], "y": [1, 0]},
+                use_numpy,
+            )
+
+    def test_short_circuit(self, use_numpy):
+        dsl = DefaultDSL()
+        columns = {"x": [3, 2, 1], "y": [1, 0, 0]}
+        outputs = dsl.execute_columns(
+            "IF y != 0 AND x / y > 1 THEN RETURN(x)", columns, use_numpy
+        )
+        assert outputs == [[3], [], []]
+        outputs = dsl.execute_columns(
+            "IF y == 0 OR x / y > 1 THEN RETURN(x)", columns, use_numpy
+        )
+        assert outputs == [[3], [2], [1]]
+
+    def test_statement_outputs(self, use_numpy):
+        tree = DefaultDSL().compile("IF x > 1 THEN RETURN(x)").tree
+        engine = ColumnarEngine(use_numpy)
+        [outputs] = engine.evaluate(tree, {"x": [1, 2, 3]})
+        assert engine.backend.to_list(outputs) == [MISSING, 2, 3]
+
+    def test_missing_variable(self, use_numpy):
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            DefaultDSL().execute_columns(
+                "IF x > y THEN RETURN(1)", {"x": [1]}, use_numpy
+            )
+
+    def test_unequal_columns(self, use_numpy):
+        with pytest.raises(ValueError):
+            DefaultDSL().execute_columns(
+                "IF x > y THEN RETURN(1)", {"x": [1], "y": [1, 2]}, use_numpy
+            )
+
+    def test_python_values(self, use_numpy):
+        outputs = DefaultDSL().execute_columns(
+            "IF x > 1 THEN RETURN(x) ELSE RETURN(f)",
+            {"x": [1, 2], "f": [0.5, 1.5]},
+            use_numpy,
+        )
+        assert outputs == [[0.5], [2]]
+        assert type(outputs[1][0]) is int
+
+    def test_python_ints(self, use_numpy):
+        # Ints are not fixed-width so do not overflow
+        dsl = DefaultDSL()
+        rule = "IF x * 4 > 10 AND x + 1 > x THEN RETURN(1) ELSE RETURN(0)"
+        columns = {"x": [2**62, 2**63 - 1, 1]}
+        assert dsl.execute_columns(rule, columns, use_numpy) == [[1], [1], [0]]
+        outputs = dsl.execute_columns(
+            "IF f < 9007199254740993 THEN RETURN(1) ELSE RETURN(0)",
+            {"f": [9007199254740992.0, 1.0]},
+            use_numpy,
+        )
+        assert outputs == [[1], [1]]
+
+    def test_python_strings(self, use_numpy):
+        outputs = DefaultDSL().execute_columns(
+            "IF s == 'a' THEN RETURN(1) ELSE RETURN(s)",
+            {"s": ["a\x00", "a"]},
+            use_numpy,
+        )
+        assert outputs == [["a\x00"], [1]]
+
+
+def test_python_backend():
+    assert isinstance(ColumnarEngine(use_numpy=False).backend, PythonBackend)
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy is required")
+def test_numpy_arrays():
+    import numpy as np
+
+    outputs = DefaultDSL().execute_columns(
+        "IF x + y > 3 AND NOT b THEN RETURN(x)",
+        {
+            "x": np.arange(4),
+            "y": np.array([3.0, 3.0, 0.5, 1.0]),
+            "b": np.array([False, True, False, False]),
+        },
+    )
+    assert outputs == [[], [], [], [3]]
@@ -1,11 +1,25 @@
+import dataclasses
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, ClassVar
 
 import pytest
 
-from dsl import DefaultDSL, DefaultLexer, DefaultParser, EvaluableAction
+from dsl import (
+    DefaultDSL,
+    DefaultLexer,
+    DefaultParser,
+    EvaluableAction,
+    ExecutionResult,
+)
+from dsl.cache import CacheInfo
+from dsl.compiled import canonical_form
+from dsl.lexers import Lexer
 from dsl.models import Function
 from dsl.models.exceptions import (
     DSLException,
+    DSLRuntimeError,
     DSLSyntaxError,
     DSLValidationError,
 )
@@ -13,6 +27,7 @@ from dsl.models.grammar import Grammar, Production, base_grammar
 from dsl.models.representables.actions import Action, ReturnAction
 from dsl.models.representables.evaluables import (
     EvaluableActionArg,
+    EvaluableIfStatement,
     EvaluableList,
     EvaluableListArg,
 )
@@ -36,6 +51,15 @@ from dsl.models.symbols.terminals import (
     StringLiteral,
     VariableLiteral,
 )
+from dsl.parsers import (
+    FusedParser,
+    IterativeParser,
+    LeftFactoredParser,
+    PackratParser,
+    PrecedenceParser,
+)
+from dsl.parsers.generated import GeneratedParser
+from dsl.parsers.lr import LRParser
 
 
 class OutcomeAction(Action):
@@ -547,3 +571,478 @@ class TestDefaultDSLExecute:
         assert dsl.execute("IF TRUE THEN RETURN([[1,2],2,3])") == [
             [[1, 2], 2, 3]
         ]
+
+
+class TestDefaultDSLIterativeParser:
+    """Test DefaultDSL with an IterativeParser."""
+
+    def test_many_if_statements(self):
+        count = sys.getrecursionlimit() * 2
+        lexer = DefaultLexer(variables={"x": count // 2})
+        dsl = DefaultDSL(lexer=lexer, parser=IterativeParser())
+        rule = " ".join(f"IF x > {i} THEN RETURN({i})" for i in range(count))
+        assert dsl.execute(rule) == list(range(count // 2))
+        assert len(dsl.validate(rule).actions) == count
+
+    def test_long_elif_chain(self):
+        count = sys.getrecursionlimit() * 2
+        lexer = DefaultLexer(variables={"x": count - 1})
+        dsl = DefaultDSL(lexer=lexer, parser=IterativeParser())
+        rule = "IF x == 0 THEN RETURN(0) " + " ".join(
+            f"ELIF x == {i} THEN RETURN({i})" for i in range(1, count)
+        )
+        assert dsl.execute(rule) == [count - 1]
+
+    def test_long_list(self):
+        dsl = DefaultDSL(parser=IterativeParser())
+        elements = list(range(10_000))
+        rule = f"IF TRUE THEN RETURN({elements}, {elements})"
+        assert dsl.execute(rule) == [(elements, elements)]
+
+
+class TestDefaultDSLConcurrency:
+    """Test sharing a DefaultDSL between threads."""
+
+    @staticmethod
+    def rule(i: int) -> str:
+        return (
+            f"IF x > {i} AND y[{i % 3}] != {i} OR NOT z.a == 'r{i}' "
+            f"THEN RETURN({i}, [{i}, x]) ELIF x + {i} * 2 <= {i % 7} "
+            f"THEN RETURN('n{i}') ELSE RETURN(None)"
+        )
+
+    @pytest.mark.parametrize(
+        "parser, count",
+        [
+            (DefaultParser, 2000),
+            (PackratParser, 500),
+            (FusedParser, 500),
+            (IterativeParser, 500),
+            (PrecedenceParser, 500),
+            (LeftFactoredParser, 500),
+            (LRParser, 500),
+            (GeneratedParser, 500),
+        ],
+    )
+    def test_parse_from_threads(self, parser, count):
+        dsl = DefaultDSL(parser=parser())
+        rules = [self.rule(i) for i in range(count)]
+        expected = [repr(dsl.construct(rule)) for rule in rules]
+
+        # Switch threads often so parses interleave
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(
+                    executor.map(lambda r: repr(dsl.construct(r)), rules)
+                )
+        finally:
+            sys.setswitchinterval(switch_interval)
+        assert results == expected
+
+    def test_start_symbol_not_mutated(self):
+        start_symbol = OperandSymbol()
+        dsl = DefaultDSL(start_symbol=start_symbol)
+        assert dsl.validate("[1, 2]").is_valid
+        assert dsl.validate("[1, 2]").is_valid
+        assert start_symbol == OperandSymbol()
+
+
+class TestDefaultDSLStream:
+    """Test executing a DefaultDSL from a stream."""
+
+    rule = (
+        "IF x > 1 THEN RETURN(1) "
+        "IF x < 1 THEN RETURN(2) ELIF x == 1 THEN RETURN('IF x') "
+        "IF TRUE THEN RETURN([x, 'a b'])"
+    )
+
+    class Reader(io.StringIO):
+        """A text file which counts the characters read from it."""
+
+        position = 0
+
+        def read(self, size: int | None = -1) -> str:
+            chunk = super().read(size)
+            self.position += len(chunk)
+            return chunk
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+    def test_matches_execute(self, chunk_size):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        expected = dsl.execute(self.rule)
+        assert list(dsl.iter_execute(self.rule, chunk_size)) == expected
+        assert (
+            list(dsl.iter_execute(io.StringIO(self.rule), chunk_size))
+            == expected
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7])
+    def test_custom_lexer(self, chunk_size):
+        class CustomLexer(Lexer):
+            variables = {"x": 1}
+
+            def tokenize(self, input_string):
+                return DefaultLexer(self.variables).tokenize(input_string)
+
+        # The string literals cross the chunks they are read in
+        dsl = DefaultDSL(lexer=CustomLexer())
+        expected = dsl.execute(self.rule)
+        reader = io.StringIO(self.rule)
+        assert list(dsl.iter_execute(reader, chunk_size)) == expected
+
+    def test_statements(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        statements = list(dsl.iter_statements(self.rule, chunk_size=5))
+        assert len(statements) == 3
+        assert all(isinstance(s, EvaluableIfStatement) for s in statements)
+
+    def test_lazy(self):
+        rule = " ".join(f"IF TRUE THEN RETURN({i})" for i in range(1000))
+        reader = self.Reader(rule)
+        outputs = DefaultDSL().iter_execute(reader, chunk_size=64)
+        assert next(outputs) == 0
+        assert reader.position <= 128
+        assert list(outputs) == list(range(1, 1000))
+        assert reader.position == len(rule)
+
+    def test_error_after_statements(self):
+        outputs = DefaultDSL().iter_execute(
+            "IF TRUE THEN RETURN(1) IF TRUE THEN RETURN(2) IF ^ THEN",
+            chunk_size=4,
+        )
+        assert next(outputs) == 1
+        assert next(outputs) == 2
+        with pytest.raises(DSLSyntaxError):
+            next(outputs)
+
+    @pytest.mark.parametrize(
+        "input_string",
+        ["", "   ", "RETURN(1) IF TRUE THEN RETURN(2)", "IF TRUE THEN", "'a"],
+    )
+    def test_invalid_syntax(self, input_string):
+        with pytest.raises(DSLSyntaxError):
+            list(DefaultDSL().iter_execute(input_string, chunk_size=2))
+
+
+class TestDefaultDSLCompile:
+    """Test compiling a rule once and executing it against many rows."""
+
+    rule = (
+        "IF x > 1 AND y[2] != 3 THEN RETURN(x, [1, y]) "
+        "ELIF NOT z.b == 'n' THEN RETURN('n') ELSE RETURN(None) "
+        "IF COUNT(y == 3) > 0 AND z.a + x > 4 THEN RETURN(z)"
+    )
+
+    @staticmethod
+    def row(i: int) -> dict[str, Any]:
+        return {"x": i % 4, "y": [i, i % 5], "z": {"a": i, "b": "n" * (i % 2)}}
+
+    def test_matches_execute(self):
+        compiled = DefaultDSL().compile(self.rule)
+        for i in range(20):
+            lexer = DefaultLexer(variables=self.row(i))
+            expected = DefaultDSL(lexer=lexer).execute(self.rule)
+            assert compiled.execute(self.row(i)) == expected
+
+    def test_lexer_variables(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables=self.row(2)))
+        compiled = dsl.compile(self.rule)
+        assert compiled.execute() == dsl.execute(self.rule)
+        assert compiled.execute(self.row(6)) == [(2, [1, [6, 1]])]
+
+    def test_missing_variable(self):
+        compiled = DefaultDSL().compile(self.rule)
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            compiled.execute({"x": 2})
+
+    def test_immutable(self):
+        compiled = DefaultDSL().compile(self.rule)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            compiled.text = ""  # type: ignore[misc]
+        before = repr(compiled.tree)
+        compiled.execute(self.row(1))
+        assert repr(compiled.tree) == before
+
+    def test_execute_from_threads(self):
+        compiled = DefaultDSL().compile(self.rule)
+        rows = [self.row(i) for i in range(2000)]
+        expected = [compiled.execute(row) for row in rows]
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(compiled.execute, rows))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        assert results == expected
+
+    def test_syntax_error(self):
+        with pytest.raises(DSLSyntaxError):
+            DefaultDSL().compile("IF x THEN")
+
+
+class TestDefaultDSLExecuteMany:
+    """Test executing a rule against many rows."""
+
+    rule = "IF x / y > 1 THEN RETURN(x) ELSE RETURN('small')"
+
+    def test_in_order(self):
+        rows = [{"x": x, "y": 2} for x in range(5)]
+        results = list(DefaultDSL().execute_many(self.rule, rows))
+        assert [result.outcome for result in results] == [
+            ["small"],
+            ["small"],
+            ["small"],
+            [3],
+            [4],
+        ]
+        assert all(result.is_successful for result in results)
+
+    def test_row_errors(self):
+        rows = [{"x": 2, "y": 1}, {"x": 2, "y": 0}, {"x": 2}, {"x": 4, "y": 2}]
+        results = list(DefaultDSL().execute_many(self.rule, rows))
+        assert [result.is_successful for result in results] == [
+            True,
+            False,
+            False,
+            True,
+        ]
+        assert isinstance(results[1].error, ZeroDivisionError)
+        assert isinstance(results[2].error, DSLRuntimeError)
+        assert results[3] == ExecutionResult(True, [4])
+
+    def test_lazy(self):
+        read = []
+
+        def rows():
+            for x in range(1000):
+                read.append(x)
+                yield {"x": x, "y": 1}
+
+        results = DefaultDSL().execute_many(self.rule, rows())
+        assert next(results).outcome == ["small"]
+        assert read == [0]
+
+    def test_compiled_rule(self):
+        dsl = DefaultDSL()
+        compiled = dsl.compile(self.rule)
+        results = dsl.execute_many(compiled, [{"x": 3, "y": 1}])
+        assert list(results) == [ExecutionResult(True, [3])]
+
+    def test_syntax_error(self):
+        with pytest.raises(DSLSyntaxError):
+            DefaultDSL().execute_many("IF x THEN", [])
+
+
+class TestDefaultDSLCache:
+    """Test caching compiled rules and validation results."""
+
+    rule = "IF x > 1 THEN RETURN('a  b') ELSE RETURN(x)"
+
+    def test_canonical_form(self):
+        assert canonical_form("  IF x >\n 1 THEN RETURN('a  b')  ") == (
+            "IF x > 1 THEN RETURN('a  b')"
+        )
+        assert canonical_form("RETURN(\"a \n b\",  'c')") == (
+            "RETURN(\"a \n b\", 'c')"
+        )
+
+    def test_hits_whitespace_variants(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 2}), cache_size=8)
+        compiled = dsl.compile(self.rule)
+        assert dsl.compile("IF  x > 1\nTHEN RETURN('a  b') ELSE RETURN(x) ")
+        assert dsl.compile(self.rule.replace("'a  b'", "'a b'")) is not (
+            compiled
+        )
+        assert dsl.compile(self.rule) is compiled
+        assert dsl.cache_info() == CacheInfo(2, 2, 0, 2, 8, dsl.cache.weight)
+
+    def test_execute(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 2}), cache_size=8)
+        assert dsl.execute(self.rule) == ["a  b"]
+        assert dsl.execute(self.rule + " ") == ["a  b"]
+        assert dsl.cache_info().hits == 1
+
+    def test_validate(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 2}), cache_size=8)
+        result = dsl.validate(self.rule)
+        assert result.is_valid
+        assert dsl.validate(self.rule) == result
+        assert dsl.validate(self.rule) is not result
+        info = dsl.cache_info()
+        # The validation result reuses the compiled rule
+        assert (info.hits, info.misses) == (2, 2)
+        dsl.compile(self.rule)
+        assert dsl.cache_info().hits == 3
+
+    def test_validate_error(self):
+        dsl = DefaultDSL(cache_size=8)
+        result = dsl.validate("IF x THEN")
+        assert isinstance(result.error, DSLSyntaxError)
+        assert result.error.__traceback__ is None
+        assert dsl.validate("IF x  THEN").error is result.error
+        with pytest.raises(DSLSyntaxError):
+            dsl.execute("IF x THEN")
+
+    def test_evictions(self):
+        dsl = DefaultDSL(cache_size=2)
+        for i in range(4):
+            dsl.compile(f"IF TRUE THEN RETURN({i})")
+        assert dsl.cache_info().evictions == 2
+        assert len(dsl.cache) == 2
+
+    def test_cache_bytes(self):
+        dsl = DefaultDSL(cache_bytes=20000)
+        for i in range(100):
+            dsl.compile(f"IF x > {i} THEN RETURN({i})")
+        info = dsl.cache_info()
+        assert 0 < info.weight <= 20000
+        assert info.evictions > 0
+        assert info.maxsize is None
+
+    def test_keyed_by_lexer(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 2}), cache_size=8)
+        assert dsl.execute(self.rule) == ["a  b"]
+        dsl.lexer = DefaultLexer(variables={"x": 0})
+        assert dsl.execute(self.rule) == [0]
+
+    def test_keyed_by_variables(self):
+        dsl = DefaultDSL(cache_size=8)
+        dsl.lexer.variables = {"x": 5}
+        assert dsl.execute("IF x > 1 THEN RETURN(x)") == [5]
+        dsl.lexer.variables = {"x": 7}
+        assert dsl.execute("IF x > 1 THEN RETURN(x)") == [7]
+
+    def test_disabled(self):
+        dsl = DefaultDSL()
+        assert dsl.compile(self.rule) is not dsl.compile(self.rule)
+        assert dsl.cache_info() is None
+
+
+class TestDefaultDSLBinarySources:
+    """Test executing a DefaultDSL from bytes and binary files."""
+
+    rule = "IF x > 1 THEN RETURN('£') ELIF TRUE THEN RETURN([x, 'a b'])"
+
+    def test_bytes(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        assert dsl.execute(self.rule.encode()) == [[1, "a b"]]
+
+    def test_file(self, tmp_path):
+        path = tmp_path / "rule.dsl"
+        path.write_bytes(self.rule.encode())
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 2}))
+        with open(path, "rb") as file:
+            assert dsl.execute(file) == ["£"]
+        with open(path, "rb") as file:
+            assert dsl.validate(file).is_valid
+
+    def test_invalid_syntax(self):
+        result = DefaultDSL().validate(b"IF x > \xc2\xa3 THEN RETURN(1)")
+        assert isinstance(result.error, DSLSyntaxError)
+        assert "£" in str(result.error)
+
+
+class TestDefaultDSLReparse:
+    """Test re-parsing a DefaultDSL document after an edit."""
+
+    rule = (
+        "IF x > 1 THEN RETURN(1)\n"
+        "IF x < 1 THEN RETURN(2) ELSE RETURN(3)\n"
+        "IF x == 1 THEN RETURN('a')"
+    )
+
+    @staticmethod
+    def result(function, *args) -> tuple:
+        try:
+            result = function(*args)
+        except DSLException as err:
+            return type(err), str(err)
+        return result.is_valid, repr(result.actions), repr(result.error)
+
+    @pytest.mark.parametrize(
+        "start, end, replacement",
+        [
+            (0, 0, ""),
+            (7, 8, "7"),
+            (24, 26, "IF"),
+            (24, 26, ""),
+            (24, 24, "x"),
+            (23, 23, " IF TRUE THEN RETURN(4)"),
+            (27, 27, "'"),
+            (63, 65, "'"),
+            (89, 89, " £"),
+            (0, 89, ""),
+            (45, 46, "x"),
+            (46, 46, ", 'b'"),
+            (89, 89, " IF"),
+        ],
+    )
+    def test_matches_parse_document(self, start, end, replacement):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        document = dsl.reparse(
+            dsl.parse_document(self.rule), start, end, replacement
+        )
+        text = self.rule[:start] + replacement + self.rule[end:]
+        expected = dsl.parse_document(text)
+        assert document.text == text
+        assert document.starts == expected.starts
+        assert [s.tokens for s in document.statements] == [
+            s.tokens for s in expected.statements
+        ]
+        assert document.tokens == expected.tokens
+        assert self.result(dsl.validate_document, document) == self.result(
+            dsl.validate, text
+        )
+
+    def test_reuses_statements(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        document = dsl.parse_document(self.rule)
+        edited = dsl.reparse(document, 31, 32, "2")
+        assert edited.statements[0] is document.statements[0]
+        assert edited.statements[1] is not document.statements[1]
+        assert edited.statements[2] is document.statements[2]
+        assert edited.statements[2].tree is document.statements[2].tree
+
+    def test_tree(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        document = dsl.reparse(dsl.parse_document(self.rule), 7, 8, "0")
+        tokens = dsl.lexer.tokenize(document.text)
+        assert document.tree == dsl.parser.parse(tokens)[0]
+        assert dsl.validate_document(document).is_valid
+
+    def test_invalid_statement(self):
+        dsl = DefaultDSL(lexer=DefaultLexer(variables={"x": 1}))
+        document = dsl.reparse(dsl.parse_document(self.rule), 24, 26, "")
+        assert document.tree is None
+        result = dsl.validate_document(document)
+        assert not result.is_valid
+        assert isinstance(result.error, DSLSyntaxError)
+
+    def test_custom_lexer(self):
+        class CustomLexer(Lexer):
+            def tokenize(self, input_string):
+                return DefaultLexer().tokenize(input_string)
+
+        text = self.rule.replace("x < 1", "x < £")
+        document = DefaultDSL(lexer=CustomLexer()).parse_document(text)
+        expected = DefaultDSL().parse_document(text)
+        assert document.starts == expected.starts
+        assert [type(s.error) for s in document.statements] == [
+            type(s.error) for s in expected.statements
+        ]
+
+    def test_empty_document(self):
+        dsl = DefaultDSL()
+        document = dsl.parse_document("  ")
+        assert document.statements == []
+        assert not dsl.validate_document(document).is_valid
+
+    @pytest.mark.parametrize("start, end", [(-1, 0), (2, 1), (0, 100)])
+    def test_invalid_range(self, start, end):
+        dsl = DefaultDSL()
+        with pytest.raises(ValueError):
+            dsl.reparse(dsl.parse_document(self.rule), start, end, "")
@@ -1,8 +1,13 @@
+import io
+import mmap
+import pickle
+from copy import deepcopy
 from typing import ClassVar
 
 import pytest
 
 from dsl import DefaultLexer
+from dsl.lexers import Lexer, TrieLexer, regex_first, regex_literals
 from dsl.models.exceptions import DSLSyntaxError
 from dsl.models.symbols import TerminalSymbol
 from dsl.models.symbols.terminals import (
@@ -24,6 +29,7 @@ from dsl.models.symbols.terminals import (
     ThenLiteral,
     VariableLiteral,
 )
+from tests.helpers import rules
 
 
 class TestTokenize:
@@ -131,6 +137,297 @@ class TestTokenize:
         assert lexer.tokenize("foo_bar") == [VariableLiteral("foo_bar")]
 
 
+class TestPatternCache:
+    """Test the cache of compiled lexer patterns."""
+
+    def test_shared_by_symbol_set(self):
+        lexer = DefaultLexer(variables={"a": 1}, exclusions=[IfLiteral])
+        other = DefaultLexer(variables={"a": 2}, exclusions=[IfLiteral])
+        assert other.pattern is lexer.pattern
+        assert other.variables == {"a": 2}
+        assert DefaultLexer().pattern is not lexer.pattern
+        assert TrieLexer(exclusions=[IfLiteral]).trie is not None
+
+    @pytest.mark.parametrize("lexer_type", [DefaultLexer, TrieLexer])
+    def test_read_only(self, lexer_type):
+        lexer = lexer_type()
+        with pytest.raises(AttributeError):
+            lexer.symbols.append(IfLiteral)
+        with pytest.raises(TypeError):
+            lexer.inclusions["IfLiteral"] = VariableLiteral
+        with pytest.raises(TypeError):
+            lexer.kinds["IfLiteral"] = 0
+        if isinstance(lexer, TrieLexer):
+            with pytest.raises(TypeError):
+                lexer.trie["I"]["F"][""] = 0
+
+    @pytest.mark.parametrize("lexer_type", [DefaultLexer, TrieLexer])
+    def test_pickle(self, lexer_type):
+        lexer = lexer_type(variables={"a": 1}, exclusions=[IfLiteral])
+        for other in (pickle.loads(pickle.dumps(lexer)), deepcopy(lexer)):
+            assert other.variables == {"a": 1}
+            assert other.pattern is lexer.pattern
+            assert other.tokenize("IF a") == lexer.tokenize("IF a")
+
+    def test_shared_byte_tables(self):
+        lexer = TrieLexer(exclusions=[IfLiteral])
+        other = TrieLexer(exclusions=[IfLiteral])
+        assert other.byte_tables is lexer.byte_tables
+        assert other.tokenize(b"a >= 1") == lexer.tokenize("a >= 1")
+
+    def test_cache_info(self):
+        DefaultLexer.patterns.clear()
+        DefaultLexer(exclusions=[IfLiteral])
+        DefaultLexer(exclusions=[IfLiteral])
+        TrieLexer(exclusions=[IfLiteral])
+        info = DefaultLexer.cache_info()
+        assert (info.hits, info.misses, info.size) == (1, 2, 2)
+
+
+class TestIterTokens:
+    """Test iter_tokens."""
+
+    def test_same_as_tokenize(self):
+        lexer = DefaultLexer()
+        rule = "IF a.b[1] >= 2.5 THEN RETURN('c d')"
+        assert list(lexer.iter_tokens(rule)) == lexer.tokenize(rule)
+
+    def test_raises_at_first_invalid_symbol(self):
+        tokens = DefaultLexer().iter_tokens("IF a £ b $")
+        assert next(tokens) == IfLiteral("IF")
+        assert next(tokens) == VariableLiteral("a")
+        with pytest.raises(DSLSyntaxError, match="£"):
+            next(tokens)
+
+
+class TestTokenStream:
+    """Test token_stream."""
+
+    rule = "IF a.b[1] >= 2.5 THEN RETURN('c d')"
+
+    def test_same_as_tokenize(self):
+        lexer = DefaultLexer(variables={"a": 1})
+        stream = lexer.token_stream(self.rule)
+        assert len(stream) == 10
+        assert list(stream) == lexer.tokenize(self.rule)
+        assert stream[1].variables == {"a": 1}
+
+    def test_indexing(self):
+        stream = DefaultLexer().token_stream(self.rule)
+        assert stream[-2] == StringLiteral("'c d'")
+        assert stream[1:3] == [VariableLiteral("a"), AttributeLiteral(".b")]
+        assert stream.symbol_type(4) is GreaterThanOrEqualLiteral
+        assert stream.lexeme(5) == "2.5"
+        with pytest.raises(IndexError):
+            assert stream[10]
+
+    def test_compact(self):
+        stream = DefaultLexer().token_stream(self.rule)
+        assert stream.kinds.itemsize == 1
+        assert stream.starts.itemsize == stream.ends.itemsize == 4
+
+    def test_invalid_token(self):
+        with pytest.raises(DSLSyntaxError, match="£"):
+            DefaultLexer().token_stream("IF a £ b")
+
+
+class TestBinarySources:
+    """Test lexing bytes, binary files and mmap regions."""
+
+    rule = "IF a.b[1] >= 2.5 THEN RETURN('c £ d')"
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / "rule.dsl"
+        path.write_bytes(self.rule.encode())
+        return path
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    @pytest.mark.parametrize("convert", [bytes, bytearray, memoryview])
+    def test_bytes(self, lexer, convert):
+        source = convert(self.rule.encode())
+        expected = lexer.tokenize(self.rule)
+        assert lexer.tokenize(source) == expected
+        assert list(lexer.token_stream(source)) == expected
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    def test_files(self, lexer, path):
+        expected = lexer.tokenize(self.rule)
+        with open(path, "rb") as file:
+            assert lexer.tokenize(file) == expected
+        assert lexer.tokenize(io.BytesIO(self.rule.encode())) == expected
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    @pytest.mark.parametrize("skipped", [3, mmap.ALLOCATIONGRANULARITY + 3])
+    def test_file_position(self, lexer, tmp_path, skipped):
+        path = tmp_path / "rule.dsl"
+        path.write_bytes(b"?" * skipped + self.rule.encode())
+        expected = lexer.tokenize(self.rule)
+        with open(path, "rb") as file:
+            file.seek(skipped)
+            assert lexer.tokenize(file) == expected
+            file.seek(skipped)
+            with lexer.token_stream(file) as stream:
+                assert list(stream) == expected
+                assert stream.starts[0] == 0
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    def test_maps_closed(self, lexer, path, monkeypatch):
+        regions = []
+
+        class Map(mmap.mmap):
+            def __init__(self, *args, **kwargs):
+                regions.append(self)
+
+        monkeypatch.setattr(mmap, "mmap", Map)
+        with open(path, "rb") as file:
+            lexer.tokenize(file)
+            file.seek(0)
+            with lexer.token_stream(file) as stream:
+                assert not regions[1].closed
+                assert stream.lexeme(0) == "IF"
+        assert [region.closed for region in regions] == [True, True]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.dsl"
+        path.write_bytes(b"")
+        with open(path, "rb") as file:
+            assert DefaultLexer().tokenize(file) == []
+
+    def test_lazy_lexemes(self, path):
+        with open(path, "rb") as file:
+            region = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        stream = DefaultLexer().token_stream(region)
+        assert stream.source is region
+        assert stream.lexeme(8) == "'c £ d'"
+        assert stream[8] == StringLiteral("'c £ d'")
+        del stream
+        region.close()
+
+    def test_byte_offsets(self):
+        stream = DefaultLexer().token_stream("'£' a".encode())
+        assert (stream.starts[1], stream.ends[1]) == (5, 6)
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    def test_invalid_token(self, lexer):
+        with pytest.raises(DSLSyntaxError, match="£"):
+            lexer.token_stream("IF a £ b".encode())
+
+    @pytest.mark.parametrize("lexer", [DefaultLexer(), TrieLexer()])
+    def test_non_ascii_symbols(self, lexer):
+        rule = "IF café THEN RETURN(1)"
+        assert lexer.tokenize(rule)[1] == VariableLiteral("café")
+        with pytest.raises(DSLSyntaxError, match="é.*non-ASCII"):
+            lexer.tokenize(rule.encode())
+        with pytest.raises(DSLSyntaxError, match="é.*non-ASCII"):
+            lexer.token_stream(rule.encode())
+
+
+class TestTrieLexer:
+    """Test TrieLexer."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_as_default_lexer(self, rule):
+        assert TrieLexer().tokenize(rule) == DefaultLexer().tokenize(rule)
+
+    def test_longest_match(self):
+        lexer = TrieLexer()
+        assert lexer.tokenize("IFFY ORDER ANDY TRUEx None1") == [
+            VariableLiteral("IFFY"),
+            VariableLiteral("ORDER"),
+            VariableLiteral("ANDY"),
+            VariableLiteral("TRUEx"),
+            VariableLiteral("None1"),
+        ]
+
+    def test_ties_to_first_symbol(self):
+        lexer = TrieLexer()
+        assert lexer.tokenize("IF ELIF x >= 1.5") == [
+            IfLiteral("IF"),
+            ElifLiteral("ELIF"),
+            VariableLiteral("x"),
+            GreaterThanOrEqualLiteral(">="),
+            FloatLiteral("1.5"),
+        ]
+
+    def test_invalid_symbol(self):
+        lexer = TrieLexer()
+        assert [token for token, _, _ in lexer.scan("a £b 'c")] == [
+            VariableLiteral("a"),
+            InvalidSymbol("£b"),
+            InvalidSymbol("'c"),
+        ]
+        with pytest.raises(DSLSyntaxError):
+            lexer.token_stream("a £b")
+
+    def test_included_symbol(self):
+        class FooSymbol(TerminalSymbol):
+            regex: ClassVar[str] = "FOO|FOOBAR"
+
+            def represents(self) -> None:
+                return None
+
+        lexer = TrieLexer(inclusions=[FooSymbol])
+        assert lexer.tokenize("FOOBAR FOO FOOBARS") == [
+            FooSymbol("FOOBAR"),
+            FooSymbol("FOO"),
+            VariableLiteral("FOOBARS"),
+        ]
+
+    def test_regex_literals(self):
+        assert regex_literals(r"RETURN\(") == ["RETURN("]
+        assert regex_literals(r"TRUE|FALSE") == ["TRUE", "FALSE"]
+        assert regex_literals(r"[A-Za-z]\w*") is None
+
+    def test_without_regex_parser(self, monkeypatch):
+        monkeypatch.setattr("dsl.lexers.sre_parse", None)
+        assert regex_literals(r"TRUE|FALSE") is None
+        assert regex_first(r"\d+") == frozenset(map(chr, range(0x80)))
+        DefaultLexer.patterns.clear()
+        for rule in rules:
+            assert TrieLexer().tokenize(rule) == DefaultLexer().tokenize(rule)
+        DefaultLexer.patterns.clear()
+
+    def test_unknown_parse_tree(self, monkeypatch):
+        monkeypatch.setattr("dsl.lexers.parse_regex", lambda regex: [None])
+        assert regex_literals(r"TRUE|FALSE") is None
+        assert regex_first(r"\d+") == frozenset(map(chr, range(0x80)))
+
+    def test_regex_first(self):
+        assert regex_first(r"\d+\.\d+") == frozenset("0123456789")
+        assert regex_first(r"'[^']*'|\"[^\"]*\"") == frozenset("'\"")
+        assert regex_first(r"a?b") == frozenset("ab")
+        assert " " not in regex_first(r"[^ \n]+")
+
+
+class TestScan:
+    """Test scan."""
+
+    def test_spans(self):
+        lexer = DefaultLexer()
+        assert list(lexer.scan("IF  x £")) == [
+            (IfLiteral("IF"), 0, 2),
+            (VariableLiteral("x"), 4, 5),
+            (InvalidSymbol("£"), 6, 7),
+        ]
+
+    def test_default_spans(self):
+        class TokenizingLexer(Lexer):
+            def tokenize(self, input_string):
+                return DefaultLexer().tokenize(input_string)
+
+        lexer = TokenizingLexer()
+        assert list(lexer.scan("IF  x 'IF", 1)) == [
+            (VariableLiteral("F"), 1, 2),
+            (VariableLiteral("x"), 4, 5),
+            (InvalidSymbol("'IF"), 6, 9),
+        ]
+        assert list(lexer.scan(memoryview("'£' x".encode()))) == [
+            (StringLiteral("'£'"), 0, 4),
+            (VariableLiteral("x"), 5, 6),
+        ]
+
+
 class TestValidateAdjacentTokens:
     """Test validate_adjacent_tokens."""
 
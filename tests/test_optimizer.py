@@ -0,0 +1,157 @@
+import random
+from dataclasses import MISSING
+from typing import Any, ClassVar
+
+import pytest
+
+from dsl import DefaultDSL, DefaultLexer, DefaultParser
+from dsl.models.grammar import Grammar, Production, base_grammar
+from dsl.models.representables.evaluables import (
+    EvaluableBlock,
+    EvaluableElifStatement,
+    EvaluableExpression,
+    EvaluableIfStatement,
+)
+from dsl.models.representables.keywords import ElseKeyword
+from dsl.models.representables.operands import ConstantOperand
+from dsl.models.representables.operators import Function
+from dsl.models.symbols import TerminalSymbol
+from dsl.models.symbols.nonterminals import (
+    ConditionExprSymbol,
+    FactorSymbol,
+    IfStatementSymbol,
+)
+from dsl.models.symbols.terminals import RightParenthesisLiteral
+from dsl.optimizer import optimize
+from tests.helpers import outcome, random_rule
+
+
+class CounterFunction(Function):
+    precedence: ClassVar[int] = -1
+    registrable: ClassVar[bool] = True
+    calls: ClassVar[int] = 0
+
+    def evaluate(self, x: Any) -> Any:
+        CounterFunction.calls += 1
+        return x + CounterFunction.calls
+
+
+class CounterFunc(TerminalSymbol):
+    regex: ClassVar[str] = r"Counter\("
+
+    @property
+    def represents(self) -> CounterFunction:
+        return CounterFunction(self.lexeme)
+
+
+def statements(rule: str) -> list:
+    """Return the optimized statements of a rule."""
+    tree = DefaultDSL().compile(rule, optimize=True).tree
+    assert isinstance(tree, EvaluableBlock)
+    return tree.contents
+
+
+class TestOptimizer:
+    """Test Optimizer."""
+
+    def test_folds_expressions(self):
+        [statement] = statements("IF x > 2 * 60 * 60 THEN RETURN(1)")
+        condition = statement.contents[1]
+        assert isinstance(condition, EvaluableExpression)
+        assert condition.contents[2] == ConstantOperand(7200)
+        [statement] = statements("IF 'a' == 'a' THEN RETURN(1)")
+        assert statement.contents[1] == ConstantOperand(True, "TRUE")
+
+    def test_prunes_false_branches(self):
+        assert statements("IF FALSE THEN RETURN(1)") == []
+        [statement] = statements(
+            "IF 1 > 2 THEN RETURN(1) ELIF x THEN RETURN(2) "
+            "ELIF NOT TRUE THEN RETURN(3)"
+        )
+        assert statement.contents[1].token_value == "x"
+        assert len(statement.contents) == 4
+
+    def test_true_branch_becomes_else(self):
+        [statement] = statements(
+            "IF x THEN RETURN(1) ELIF 1 < 2 THEN RETURN(2) ELSE RETURN(3)"
+        )
+        elif_statement = statement.contents[4]
+        assert isinstance(elif_statement, EvaluableElifStatement)
+        assert isinstance(elif_statement.contents[0], ElseKeyword)
+        assert len(elif_statement.contents) == 2
+        [statement] = statements("IF TRUE THEN RETURN(1) ELSE RETURN(2)")
+        assert statement.contents[1] == ConstantOperand(True, "TRUE")
+        assert len(statement.contents) == 4
+
+    def test_short_circuit(self):
+        assert statements("IF FALSE AND x THEN RETURN(1)") == []
+        [statement] = statements("IF x OR 1 == 1 OR y THEN RETURN(1)")
+        assert isinstance(statement.contents[1], EvaluableExpression)
+
+    def test_errors_are_not_folded(self):
+        compiled = DefaultDSL().compile("IF 1 / 0 THEN RETURN(1)", True)
+        with pytest.raises(ZeroDivisionError):
+            compiled.execute()
+
+    def test_functions_are_not_folded(self):
+        grammar = Grammar(base_grammar)
+        grammar[FactorSymbol] = [
+            Production(
+                CounterFunc, ConditionExprSymbol, RightParenthesisLiteral
+            ),
+            *base_grammar[FactorSymbol],
+        ]
+        dsl = DefaultDSL(
+            lexer=DefaultLexer(inclusions=[CounterFunc]),
+            parser=DefaultParser(grammar=grammar),
+        )
+        compiled = dsl.compile("IF Counter(1) > 0 THEN RETURN(1)", True)
+        CounterFunction.calls = 0
+        assert compiled.execute() == compiled.execute() == [1]
+        assert CounterFunction.calls == 2
+
+    def test_lists_are_not_shared(self):
+        compiled = DefaultDSL().compile("IF TRUE THEN RETURN([1, 2])", True)
+        [outcome] = compiled.execute()
+        outcome.append(3)
+        assert compiled.execute() == [[1, 2]]
+
+    def test_action_args_are_extended(self):
+        rule = "IF TRUE THEN RETURN(1, [2, 3], [4, 5])"
+        dsl = DefaultDSL()
+        assert dsl.compile(rule, True).execute() == dsl.execute(rule)
+
+    def test_does_not_change_tree(self):
+        tree = DefaultDSL().construct("IF 1 + 1 == x THEN RETURN([2, 3])")
+        expected = repr(tree)
+        optimize(tree)
+        assert repr(tree) == expected
+
+    def test_statement_tree(self):
+        dsl = DefaultDSL(start_symbol=IfStatementSymbol())
+        tree = dsl.construct("IF FALSE THEN RETURN(1)")
+        assert isinstance(tree, EvaluableIfStatement)
+        assert optimize(tree).evaluate() is MISSING
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_same_as_unoptimized(seed):
+    rng = random.Random(seed)
+    dsl = DefaultDSL()
+    rows = [
+        {"x": x, "y": y, "z": z, "s": s}
+        for x, y, z, s in [
+            (0, 1, True, "a"),
+            (1, 0, False, ""),
+            (2, 2, None, "b"),
+            (3, 1.5, 0, "a"),
+        ]
+    ]
+    for _ in range(25):
+        rule = random_rule(rng)
+        compiled = dsl.compile(rule)
+        optimized = dsl.compile(rule, optimize=True)
+        for variables in rows:
+            assert outcome(optimized, variables) == outcome(
+                compiled, variables
+            ), rule
@@ -1,6 +1,12 @@
+import sys
+
 import pytest
 
-from dsl import DefaultParser, DSLSyntaxError
+from dsl import DefaultLexer, DefaultParser, DSLSyntaxError
+from dsl.lexers import TokenStream
+from dsl.models.grammar import Grammar, Production, base_grammar
+from dsl.models.representables.evaluables import EvaluableBlock
+from dsl.models.symbols import NonTerminalSymbol
 from dsl.models.symbols.nonterminals import (
     ActionArgSymbol,
     ActionSymbol,
@@ -38,6 +44,14 @@ from dsl.models.symbols.terminals import (
     ThenLiteral,
     VariableLiteral,
 )
+from dsl.parsers import (
+    FusedParser,
+    IterativeParser,
+    LeftFactoredParser,
+    PackratParser,
+    PrecedenceParser,
+)
+from tests.helpers import rules
 
 return_string = "RETURN("
 
@@ -844,3 +858,384 @@ class TestParserParse:
                 ]
             )
         ]
+
+
+class TestParserProductions:
+    """Test DefaultParser.productions."""
+
+    def test_predicted_productions(self):
+        parser = DefaultParser()
+        context = parser.create_context([IntegerLiteral("1")])
+        assert parser.productions(OperandSymbol, 0, context) == (
+            Production(IntegerLiteral),
+        )
+        assert parser.productions(FactorSymbol, 0, context) == (
+            Production(OperandSymbol),
+        )
+
+    def test_end_of_input(self):
+        parser = DefaultParser()
+        context = parser.create_context([IntegerLiteral("1")])
+        assert parser.productions(OperandSymbol, 1, context) == (
+            base_grammar[OperandSymbol]
+        )
+
+    def test_terminal_subclass(self):
+        class HexLiteral(IntegerLiteral):
+            regex = r"0x[0-9a-f]+"
+
+        parser = DefaultParser()
+        assert parser.parse(
+            [HexLiteral("0xff")], start_symbol=OperandSymbol()
+        ) == [OperandSymbol([HexLiteral("0xff")])]
+
+
+class TestParserIterableTokens:
+    """Test parsing an iterator of tokens."""
+
+    @pytest.mark.parametrize(
+        "parser",
+        [
+            DefaultParser,
+            PackratParser,
+            IterativeParser,
+            PrecedenceParser,
+            LeftFactoredParser,
+            FusedParser,
+        ],
+    )
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_as_list(self, parser, rule):
+        lexer = DefaultLexer()
+        assert parser().construct(lexer.iter_tokens(rule)) == (
+            parser().construct(lexer.tokenize(rule))
+        )
+
+    @pytest.mark.parametrize(
+        "parser",
+        [
+            DefaultParser,
+            PackratParser,
+            IterativeParser,
+            PrecedenceParser,
+            LeftFactoredParser,
+            FusedParser,
+        ],
+    )
+    @pytest.mark.parametrize("rule", rules)
+    def test_token_stream(self, parser, rule):
+        lexer = DefaultLexer()
+        assert parser().construct(lexer.token_stream(rule)) == (
+            parser().construct(lexer.tokenize(rule))
+        )
+
+    def test_lexer_error(self):
+        tokens = DefaultLexer().iter_tokens("IF 1 == £ THEN RETURN(3)")
+        with pytest.raises(DSLSyntaxError, match="Unknown syntax"):
+            DefaultParser().parse(tokens)
+
+
+class TestPackratParser:
+    """Test PackratParser."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_tree_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert PackratParser().parse(tokens) == DefaultParser().parse(tokens)
+
+    def test_invalid_syntax(self):
+        tokens = DefaultLexer().tokenize("IF 1 == 1 THEN RETURN(3) IF")
+        with pytest.raises(DSLSyntaxError):
+            assert PackratParser().parse(tokens)
+
+    def test_each_expansion_memoized_once(self):
+        depth = 30
+        tokens = DefaultLexer().tokenize(
+            f"IF {'(' * depth}1 + 2{')' * depth} == 3 THEN RETURN(1)"
+        )
+        parser = PackratParser()
+        context = parser.create_context(tokens)
+        parser.parse_context(context)
+        assert len(context.memo) <= len(tokens) * len(base_grammar)
+
+    def test_memo_reset_between_parses(self):
+        lexer = DefaultLexer()
+        parser = PackratParser()
+        parser.parse(lexer.tokenize("IF 1 > 2 THEN RETURN(1)"))
+        tokens = lexer.tokenize("IF a THEN RETURN(2)")
+        assert parser.parse(tokens) == DefaultParser().parse(tokens)
+
+
+class TestIterativeParser:
+    """Test IterativeParser."""
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_tree_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert IterativeParser().parse(tokens) == DefaultParser().parse(tokens)
+
+    @pytest.mark.parametrize("rule", rules)
+    def test_same_reduction_as_default_parser(self, rule):
+        parse_tree = DefaultParser().parse(DefaultLexer().tokenize(rule))
+        assert IterativeParser().reduce(parse_tree[0]) == (
+            DefaultParser().reduce(parse_tree[0])
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["IF 1 == 1 THEN RETURN(3) IF", "IF 2 > 1 THEN ELSE", "RETURN(1)"],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert IterativeParser().parse(tokens)
+
+    def test_token_stream_matched_tokens_created(self, monkeypatch):
+        stream = DefaultLexer().token_stream(
+            "IF a > 1 AND b THEN RETURN(a) ELSE RETURN(b)"
+        )
+        created = []
+        getitem = TokenStream.__getitem__
+
+        def record(self, index):
+            created.append(index)
+            return getitem(self, index)
+
+        monkeypatch.setattr(TokenStream, "__getitem__", record)
+        IterativeParser().parse(stream)
+        # Tokens are only created once their type matches a production, and
+        # the operands a and b are matched by five productions each
+        assert sorted(created) == sorted([*range(len(stream))] + [1, 5] * 4)
+
+    def test_beyond_recursion_limit(self):
+        count = sys.getrecursionlimit() * 2
+        rule = " ".join(f"IF x > {i} THEN RETURN({i})" for i in range(count))
+        parser = IterativeParser()
+        parse_tree = parser.parse(DefaultLexer().tokenize(rule))
+        execution_tree = parser.reduce(parse_tree[0])[0]
+        if_statements = 0
+        while isinstance(execution_tree, EvaluableBlock):
+            if_statements += 1
+            execution_tree = execution_tree.contents[-1]
+        assert if_statements == count
+
+
+class TestPrecedenceParser:
+    """Test PrecedenceParser."""
+
+    @staticmethod
+    def count_non_terminals(node):
+        if not isinstance(node, NonTerminalSymbol):
+            return 0
+        return 1 + sum(
+            TestPrecedenceParser.count_non_terminals(sub_node)
+            for sub_node in node.contents
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        rules
+        + [
+            "IF 2 * 3 + 4 == 14 THEN RETURN(1)",
+            "IF 1 - 2 - 3 == 2 THEN RETURN(1)",
+            "IF a AND b OR c AND NOT d THEN RETURN(1)",
+            "IF a == b > c != d THEN RETURN(1)",
+            "IF COUNT(TRUE OR a) > 0 AND FALSE THEN RETURN(1)",
+            "IF (1 + (2 * (3 - a.b.c))) % x[1] >= 2 THEN RETURN(1)",
+        ],
+    )
+    def test_same_reduction_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        default_parser = DefaultParser()
+        precedence_parser = PrecedenceParser()
+        assert precedence_parser.reduce(
+            precedence_parser.parse(tokens)[0]
+        ) == default_parser.reduce(default_parser.parse(tokens)[0])
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            "IF TRUE == a THEN RETURN(1)",
+            "IF NOT NOT a THEN RETURN(1)",
+            "IF 1 == NOT a THEN RETURN(1)",
+            "IF (a AND b) THEN RETURN(1)",
+            "IF a + THEN RETURN(1)",
+            "IF a.b.c.d THEN RETURN(1)",
+        ],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert DefaultParser().parse(tokens)
+        with pytest.raises(DSLSyntaxError):
+            assert PrecedenceParser().parse(tokens)
+
+    def test_fewer_non_terminals(self):
+        tokens = DefaultLexer().tokenize("IF a + 1 > 2 THEN RETURN(1)")
+        default_tree = DefaultParser().parse(tokens)
+        precedence_tree = PrecedenceParser().parse(tokens)
+        assert self.count_non_terminals(precedence_tree[0]) == 9
+        assert self.count_non_terminals(default_tree[0]) == 21
+
+    def test_expression_start_symbol(self):
+        parser = PrecedenceParser()
+        tokens = [IntegerLiteral("2"), PlusLiteral("+"), IntegerLiteral("3")]
+        assert parser.parse(tokens, start_symbol=ExpressionSymbol()) == [
+            ExpressionSymbol(
+                [IntegerLiteral("2"), PlusLiteral("+"), IntegerLiteral("3")]
+            )
+        ]
+        assert parser.parse(tokens, start_symbol=ConditionExprSymbol()) == [
+            ConditionExprSymbol(
+                [
+                    ExpressionSymbol(
+                        [
+                            IntegerLiteral("2"),
+                            PlusLiteral("+"),
+                            IntegerLiteral("3"),
+                        ]
+                    )
+                ]
+            )
+        ]
+
+    def test_custom_factor(self):
+        grammar = Grammar(base_grammar)
+        grammar[FactorSymbol] = [Production(OperandSymbol)]
+        parser = PrecedenceParser(grammar=grammar)
+        tokens = DefaultLexer().tokenize("IF a.b THEN RETURN(1)")
+        with pytest.raises(DSLSyntaxError):
+            assert parser.parse(tokens)
+
+
+class TestLeftFactoredParser:
+    """Test LeftFactoredParser."""
+
+    @pytest.mark.parametrize(
+        "rule",
+        rules
+        + [
+            "IF a.b.c == x[1].d THEN RETURN(a, x)",
+            "IF 1 >= 2 OR 3 <= 4 AND 5 != 6 THEN RETURN([1, 2])",
+        ],
+    )
+    def test_same_tree_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert LeftFactoredParser().parse(tokens) == (
+            DefaultParser().parse(tokens)
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["IF 1 == 1 THEN RETURN(3) IF", "IF 2 > 1 THEN ELSE", "IF a == THEN"],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert LeftFactoredParser().parse(tokens)
+
+    def test_prefix_parsed_once(self):
+        tokens = DefaultLexer().tokenize("IF a + 1 THEN RETURN(1)")
+        parser = LeftFactoredParser()
+        expansions = []
+        expand = parser.expand
+
+        def record(node, tree, origin, context):
+            expansions.append((node.__class__, origin))
+            return expand(node, tree, origin, context)
+
+        parser.expand = record
+        parser.parse(tokens)
+        assert expansions.count((ExpressionSymbol, 1)) == 1
+        assert expansions.count((TermSymbol, 1)) == 1
+
+    def test_token_stream_matched_tokens_created(self, monkeypatch):
+        stream = DefaultLexer().token_stream(
+            "IF a > 1 AND b THEN RETURN(a) ELSE RETURN(b)"
+        )
+        created = []
+        getitem = TokenStream.__getitem__
+
+        def record(self, index):
+            created.append(index)
+            return getitem(self, index)
+
+        monkeypatch.setattr(TokenStream, "__getitem__", record)
+        LeftFactoredParser().parse(stream)
+        # Tokens are only created once their type matches a production, and
+        # only the operands a and b are matched twice
+        assert sorted(created) == sorted([*range(len(stream)), 1, 5])
+
+    def test_reduce(self):
+        tokens = DefaultLexer().tokenize("IF a > 1 THEN RETURN(2)")
+        parser = LeftFactoredParser()
+        default_parser = DefaultParser()
+        assert parser.reduce(parser.parse(tokens)[0]) == default_parser.reduce(
+            default_parser.parse(tokens)[0]
+        )
+
+
+class TestFusedParser:
+    """Test FusedParser."""
+
+    @pytest.mark.parametrize(
+        "rule",
+        rules
+        + [
+            "IF a.b.c == x[1].d THEN RETURN(a, x)",
+            "IF [1, 2] THEN RETURN([1, [2, 3]], 4)",
+            "IF (1 + 2) * 3 > 0 THEN RETURN(1) ELIF x THEN RETURN(2) "
+            "ELSE RETURN(3)",
+        ],
+    )
+    def test_same_construction_as_default_parser(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        assert FusedParser().construct(tokens) == (
+            DefaultParser().construct(tokens)
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["IF 1 == 1 THEN RETURN(3) IF", "IF 2 > 1 THEN ELSE", "RETURN(1)"],
+    )
+    def test_invalid_syntax(self, rule):
+        tokens = DefaultLexer().tokenize(rule)
+        with pytest.raises(DSLSyntaxError):
+            assert FusedParser().construct(tokens)
+
+    def test_start_symbol(self):
+        tokens = DefaultLexer().tokenize("a.b + 1")
+        assert FusedParser().construct(
+            tokens, start_symbol=ExpressionSymbol()
+        ) == DefaultParser().construct(tokens, start_symbol=ExpressionSymbol())
+
+    def test_token_stream_matched_tokens_created(self, monkeypatch):
+        stream = DefaultLexer().token_stream(
+            "IF a > 1 AND b THEN RETURN(a) ELSE RETURN(b)"
+        )
+        created = []
+        getitem = TokenStream.__getitem__
+
+        def record(self, index):
+            created.append(index)
+            return getitem(self, index)
+
+        monkeypatch.setattr(TokenStream, "__getitem__", record)
+        FusedParser().construct(stream)
+        # Tokens are only created once their type matches a production, and
+        # the operands a and b are matched by five productions each
+        assert sorted(created) == sorted([*range(len(stream))] + [1, 5] * 4)
+
+    def test_no_parse_tree(self):
+        parser = FusedParser()
+        context = parser.create_context(
+            DefaultLexer().tokenize("IF a > 1 THEN RETURN(1)")
+        )
+        tree: list = []
+        parser.build(BlockSymbol, tree, 0, context)
+        assert isinstance(tree[0], EvaluableBlock)
+        assert not context.parse_tree
+        assert not any(
+            isinstance(represents, NonTerminalSymbol)
+            for represents, _ in context.built.values()
+        )
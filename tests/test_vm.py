@@ -0,0 +1,122 @@
+import random
+from dataclasses import MISSING
+
+import pytest
+
+from dsl import DefaultDSL
+from dsl.models import EvaluationContext
+from dsl.models.exceptions import DSLRuntimeError
+from dsl.models.representables.evaluables import (
+    EvaluableExpression,
+    EvaluableIfStatement,
+)
+from dsl.models.representables.operands import IntegerOperand
+from dsl.models.representables.operators import MinusOperator, PlusOperator
+from dsl.models.symbols.nonterminals import IfStatementSymbol
+from dsl.vm import (
+    BINARY,
+    CONST,
+    EVALUATE,
+    LOAD,
+    SHORT_CIRCUIT,
+    Program,
+    VirtualMachine,
+)
+from tests.helpers import outcome, random_rule, rows, rules
+
+
+def opcodes(program: Program) -> list[int]:
+    """Return the opcodes of the instructions of a program."""
+    return [opcode for opcode, _ in program.instructions]
+
+
+class TestVirtualMachine:
+    """Test VirtualMachine."""
+
+    def test_expression(self):
+        tree = DefaultDSL().construct("IF x + 2 > 3 THEN RETURN(x)")
+        program = VirtualMachine().compile(tree.contents[0].contents[1])
+        assert opcodes(program) == [LOAD, CONST, BINARY, CONST, BINARY]
+        assert program(EvaluationContext({"x": 2})) is True
+        assert program(EvaluationContext({"x": 1})) is False
+
+    def test_statements(self):
+        dsl = DefaultDSL(backend=VirtualMachine())
+        rule = "IF x > 1 THEN RETURN(1) ELIF x THEN RETURN(2) ELSE RETURN(3)"
+        compiled = dsl.compile(rule)
+        assert isinstance(compiled.executable, Program)
+        assert [compiled.execute({"x": x}) for x in (2, 1, 0)] == [
+            [1],
+            [2],
+            [3],
+        ]
+
+    def test_missing_outputs(self):
+        dsl = DefaultDSL(start_symbol=IfStatementSymbol())
+        tree = dsl.construct("IF x > 1 THEN RETURN(1)")
+        assert isinstance(tree, EvaluableIfStatement)
+        program = VirtualMachine().compile(tree)
+        assert program(EvaluationContext({"x": 0})) is MISSING
+
+    def test_short_circuit(self):
+        dsl = DefaultDSL(backend=VirtualMachine())
+        compiled = dsl.compile("IF y != 0 AND x / y > 1 THEN RETURN(x)")
+        assert SHORT_CIRCUIT in opcodes(compiled.executable)
+        assert compiled.execute({"x": 1, "y": 0}) == []
+        assert compiled.execute({"x": 2, "y": 1}) == [2]
+
+    def test_action_args(self):
+        # Lists in the args after the first are extended into them
+        rule = "IF TRUE THEN RETURN([x, 1], [1, [2, x]], 3, [4, 5])"
+        compiled = DefaultDSL(backend=VirtualMachine()).compile(rule)
+        assert compiled.execute({"x": 0}) == [([0, 1], 1, [2, 0], 3, 4, 5)]
+
+    def test_bound_variables(self):
+        dsl = DefaultDSL(backend=VirtualMachine())
+        dsl.lexer.variables = {"x": 5}
+        assert dsl.execute("IF x > 1 THEN RETURN(x)") == [5]
+
+    def test_missing_variable(self):
+        compiled = DefaultDSL(backend=VirtualMachine()).compile(
+            "IF x > y THEN RETURN(1)"
+        )
+        with pytest.raises(DSLRuntimeError, match="y does not exist."):
+            compiled.execute({"x": 1})
+
+    def test_irregular_expression(self):
+        # Binary operators applied to three pending operands are evaluated
+        # by the tree, which applies them out of order
+        expression = EvaluableExpression(
+            [
+                IntegerOperand("1"),
+                IntegerOperand("2"),
+                IntegerOperand("3"),
+                PlusOperator("+"),
+                MinusOperator("-"),
+            ]
+        )
+        program = VirtualMachine().compile(expression)
+        assert opcodes(program) == [EVALUATE]
+        assert program() == expression.evaluate()
+
+
+@pytest.mark.parametrize("rule", rules)
+def test_same_as_tree(rule):
+    tree_rule = DefaultDSL().compile(rule)
+    vm_rule = DefaultDSL(backend=VirtualMachine()).compile(rule)
+    for variables in rows:
+        assert outcome(vm_rule, variables) == outcome(tree_rule, variables)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_tree_random(seed):
+    rng = random.Random(seed)
+    dsl = DefaultDSL()
+    vm_dsl = DefaultDSL(backend=VirtualMachine())
+    for _ in range(25):
+        rule = random_rule(rng)
+        tree_rule, vm_rule = dsl.compile(rule), vm_dsl.compile(rule, True)
+        for variables in rows[:2]:
+            assert outcome(vm_rule, variables) == outcome(
+                tree_rule, variables
+            ), rule